@@ -1,10 +1,10 @@
 import { cn } from '@/lib/utils';
 import { Button, Input, Layout, Modal, Spin, Typography, message as antdMessage } from 'antd';
 import { FC, useEffect, useRef, useState } from 'react';
-import { LuSend, LuSparkles, LuTrash2, LuX } from 'react-icons/lu';
+import { LuCheck, LuSend, LuSparkles, LuTrash2, LuX } from 'react-icons/lu';
 import ChatMessage from './ChatMessage';
-import { IChatMessage } from '@/types';
-import { useClearChatHistoryMutation, useSendChatMessageMutation } from '@/lib/api';
+import { IChatMessage, IChatStreamEvent, IChatToolProgress } from '@/types';
+import { streamChatMessage, useClearChatHistoryMutation } from '@/lib/api';
 
 const WELCOME_MESSAGE: IChatMessage = {
   id: 'welcome',
@@ -20,22 +20,88 @@ Tôi có thể hỗ trợ gì cho bạn hôm nay?`,
   timestamp: new Date(),
 };
 
+const TOOL_LABELS: Record<string, string> = {
+  find_customer: 'Tìm kiếm khách hàng',
+  find_rm_task: 'Tra cứu công việc',
+  find_card_product: 'Tra cứu sản phẩm thẻ',
+  recommend_card_products: 'Đề xuất sản phẩm thẻ',
+  report_performance: 'Tổng hợp hiệu suất',
+  create_rm_task: 'Kiểm tra công việc mới',
+  update_rm_task: 'Kiểm tra cập nhật công việc',
+};
+
 const AgentChat: FC = () => {
   const [collapsed, setCollapsed] = useState(true);
   const [messagesInput, setMessagesInput] = useState<string>('');
   const [messages, setMessages] = useState<IChatMessage[]>([WELCOME_MESSAGE]);
+  const [isStreaming, setIsStreaming] = useState(false);
+  const [toolProgress, setToolProgress] = useState<IChatToolProgress[]>([]);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const abortControllerRef = useRef<AbortController | null>(null);
 
-  const sendMessageMutation = useSendChatMessageMutation();
   const clearHistoryMutation = useClearChatHistoryMutation();
 
   // Auto-scroll to bottom when new messages arrive
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
-  }, [messages]);
+  }, [messages, toolProgress]);
+
+  // Stop a running stream when the chat is unmounted
+  useEffect(() => () => abortControllerRef.current?.abort(), []);
+
+  const appendAssistantContent = (id: string, content: string) => {
+    setMessages((prev) => {
+      if (prev.some((msg) => msg.id === id)) {
+        return prev.map((msg) =>
+          msg.id === id ? { ...msg, content: msg.content + content } : msg,
+        );
+      }
+      return [...prev, { id, role: 'assistant', content, timestamp: new Date() }];
+    });
+  };
+
+  const handleStreamEvent = (assistantId: string, event: IChatStreamEvent) => {
+    switch (event.type) {
+      case 'token':
+        appendAssistantContent(assistantId, event.content ?? '');
+        break;
+      case 'tool_start':
+        setToolProgress((prev) => [
+          ...prev,
+          {
+            id: event.tool_call_id ?? `${event.tool}-${prev.length}`,
+            tool: event.tool ?? '',
+            status: 'running',
+          },
+        ]);
+        break;
+      case 'tool_end':
+        setToolProgress((prev) =>
+          prev.map((item) =>
+            item.id === event.tool_call_id
+              ? { ...item, status: event.status ?? 'succeeded', durationMs: event.duration_ms }
+              : item,
+          ),
+        );
+        break;
+      case 'done':
+        // Confirmation question of an interrupted turn
+        if (event.content) {
+          appendAssistantContent(assistantId, event.content);
+        }
+        break;
+      case 'error':
+        appendAssistantContent(assistantId, event.content ?? '');
+        antdMessage.error('Đã xảy ra lỗi khi xử lý yêu cầu.');
+        break;
+      default:
+        // keepalive: nothing to show
+        break;
+    }
+  };
 
   const handleSendMessage = async () => {
-    if (!messagesInput.trim() || sendMessageMutation.isPending) {
+    if (!messagesInput.trim() || isStreaming) {
       return;
     }
 
@@ -50,28 +116,33 @@ const AgentChat: FC = () => {
     setMessages((prev) => [...prev, userMessage]);
     setMessagesInput('');
 
+    const assistantId = `assistant-${Date.now()}`;
+    const abortController = new AbortController();
+    abortControllerRef.current = abortController;
+    setIsStreaming(true);
+    setToolProgress([]);
+
     try {
-      // Send message to API
-      const response = await sendMessageMutation.mutateAsync({
-        message: userMessage.content,
-        rm_id: 1,
-      });
-
-      // Add assistant response to chat
-      const assistantMessage: IChatMessage = {
-        id: `assistant-${Date.now()}`,
-        role: 'assistant',
-        content: response.message,
-        timestamp: new Date(),
-      };
-
-      setMessages((prev) => [...prev, assistantMessage]);
+      // Stream the answer, tool progress first
+      await streamChatMessage(
+        { message: userMessage.content, rm_id: 1 },
+        (event) => handleStreamEvent(assistantId, event),
+        abortController.signal,
+      );
     } catch (error) {
+      if (abortController.signal.aborted) {
+        return;
+      }
       console.error('Error sending message:', error);
       antdMessage.error('Không thể gửi tin nhắn. Vui lòng thử lại.');
 
       // Optionally remove the user message on error
-      setMessages((prev) => prev.filter((msg) => msg.id !== userMessage.id));
+      setMessages((prev) =>
+        prev.filter((msg) => msg.id !== userMessage.id && msg.id !== assistantId),
+      );
+    } finally {
+      setIsStreaming(false);
+      setToolProgress([]);
     }
   };
 
@@ -153,11 +224,30 @@ const AgentChat: FC = () => {
 
         <div className="flex-1 overflow-y-auto p-4">
           <ChatMessage messages={messages} />
-          {sendMessageMutation.isPending && (
+          {isStreaming && (
             <div className="flex justify-start mt-4">
               <div className="max-w-[85%] rounded-lg bg-[#eff2f5] p-3">
-                <Spin size="small" />
-                <span className="ml-2 text-gray-600">Đang suy nghĩ...</span>
+                <div>
+                  <Spin size="small" />
+                  <span className="ml-2 text-gray-600">Đang suy nghĩ...</span>
+                </div>
+                {toolProgress.map((item) => (
+                  <div key={item.id} className="flex items-center gap-1.5 mt-2 text-xs text-gray-600">
+                    {item.status === 'running' ? (
+                      <Spin size="small" />
+                    ) : item.status === 'succeeded' ? (
+                      <LuCheck className="w-3.5 h-3.5 text-green-600" />
+                    ) : (
+                      <LuX className="w-3.5 h-3.5 text-red-500" />
+                    )}
+                    <span>{TOOL_LABELS[item.tool] ?? item.tool}</span>
+                    {item.durationMs != null && (
+                      <span className="text-gray-400">
+                        ({(item.durationMs / 1000).toFixed(1)}s)
+                      </span>
+                    )}
+                  </div>
+                ))}
               </div>
             </div>
           )}
@@ -172,15 +262,15 @@ const AgentChat: FC = () => {
               value={messagesInput}
               onChange={(e) => setMessagesInput(e.target.value)}
               onKeyPress={handleKeyPress}
-              disabled={sendMessageMutation.isPending}
+              disabled={isStreaming}
               className="text-sm!"
             />
             <Button
               icon={<LuSend className="w-4 h-4" />}
               type="primary"
               onClick={handleSendMessage}
-              disabled={!messagesInput.trim() || sendMessageMutation.isPending}
-              loading={sendMessageMutation.isPending}
+              disabled={!messagesInput.trim() || isStreaming}
+              loading={isStreaming}
               className="w-9! h-9! min-w-9! rounded-lg!"
             />
           </div>
@@ -1,4 +1,4 @@
-import { IChatRequest, IChatResponse, IError } from '@/types';
+import { IChatRequest, IChatResponse, IChatStreamEvent, IError } from '@/types';
 import { useMutation } from '@tanstack/react-query';
 import axios, { AxiosError } from 'axios';
 
@@ -18,6 +18,52 @@ export const useSendChatMessageMutation = () =>
     },
   });
 
+// Stream a chat turn from /chat/stream (Server-Sent Events over a POST request),
+// calling onEvent for every typed event until the final 'done' or 'error' event
+export const streamChatMessage = async (
+  data: IChatRequest,
+  onEvent: (event: IChatStreamEvent) => void,
+  signal?: AbortSignal,
+): Promise<void> => {
+  const baseURL = (ChatAPI.defaults.baseURL || '').replace(/\/$/, '');
+  const response = await fetch(`${baseURL}/chat/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(data),
+    signal,
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Chat stream failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) {
+      return;
+    }
+    buffer += decoder.decode(value, { stream: true });
+
+    // SSE events are separated by a blank line
+    const parts = buffer.split('\n\n');
+    buffer = parts.pop() ?? '';
+    for (const part of parts) {
+      const line = part.split('\n').find((item) => item.startsWith('data: '));
+      if (!line) {
+        continue;
+      }
+      const payload = line.slice('data: '.length);
+      if (payload === '[DONE]') {
+        await reader.cancel();
+        return;
+      }
+      onEvent(JSON.parse(payload) as IChatStreamEvent);
+    }
+  }
+};
+
 export const useClearChatHistoryMutation = () =>
   useMutation<void, AxiosError<IError>, number>({
     mutationFn: async (rm_id: number) => {
@@ -14,3 +14,32 @@ export interface IChatResponse {
   message: string;
 }
 
+
+export type IChatStreamEventType =
+  | 'token'
+  | 'tool_start'
+  | 'tool_end'
+  | 'keepalive'
+  | 'done'
+  | 'error';
+
+export interface IChatStreamEvent {
+  type: IChatStreamEventType;
+  done: boolean;
+  interrupted: boolean;
+  // token, done, error
+  content?: string;
+  // tool_start, tool_end
+  tool?: string;
+  tool_call_id?: string;
+  // tool_end
+  status?: 'succeeded' | 'failed';
+  duration_ms?: number | null;
+}
+
+export interface IChatToolProgress {
+  id: string;
+  tool: string;
+  status: 'running' | 'succeeded' | 'failed';
+  durationMs?: number | null;
+}
@@ -0,0 +1,250 @@
+"""Admission control for chat requests.
+
+Requests on the same conversation thread run one at a time: each thread has its
+own asyncio lock and a bounded queue of waiting requests. Across threads, a
+global limit caps the number of graph runs in flight. Requests that cannot be
+queued are rejected immediately instead of piling up:
+
+- ``ThreadQueueFull`` (HTTP 429) when the RM already has too many requests waiting;
+- ``ServerBusy`` (HTTP 503) when too many requests are waiting overall or a
+  request waited longer than the queue timeout.
+
+The per-thread lock is taken before the global slot, so a burst from one RM
+waits on its own thread and does not hold global slots others could use. With
+a shared store (multi-worker mode) an admitted request also takes the thread's
+lease, which serializes the thread across worker processes. The lease is
+renewed in the background while the request holds it, so a long run does not
+lose it to the expiry meant for crashed workers.
+"""
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from .shared_store import SharedStore
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """A request was not admitted; ``status_code`` is the HTTP status to return."""
+
+    status_code = 503
+
+
+class ThreadQueueFull(AdmissionRejected):
+    """Too many requests are already queued on the thread."""
+
+    status_code = 429
+
+
+class ServerBusy(AdmissionRejected):
+    """The global queue is full or the request waited too long."""
+
+    status_code = 503
+
+
+class _ThreadQueue:
+    """Lock of one thread plus the number of requests holding or waiting for it."""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.depth = 0
+
+
+class Ticket:
+    """An admitted request. Releasing it more than once is a no-op."""
+
+    def __init__(
+        self,
+        controller: "AdmissionController",
+        thread_id: str,
+        waited: float,
+        lease: Optional[str] = None,
+        renewal: Optional["asyncio.Task[None]"] = None,
+    ):
+        self.controller = controller
+        self.thread_id = thread_id
+        self.waited = waited
+        self.lease = lease
+        self.renewal = renewal
+        self._released = False
+
+    async def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        if self.renewal is not None:
+            self.renewal.cancel()
+        await self.controller._release(self.thread_id, self.lease)
+
+
+class AdmissionController:
+    """Per-thread serialization with bounded queues and a global concurrency limit."""
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_waiting: int = 256,
+        max_queued_per_thread: int = 2,
+        queue_timeout: float = 30,
+        window: int = 1000,
+        store: Optional[SharedStore] = None,
+    ):
+        """
+        Args:
+            max_concurrent: Graph runs in flight across all threads
+            max_waiting: Requests waiting (for their thread or a global slot) before
+                new ones are rejected with 503
+            max_queued_per_thread: Requests waiting behind the running one on a
+                thread before new ones are rejected with 429
+            queue_timeout: Seconds a request may wait before it is rejected with 503
+            window: Number of recent wait times kept for the percentiles
+            store: Shared store holding the thread leases of all worker processes
+        """
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.max_queued_per_thread = max_queued_per_thread
+        self.queue_timeout = queue_timeout
+        self.store = store
+        self._slots = asyncio.Semaphore(max_concurrent)
+        self._threads: Dict[str, _ThreadQueue] = {}
+        self._wait_times: Deque[float] = deque(maxlen=window)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = {"thread_queue_full": 0, "busy": 0, "timeout": 0}
+
+    async def _acquire(self, thread_id: str, queue: _ThreadQueue) -> Optional[str]:
+        await queue.lock.acquire()
+        try:
+            await self._slots.acquire()
+            try:
+                if self.store is None:
+                    return None
+                # Another worker process may be running the same thread
+                return await self.store.acquire_lease(thread_id)
+            except BaseException:
+                self._slots.release()
+                raise
+        except BaseException:
+            queue.lock.release()
+            raise
+
+    async def acquire(self, thread_id: str) -> Ticket:
+        """
+        Wait for the thread's turn and a global slot.
+
+        Raises:
+            ThreadQueueFull: The thread's queue is full
+            ServerBusy: The global queue is full or the wait timed out
+        """
+        queue = self._threads.get(thread_id)
+        if queue is not None and queue.depth > self.max_queued_per_thread:
+            self.rejected["thread_queue_full"] += 1
+            raise ThreadQueueFull(f"Too many requests queued for thread {thread_id}")
+        if self.waiting >= self.max_waiting:
+            self.rejected["busy"] += 1
+            raise ServerBusy("Too many requests waiting")
+
+        if queue is None:
+            queue = self._threads[thread_id] = _ThreadQueue()
+        queue.depth += 1
+        self.waiting += 1
+        start = time.monotonic()
+        try:
+            async with asyncio.timeout(self.queue_timeout if self.queue_timeout > 0 else None):
+                lease = await self._acquire(thread_id, queue)
+        except TimeoutError:
+            self._leave(thread_id, queue)
+            self.rejected["timeout"] += 1
+            raise ServerBusy(f"Request waited more than {self.queue_timeout}s") from None
+        except BaseException:
+            self._leave(thread_id, queue)
+            raise
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - start
+        self._wait_times.append(waited)
+        self.active += 1
+        self.admitted += 1
+        renewal = None
+        if lease is not None:
+            renewal = asyncio.create_task(self._renew_lease(thread_id, lease))
+        return Ticket(self, thread_id, waited, lease, renewal)
+
+    async def _renew_lease(self, thread_id: str, lease: str) -> None:
+        """Keep a lease from expiring until the ticket is released (cancels this task)."""
+        assert self.store is not None
+        interval = self.store.lease_seconds / 3
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                renewed = await self.store.renew_lease(thread_id, lease)
+            except Exception as e:
+                # Retried at the next interval; the lease is still valid until then
+                logger.warning("Failed to renew lease on %s: %s", thread_id, e)
+                continue
+            if not renewed:
+                logger.error("Lease on %s expired while the request was running", thread_id)
+                return
+
+    def _leave(self, thread_id: str, queue: _ThreadQueue) -> None:
+        queue.depth -= 1
+        if queue.depth == 0:
+            del self._threads[thread_id]
+
+    async def _release(self, thread_id: str, lease: Optional[str]) -> None:
+        queue = self._threads[thread_id]
+        self.active -= 1
+        try:
+            if lease is not None and self.store is not None:
+                await self.store.release_lease(thread_id, lease)
+        except Exception as e:
+            # The lease expires on its own
+            logger.warning("Failed to release lease on %s: %s", thread_id, e)
+        finally:
+            self._slots.release()
+            queue.lock.release()
+            self._leave(thread_id, queue)
+
+    @asynccontextmanager
+    async def slot(self, thread_id: str) -> AsyncIterator[Ticket]:
+        """Hold the thread's turn and a global slot for the duration of the block."""
+        ticket = await self.acquire(thread_id)
+        try:
+            yield ticket
+        finally:
+            await ticket.release()
+
+    def queue_depth(self, thread_id: str) -> int:
+        """Requests running or waiting on a thread."""
+        queue: Optional[_ThreadQueue] = self._threads.get(thread_id)
+        return queue.depth if queue is not None else 0
+
+    def stats(self) -> dict:
+        """Queue depths, wait times (ms) and rejection counters for monitoring."""
+        waits = sorted(self._wait_times)
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 2)
+
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "threads": len(self._threads),
+            "max_thread_queue_depth": max((queue.depth - 1 for queue in self._threads.values()), default=0),
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "wait_ms": {
+                "p50": percentile(0.5),
+                "p99": percentile(0.99),
+                "max": percentile(1.0),
+            },
+        }
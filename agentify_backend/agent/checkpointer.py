@@ -0,0 +1,351 @@
+"""Checkpointer backends for the agent graph.
+
+Two modes are available, selected with ``settings.checkpointer_backend``:
+
+- ``memory``: in-process storage with a cap on the number of threads (least
+  recently used threads are evicted, those waiting on a confirmation last) and
+  on the checkpoint history kept per thread.
+- ``sqlite``: a SQLite database in WAL mode, persistent across restarts and
+  usable on a single node without outside services.
+
+``CheckpointCompactor`` periodically trims the history of every conversation
+thread on either backend.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata
+from langgraph.checkpoint.memory import MemorySaver
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# Channel under which LangGraph stores the payload of a pending interrupt
+INTERRUPT_CHANNEL = "__interrupt__"
+
+
+class BoundedMemorySaver(MemorySaver):
+    """In-memory checkpointer with bounded thread count and per-thread history."""
+
+    def __init__(self, max_threads: int = 1000, max_checkpoints_per_thread: int = 20, **kwargs):
+        """
+        Args:
+            max_threads: Maximum number of threads kept; the least recently
+                written thread is evicted beyond it (<= 0 disables)
+            max_checkpoints_per_thread: Checkpoints kept per thread and
+                namespace; older ones are pruned on write (<= 0 disables)
+        """
+        super().__init__(**kwargs)
+        self.max_threads = max_threads
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self._thread_order: "OrderedDict[str, None]" = OrderedDict()
+        # thread ID -> (checkpoint NS, checkpoint ID) -> channel versions referenced
+        self._versions: Dict[str, Dict[Tuple[str, str], Set[Tuple[str, object]]]] = {}
+        self.evicted_threads = 0
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Save a checkpoint, then enforce the history and thread caps."""
+        next_config = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        self._versions.setdefault(thread_id, {})[(checkpoint_ns, checkpoint["id"])] = set(
+            checkpoint["channel_versions"].items()
+        )
+
+        self._thread_order[thread_id] = None
+        self._thread_order.move_to_end(thread_id)
+
+        if self.max_checkpoints_per_thread > 0:
+            if len(self.storage[thread_id][checkpoint_ns]) > self.max_checkpoints_per_thread:
+                self.prune_thread(thread_id, self.max_checkpoints_per_thread)
+
+        if self.max_threads > 0:
+            while len(self._thread_order) > self.max_threads:
+                self.delete_thread(self._eviction_candidate())
+                self.evicted_threads += 1
+        return next_config
+
+    def has_pending_interrupt(self, thread_id: str) -> bool:
+        """Whether the latest checkpoint of a thread holds a pending interrupt."""
+        checkpoints = self.storage.get(thread_id, {}).get("")
+        if not checkpoints:
+            return False
+        writes = self.writes.get((thread_id, "", max(checkpoints)), {})
+        return any(channel == INTERRUPT_CHANNEL for _, channel, _, _ in writes.values())
+
+    def _eviction_candidate(self) -> str:
+        """Least recently written thread, skipping those with a pending interrupt while others remain."""
+        for thread_id in self._thread_order:
+            if not self.has_pending_interrupt(thread_id):
+                return thread_id
+        return next(iter(self._thread_order))
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Delete all checkpoints, writes and blobs of a thread."""
+        super().delete_thread(thread_id)
+        self._thread_order.pop(thread_id, None)
+        self._versions.pop(thread_id, None)
+
+    def prune_thread(self, thread_id: str, keep: int, protected: Optional[Set[str]] = None) -> int:
+        """
+        Drop all but the latest ``keep`` checkpoints of a thread.
+
+        Args:
+            thread_id: Thread identifier
+            keep: Number of most recent checkpoints kept per namespace
+            protected: Checkpoint IDs that must be kept regardless of age
+
+        Returns:
+            Number of serialized bytes released
+        """
+        protected = protected or set()
+        thread_versions = self._versions.get(thread_id, {})
+        reclaimed = 0
+
+        for checkpoint_ns, checkpoints in list(self.storage.get(thread_id, {}).items()):
+            # Checkpoint IDs are time-ordered, so sorting puts the latest last
+            ordered = sorted(checkpoints)
+            dropped = [
+                checkpoint_id
+                for checkpoint_id in ordered[:max(len(ordered) - keep, 0)]
+                if checkpoint_id not in protected
+            ]
+            if not dropped:
+                continue
+
+            released_versions: Set[Tuple[str, object]] = set()
+            for checkpoint_id in dropped:
+                checkpoint, metadata, _ = checkpoints.pop(checkpoint_id)
+                reclaimed += len(checkpoint[1]) + len(metadata[1])
+                for _, _, value, _ in self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), {}).values():
+                    reclaimed += len(value[1])
+                released_versions |= thread_versions.pop((checkpoint_ns, checkpoint_id), set())
+
+            # Only drop blobs that no remaining checkpoint still points to
+            for (ns, _), versions in thread_versions.items():
+                if ns == checkpoint_ns:
+                    released_versions -= versions
+            for channel, version in released_versions:
+                blob = self.blobs.pop((thread_id, checkpoint_ns, channel, version), None)
+                if blob is not None:
+                    reclaimed += len(blob[1])
+        return reclaimed
+
+    def compact(self, keep: int, thread_prefix: str = "") -> dict:
+        """
+        Prune every thread to its latest ``keep`` checkpoints.
+
+        Checkpoints holding a pending interrupt are always kept.
+
+        Args:
+            keep: Number of most recent checkpoints kept per thread and namespace
+            thread_prefix: Only threads whose ID starts with this prefix are compacted
+
+        Returns:
+            Report with the threads visited, checkpoints removed and bytes reclaimed
+        """
+        protected: Dict[str, Set[str]] = {}
+        for (thread_id, _, checkpoint_id), writes in self.writes.items():
+            if any(channel == INTERRUPT_CHANNEL for _, channel, _, _ in writes.values()):
+                protected.setdefault(thread_id, set()).add(checkpoint_id)
+
+        report = {"threads": 0, "checkpoints_removed": 0, "bytes_reclaimed": 0}
+        for thread_id in list(self.storage):
+            if not thread_id.startswith(thread_prefix):
+                continue
+            before = sum(len(checkpoints) for checkpoints in self.storage[thread_id].values())
+            report["bytes_reclaimed"] += self.prune_thread(thread_id, keep, protected.get(thread_id))
+            after = sum(len(checkpoints) for checkpoints in self.storage[thread_id].values())
+            report["threads"] += 1
+            report["checkpoints_removed"] += before - after
+        return report
+
+
+async def compact_sqlite(checkpointer: BaseCheckpointSaver, keep: int, thread_prefix: str = "") -> dict:
+    """
+    Delete all but the latest ``keep`` checkpoints per thread from an AsyncSqliteSaver.
+
+    Checkpoints holding a pending interrupt are always kept.
+
+    Returns:
+        Report with the threads visited, checkpoints removed and bytes reclaimed
+    """
+    like = thread_prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+    conn = checkpointer.conn  # type: ignore[attr-defined]
+    await checkpointer.setup()  # type: ignore[attr-defined]
+    async with checkpointer.lock:  # type: ignore[attr-defined]
+        await conn.execute("DROP TABLE IF EXISTS temp.compaction_doomed")
+        await conn.execute(
+            """
+            CREATE TEMP TABLE compaction_doomed AS
+            SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+                SELECT thread_id, checkpoint_ns, checkpoint_id,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                       ) AS recency
+                FROM checkpoints
+                WHERE thread_id LIKE ? ESCAPE '\\'
+            ) AS ranked
+            WHERE recency > ?
+              AND NOT EXISTS (
+                  SELECT 1 FROM writes
+                  WHERE writes.thread_id = ranked.thread_id
+                    AND writes.checkpoint_ns = ranked.checkpoint_ns
+                    AND writes.checkpoint_id = ranked.checkpoint_id
+                    AND writes.channel = ?
+              )
+            """,
+            (like, keep, INTERRUPT_CHANNEL),
+        )
+        async with conn.execute(
+            """
+            SELECT
+                (SELECT COUNT(DISTINCT thread_id) FROM checkpoints WHERE thread_id LIKE ? ESCAPE '\\'),
+                (SELECT COUNT(*) FROM compaction_doomed),
+                (SELECT COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) FROM checkpoints
+                 WHERE (thread_id, checkpoint_ns, checkpoint_id) IN compaction_doomed),
+                (SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes
+                 WHERE (thread_id, checkpoint_ns, checkpoint_id) IN compaction_doomed)
+            """,
+            (like,),
+        ) as cursor:
+            threads, removed, checkpoint_bytes, write_bytes = await cursor.fetchone()
+        await conn.execute(
+            "DELETE FROM writes WHERE (thread_id, checkpoint_ns, checkpoint_id) IN compaction_doomed"
+        )
+        await conn.execute(
+            "DELETE FROM checkpoints WHERE (thread_id, checkpoint_ns, checkpoint_id) IN compaction_doomed"
+        )
+        await conn.execute("DROP TABLE temp.compaction_doomed")
+        await conn.commit()
+    return {
+        "threads": threads,
+        "checkpoints_removed": removed,
+        "bytes_reclaimed": checkpoint_bytes + write_bytes,
+    }
+
+
+class CheckpointCompactor:
+    """Background job keeping only the latest checkpoints of each thread."""
+
+    def __init__(
+        self,
+        checkpointer: BaseCheckpointSaver,
+        keep: int = 20,
+        interval: float = 600,
+        thread_prefix: str = "rm_",
+    ):
+        """
+        Args:
+            checkpointer: BoundedMemorySaver or AsyncSqliteSaver to compact
+            keep: Number of most recent checkpoints kept per thread
+            interval: Seconds between compaction runs (<= 0 disables)
+            thread_prefix: Only threads whose ID starts with this prefix are compacted
+        """
+        self.checkpointer = checkpointer
+        self.keep = max(1, keep)
+        self.interval = interval
+        self.thread_prefix = thread_prefix
+        self.runs = 0
+        self.total_bytes_reclaimed = 0
+        self.last_report: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def compact(self) -> dict:
+        """Run one compaction pass and return its report."""
+        started = time.perf_counter()
+        if isinstance(self.checkpointer, BoundedMemorySaver):
+            report = self.checkpointer.compact(self.keep, self.thread_prefix)
+        elif hasattr(self.checkpointer, "conn"):
+            report = await compact_sqlite(self.checkpointer, self.keep, self.thread_prefix)
+        else:
+            raise TypeError(f"Compaction is not supported for {type(self.checkpointer).__name__}")
+        report["duration_ms"] = (time.perf_counter() - started) * 1000
+        self.runs += 1
+        self.total_bytes_reclaimed += report["bytes_reclaimed"]
+        self.last_report = report
+        logger.info(
+            "Checkpoint compaction: %d checkpoints removed from %d threads, %d bytes reclaimed",
+            report["checkpoints_removed"], report["threads"], report["bytes_reclaimed"],
+        )
+        return report
+
+    async def _compact_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.compact()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Checkpoint compaction failed: %s", e)
+
+    def start(self) -> None:
+        """Start the background compaction task."""
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._compact_loop())
+
+    async def stop(self) -> None:
+        """Cancel the background compaction task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        """Compaction counters for monitoring."""
+        return {
+            "runs": self.runs,
+            "keep": self.keep,
+            "total_bytes_reclaimed": self.total_bytes_reclaimed,
+            "last_report": self.last_report,
+        }
+
+
+async def create_checkpointer() -> BaseCheckpointSaver:
+    """Create the checkpointer configured in ``settings.checkpointer_backend``."""
+    backend = settings.checkpointer_backend.lower()
+    if backend == "memory":
+        return BoundedMemorySaver(
+            max_threads=settings.checkpointer_max_threads,
+            max_checkpoints_per_thread=settings.checkpointer_max_checkpoints_per_thread,
+        )
+    if backend == "sqlite":
+        import aiosqlite
+        from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+
+        conn = await aiosqlite.connect(settings.checkpointer_sqlite_path)
+        # WAL lets readers proceed while a checkpoint is being written
+        await conn.execute("PRAGMA journal_mode=WAL")
+        await conn.execute("PRAGMA synchronous=NORMAL")
+        # Other worker processes may be writing the same database
+        await conn.execute(f"PRAGMA busy_timeout={int(settings.shared_state_busy_timeout_ms)}")
+        saver = AsyncSqliteSaver(conn)
+        await saver.setup()
+        return saver
+    raise ValueError(
+        f"Unknown checkpointer backend '{settings.checkpointer_backend}'. Use 'memory' or 'sqlite'."
+    )
+
+
+async def close_checkpointer(checkpointer: BaseCheckpointSaver) -> None:
+    """Release resources held by a checkpointer (database connections)."""
+    conn = getattr(checkpointer, "conn", None)
+    if conn is not None:
+        await conn.close()
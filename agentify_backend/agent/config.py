@@ -1,4 +1,6 @@
 """Configuration management for the agent backend."""
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,9 +8,67 @@ class Settings(BaseSettings):
     
     # OpenAI Configuration
     openai_api_key: str = ""
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_connect_timeout_seconds: float = 5
+    openai_read_timeout_seconds: float = 60
+    openai_max_retries: int = 3
+    openai_retry_initial_delay_seconds: float = 0.5
+    openai_retry_max_delay_seconds: float = 8
+    openai_retry_budget_ratio: float = 0.2
     
     # MCP Server Configuration
     mcp_server_url: str = "http://localhost:3000/mcp"
+    tool_catalog_refresh_seconds: int = 300
+    mcp_pool_max_connections: int = 100
+    mcp_pool_max_keepalive_connections: int = 20
+    mcp_pool_keepalive_seconds: float = 60
+    mcp_http2: bool = False  # requires the h2 package
+    mcp_max_sessions: int = 256
+    mcp_session_idle_seconds: float = 300
+    # Read tool results cached per tool for these many seconds (tools not listed are not cached)
+    tool_cache_ttl_seconds: Dict[str, float] = {
+        "find_customer": 300,
+        "find_card_product": 3600,
+        "find_rm_task": 60,
+        "report_performance": 60,
+    }
+    tool_cache_max_entries: int = 10000
+    tool_call_max_concurrency: int = 4
+    
+    # Context Configuration
+    context_token_budget: int = 16000
+    context_summary_model: str = "gpt-4o-mini"
+    tool_result_max_list_items: int = 20
+    tool_result_max_string_chars: int = 4000
+    
+    # Response Cache Configuration (answers to repeated read-only questions)
+    response_cache_enabled: bool = False
+    response_cache_ttl_seconds: float = 300
+    response_cache_max_entries_per_rm: int = 50
+    
+    # Checkpointer Configuration ("memory" or "sqlite")
+    checkpointer_backend: str = "memory"
+    checkpointer_sqlite_path: str = "checkpoints.sqlite"
+    checkpointer_max_threads: int = 1000
+    checkpointer_max_checkpoints_per_thread: int = 20
+    checkpointer_compaction_keep: int = 20
+    checkpointer_compaction_interval_seconds: int = 600
+    
+    # Multi-worker Configuration (APP_WORKERS > 1 requires the sqlite checkpointer)
+    shared_state_sqlite_path: str = "shared_state.sqlite"
+    shared_state_busy_timeout_ms: int = 5000
+    thread_lease_seconds: float = 300
+    
+    # Request Admission Configuration
+    max_concurrent_requests: int = 32
+    max_waiting_requests: int = 256
+    max_queued_requests_per_rm: int = 2
+    request_queue_timeout_seconds: float = 30
+    chat_request_timeout_seconds: float = 120
+    
+    # Streaming Configuration
+    stream_keepalive_seconds: float = 15
     
     # PostgreSQL Configuration
     postgres_host: str = "localhost"
@@ -20,6 +80,7 @@ class Settings(BaseSettings):
     # Application Configuration
     app_port: int = 8000
     app_host: str = "0.0.0.0"
+    app_workers: int = 1
     log_level: str = "INFO"
     
     class Config:
@@ -0,0 +1,262 @@
+"""Token-budgeted prompt construction with a running summary of evicted turns."""
+import json
+import logging
+from typing import Dict, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AnyMessage, HumanMessage, SystemMessage
+
+from .message_window import iter_selected, select_messages
+from .state import AgentState, ContextState
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead of the chat format (role and separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+# Characters of each tool result passed to the summarizer
+SUMMARY_TOOL_RESULT_CHARS = 1000
+# Tokens a tool result is never cut below when the newest turn is over the budget
+MIN_TOOL_RESULT_TOKENS = 100
+
+SUMMARY_PROMPT = (
+    "Bạn đang duy trì bản tóm tắt cuộc hội thoại giữa Quản lý Quan hệ Khách hàng (RM) và trợ lý. "
+    "Cập nhật bản tóm tắt hiện có với các lượt hội thoại mới bên dưới. Giữ lại các thông tin cần cho "
+    "các câu hỏi tiếp theo: tên và ID khách hàng, ID task, ngày tháng, kết quả công cụ quan trọng và "
+    "các yêu cầu chưa hoàn thành. Trả lời bằng bản tóm tắt ngắn gọn, không thêm lời dẫn."
+)
+
+
+class TokenCounter:
+    """Counts tokens locally with tiktoken, falling back to a length heuristic."""
+
+    def __init__(self, model: str = "gpt-4o"):
+        try:
+            import tiktoken
+
+            self._encoding = tiktoken.encoding_for_model(model)
+        except Exception as e:
+            # The BPE file may be unavailable offline; ~4 characters per token
+            logger.warning("tiktoken encoding unavailable (%s), estimating tokens from length", e)
+            self._encoding = None
+
+    def count_text(self, text: str) -> int:
+        if self._encoding is None:
+            return len(text) // 4 + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def count_message(self, message: AnyMessage) -> int:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+        tokens = self.count_text(content) + MESSAGE_OVERHEAD_TOKENS
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            tokens += self.count_text(json.dumps(tool_calls, ensure_ascii=False, default=str))
+        return tokens
+
+
+def truncate_message(message: AnyMessage, max_chars: int) -> AnyMessage:
+    """Copy of a message with its text content cut to ``max_chars`` characters."""
+    content = message.content
+    if not isinstance(content, str) or len(content) <= max_chars:
+        return message
+    omitted = len(content) - max_chars
+    return message.model_copy(update={"content": content[:max_chars] + f"... ({omitted} more characters omitted)"})
+
+
+def format_for_summary(messages: List[AnyMessage]) -> str:
+    """Render evicted messages as plain text for the summarizer."""
+    lines = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content, ensure_ascii=False)
+        if message.type == "tool":
+            lines.append(f"[công cụ] {content[:SUMMARY_TOOL_RESULT_CHARS]}")
+        elif message.type == "human":
+            lines.append(f"[RM] {content}")
+        else:
+            tool_calls = getattr(message, "tool_calls", None)
+            if tool_calls:
+                calls = ", ".join(f"{call['name']}({json.dumps(call.get('args', {}), ensure_ascii=False)})" for call in tool_calls)
+                lines.append(f"[trợ lý gọi công cụ] {calls}")
+            if content:
+                lines.append(f"[trợ lý] {content}")
+    return "\n".join(lines)
+
+
+class ContextBuilder:
+    """Keeps the prompt within a token budget.
+
+    The newest turns are kept verbatim for as long as they fit in the budget.
+    Older turns are folded into a running summary, which is stored in state and
+    sent in their place. Eviction always happens at a human message so that tool
+    calls stay paired with their results. The newest turn is always sent; when
+    it alone is over the budget (or the thread has no human message to cut at),
+    its tool results are cut down instead.
+    """
+
+    def __init__(self, summary_llm: BaseChatModel, token_budget: int, model: str = "gpt-4o"):
+        """
+        Args:
+            summary_llm: Model used to fold evicted turns into the summary
+            token_budget: Maximum tokens of conversation history (summary plus
+                kept messages) sent to the assistant model
+            model: Assistant model name, selects the tokenizer
+        """
+        self.summary_llm = summary_llm
+        self.token_budget = token_budget
+        self.counter = TokenCounter(model)
+
+    async def summarize(self, summary: str, messages: List[AnyMessage]) -> str:
+        """Fold messages into the running summary."""
+        prompt = [
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(
+                content=f"Bản tóm tắt hiện có:\n{summary or '(trống)'}\n\n"
+                f"Các lượt hội thoại mới:\n{format_for_summary(messages)}"
+            ),
+        ]
+        response = await self.summary_llm.ainvoke(prompt)
+        return str(response.content).strip()
+
+    def shrink(
+        self,
+        messages: List[AnyMessage],
+        kept: List[int],
+        token_counts: List[int],
+        available: int,
+    ) -> Dict[int, int]:
+        """
+        Cut the kept tool results so that the kept messages fit in ``available`` tokens.
+
+        The largest results are cut to a common token cap, never below
+        MIN_TOOL_RESULT_TOKENS; other messages are sent as they are.
+
+        Returns:
+            Character limit by message index, for the results that are cut
+        """
+        tools = [
+            index for index in kept
+            if messages[index].type == "tool" and isinstance(messages[index].content, str)
+        ]
+        tool_set = set(tools)
+        room = available - sum(token_counts[index] for index in kept if index not in tool_set)
+        # Spread the room over the results, smallest first; the rest share what is left
+        cap = None
+        remaining = room
+        counts = sorted(token_counts[index] for index in tools)
+        for position, count in enumerate(counts):
+            share = remaining // (len(counts) - position)
+            if count > share:
+                cap = share
+                break
+            remaining -= count
+        if cap is None:
+            return {}
+        cap = max(cap, MIN_TOOL_RESULT_TOKENS)
+
+        limits: Dict[int, int] = {}
+        for index in tools:
+            count = token_counts[index]
+            if count <= cap:
+                continue
+            max_chars = len(messages[index].content)  # type: ignore[arg-type]
+            # Tokens are not proportional to characters; a few corrections get within the cap
+            for _ in range(4):
+                max_chars = int(max_chars * cap / count)
+                count = self.counter.count_message(truncate_message(messages[index], max_chars))
+                if count <= cap:
+                    break
+            limits[index] = max_chars
+        return limits
+
+    async def build(self, state: AgentState) -> ContextState:
+        """
+        Choose the messages to send and update the running summary.
+
+        Expects ``state["message_window"]`` to be up to date.
+        """
+        messages = state["messages"]
+        previous: Optional[ContextState] = state.get("context")
+        if previous is None or len(previous["token_counts"]) > len(messages):
+            previous = ContextState(summary="", summarized_upto=0, token_counts=[], kept=[], truncated=[], metrics={})
+
+        # Count tokens of new messages only
+        token_counts = list(previous["token_counts"])
+        for message in messages[len(token_counts):]:
+            token_counts.append(self.counter.count_message(message))
+
+        selected = list(iter_selected(messages, state["message_window"], previous["summarized_upto"]))
+        selected.reverse()
+        summary = previous["summary"]
+        fixed_tokens = self.counter.count_text(summary) + MESSAGE_OVERHEAD_TOKENS if summary else 0
+        available = self.token_budget - fixed_tokens
+
+        # Walk back from the newest message, cutting only at human messages
+        cut = len(selected)
+        running = 0
+        for position in range(len(selected) - 1, -1, -1):
+            running += token_counts[selected[position]]
+            if messages[selected[position]].type != "human":
+                continue
+            if running > available and cut < len(selected):
+                break
+            cut = position
+        if cut == len(selected):
+            cut = 0
+
+        summarized_upto = previous["summarized_upto"]
+        evicted = selected[:cut]
+        if evicted:
+            try:
+                summary = await self.summarize(summary, [messages[index] for index in evicted])
+                summarized_upto = selected[cut] if cut < len(selected) else len(messages)
+            except Exception as e:
+                # Send the evicted turns verbatim rather than losing them
+                logger.warning("Failed to summarize evicted turns: %s", e)
+                cut = 0
+                evicted = []
+
+        kept = selected[cut:]
+        summary_tokens = self.counter.count_text(summary) + MESSAGE_OVERHEAD_TOKENS if summary else 0
+        available = self.token_budget - summary_tokens
+        limits: Dict[int, int] = {}
+        if sum(token_counts[index] for index in kept) > available:
+            limits = self.shrink(messages, kept, token_counts, available)
+        prompt_tokens = summary_tokens + sum(
+            self.counter.count_message(truncate_message(messages[index], limits[index]))
+            if index in limits else token_counts[index]
+            for index in kept
+        )
+        if prompt_tokens > self.token_budget:
+            logger.warning("Newest turn is over the token budget (%d > %d)", prompt_tokens, self.token_budget)
+        return ContextState(
+            summary=summary,
+            summarized_upto=summarized_upto,
+            token_counts=token_counts,
+            kept=kept,
+            truncated=[[index, max_chars] for index, max_chars in limits.items()],
+            metrics={
+                "prompt_tokens": prompt_tokens,
+                "token_budget": self.token_budget,
+                "summary_tokens": summary_tokens,
+                "messages_sent": len(kept),
+                "messages_evicted": len(evicted),
+                "messages_truncated": len(limits),
+            },
+        )
+
+
+def build_prompt(state: AgentState, system_message: SystemMessage) -> List[AnyMessage]:
+    """Assemble the system prompt, running summary and kept messages."""
+    context: Optional[ContextState] = state.get("context")
+    if context is None:
+        return [system_message] + select_messages(state)
+    prompt: List[AnyMessage] = [system_message]
+    if context["summary"]:
+        prompt.append(SystemMessage(content="Tóm tắt các lượt hội thoại trước:\n" + context["summary"]))
+    messages = state["messages"]
+    # Stored before tool results were cut to the budget
+    limits = dict(context.get("truncated") or [])
+    prompt.extend(
+        truncate_message(messages[index], limits[index]) if index in limits else messages[index]
+        for index in context["kept"]
+    )
+    return prompt
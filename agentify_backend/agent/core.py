@@ -1,9 +1,9 @@
 """Core agent implementation using LangGraph and MCP tools."""
-import json
+import asyncio
+import time
 from datetime import datetime
-from typing import List, Optional, AsyncGenerator
+from typing import Any, AsyncGenerator, List, Optional
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import (
     SystemMessage,
     HumanMessage,
@@ -11,14 +11,38 @@ from langchain_core.messages import (
     AIMessageChunk,
     AnyMessage,
 )
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableConfig, RunnablePassthrough
+from langchain_core.tools import BaseTool
+from langgraph.config import get_config
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.graph import StateGraph, START, END, MessagesState
-from langgraph.prebuilt import ToolNode, tools_condition
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.prebuilt import tools_condition
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.types import interrupt, Command
 from langchain_mcp_adapters.client import MultiServerMCPClient  # type: ignore
+from langchain_mcp_adapters.interceptors import MCPToolCallRequest  # type: ignore
 
+from .checkpointer import BoundedMemorySaver, CheckpointCompactor
 from .config import settings
+from .context_builder import ContextBuilder, build_prompt
+from .interrupts import InterruptIndex, SharedInterruptIndex
+from .llm_client import DeadlineExceeded, LLMClient
+from .mcp_pool import MCPConnectionPool, MCPSessionPool
+from .message_window import update_message_window
+from .response_cache import ResponseCache, previous_answer
+from .shared_store import SharedStore
+from .state import AgentState
+from .stream_events import done_event, error_event, token_event, tool_events
+from .tool_cache import ToolResultCache
+from .tool_catalog import ToolCatalog
+from .tool_executor import ToolExecutor
+from .tool_results import ToolResultProjector, read_tool_result
+
+
+# Internal MCP tools performing the writes after approval; never bound to the LLM
+INTERNAL_TOOLS = ("_create_rm_task", "_update_rm_task")
+# Tools that change data (including the approval-gated ones bound to the LLM)
+MUTATING_TOOLS = frozenset({"create_rm_task", "update_rm_task", *INTERNAL_TOOLS})
 
 
 def get_today_date() -> str:
@@ -30,50 +54,40 @@ def get_today_date() -> str:
     return f"{day_of_week}, {month_name_full} {today.day}th, {today.year}"
 
 
-def get_messages(state: MessagesState) -> List[AnyMessage]:
+def get_rm_id(config: Optional[RunnableConfig]) -> Optional[int]:
+    """Read the Relationship Manager ID from the run config."""
+    if not config:
+        return None
+    rm_id = config.get("configurable", {}).get("rm_id")
+    return int(rm_id) if rm_id is not None else None
+
+
+async def rm_header_interceptor(request: MCPToolCallRequest, handler):
+    """Attach the x-rm-id header of the current run to every MCP tool call.
+    
+    The graph is shared by all RMs, so the RM identity cannot live in the MCP
+    client connection; it is taken from the run config of each invocation instead.
+    """
+    try:
+        rm_id = get_rm_id(get_config())
+    except RuntimeError:
+        # Called outside of a runnable context
+        rm_id = None
+    if rm_id is not None:
+        request = request.override(headers={**(request.headers or {}), "x-rm-id": str(rm_id)})
+    return await handler(request)
+
+
+def get_messages(state: AgentState) -> List[AnyMessage]:
     """Filter and prepare messages for the LLM."""
-    max_successful_tool_calls = 2
-    add_fail_tool_call = True
     system_message = SystemMessage(
         content="Hôm nay là " + get_today_date() + ".\n"
         "Bạn là trợ lý thông minh cho Quản lý Quan hệ Khách hàng (Relationship Manager) tại Việt Nam, "
         "được thiết kế để tối ưu hóa quy trình làm việc và cung cấp thông tin chi tiết dựa trên dữ liệu "
         "bằng cách sử dụng thành thạo bộ công cụ nội bộ."
     )
-    filtered_messages: List[AnyMessage] = []
-    
-    for message in reversed(state["messages"]):
-        if message.type == "human":
-            if len(filtered_messages) > 2 and filtered_messages[-2].type == "tool":
-                max_successful_tool_calls -= 1
-            filtered_messages.append(message)
-        if message.type == "tool":
-            # Parse tool response
-            try:
-                if isinstance(message.content, str):
-                    tool_result = json.loads(message.content)
-                else:
-                    tool_result = message.content
-                
-                tool_code = tool_result.get("code", "succeeded")
-                if tool_code == "succeeded":
-                    if add_fail_tool_call:
-                        add_fail_tool_call = False
-                    if max_successful_tool_calls > 0:
-                        filtered_messages.append(message)
-                else:
-                    if add_fail_tool_call:
-                        filtered_messages.append(message)
-            except (json.JSONDecodeError, AttributeError):
-                # If parsing fails, include the message anyway
-                if add_fail_tool_call:
-                    filtered_messages.append(message)
-        elif message.type == "ai":
-            if len(filtered_messages) == 0 or filtered_messages[-1].type != "ai":
-                filtered_messages.append(message)
-    
-    filtered_messages.append(system_message)
-    return filtered_messages[::-1]
+    # The selection and token budget are maintained in state (see message_window, context_builder)
+    return build_prompt(state, system_message)
 
 
 def postprocess_message(message: AnyMessage) -> List[AnyMessage]:
@@ -81,74 +95,61 @@ def postprocess_message(message: AnyMessage) -> List[AnyMessage]:
     return [message]
 
 
-def approval_node(state: MessagesState):
-    """Check if any tool results need user confirmation."""
-    last_message = state["messages"][-1]
+def find_tool_call(messages: List[AnyMessage], tool_call_id: str) -> Optional[dict]:
+    """Find the tool call with the given id in the latest assistant messages."""
+    for message in reversed(messages):
+        for tool_call in getattr(message, "tool_calls", None) or []:
+            if tool_call.get("id") == tool_call_id:
+                return tool_call
+    return None
+
+
+def approval_node(state: AgentState) -> dict:
+    """Ask the RM to confirm the tool call flagged by the latest tool round, if any.
     
-    if hasattr(last_message, 'type') and last_message.type == 'tool':
-        # Parse tool result
-        if isinstance(last_message.content, str):
-            try:
-                tool_result = json.loads(last_message.content)
-            except Exception:
-                return Command(goto="rm_assistant")
-        elif isinstance(last_message.content, dict):
-            tool_result = last_message.content
-        else:
-            return Command(goto="rm_assistant")
-        
-        # Check if confirmation is needed
-        if 'ask_confirmation' in tool_result:
-            ask_confirmation = tool_result.get('ask_confirmation', False)
-            if ask_confirmation:
-                # Interrupt and ask for user confirmation
-                prev_message = state["messages"][-2]
-                if hasattr(prev_message, "tool_calls") and prev_message.tool_calls:
-                    tool_call = prev_message.tool_calls[0]
-                    tool_name = tool_call.get("name", "unknown")
-                    tool_args = tool_call.get("args", {})
-                    tool_call_str = (
-                        tool_name + "(" +
-                        ", ".join([
-                            f"{k}='{v}'" if isinstance(v, str) else f"{k}={v}"
-                            for k, v in tool_args.items()
-                        ]) + ")"
-                    )
-                else:
-                    tool_call_str = "unknown_task"
-                ai_message = (
-                    "Hãy confirm task sau: " + tool_call_str + "\n"
-                    "Nhập 'yes' nếu muốn tiếp tục, 'no' nếu muốn hủy bỏ. "
-                    "Nếu nhập bất cứ điều gì khác, task sẽ bị hủy bỏ."
-                )
-                user_response = interrupt(ai_message)
-                user_response_str = str(user_response)
-                normalized_response = user_response_str.strip().lower()
-                if normalized_response == "yes":
-                    return Command(
-                        goto="proceed_confirmed_tool",
-                        update={
-                            "messages": [
-                                AIMessage(content=ai_message),
-                                HumanMessage(content=user_response_str),
-                            ]
-                        }
-                    )
-                else:
-                    return Command(
-                        goto="rm_assistant",
-                        update={
-                            "messages": [
-                                AIMessage(content=ai_message),
-                                HumanMessage(content=user_response_str),
-                            ]
-                        }
-                    )
-        else:
-            return Command(goto="rm_assistant")
+    The tool results were decoded once by the tools node, which records the call
+    asking for confirmation in ``pending_confirmation``; this node only reads it. The decision is stored in ``approval_route`` for route_after_approval.
+    """
+    tool_call_id = state.get("pending_confirmation")
+    if tool_call_id is None:
+        # No confirmation needed, continue normally
+        return {"approval_route": "rm_assistant"}
     
-    # No confirmation needed, continue normally
-    return Command(goto="rm_assistant")
+    # Interrupt and ask for user confirmation about the call that returned this result
+    tool_call = find_tool_call(state["messages"], tool_call_id)
+    if tool_call is not None:
+        tool_name = tool_call.get("name", "unknown")
+        tool_args = tool_call.get("args", {})
+        tool_call_str = (
+            tool_name + "(" +
+            ", ".join([
+                f"{k}='{v}'" if isinstance(v, str) else f"{k}={v}"
+                for k, v in tool_args.items()
+            ]) + ")"
+        )
+    else:
+        tool_call_str = "unknown_task"
+    ai_message = (
+        "Hãy confirm task sau: " + tool_call_str + "\n"
+        "Nhập 'yes' nếu muốn tiếp tục, 'no' nếu muốn hủy bỏ. "
+        "Nếu nhập bất cứ điều gì khác, task sẽ bị hủy bỏ."
+    )
+    user_response = interrupt(ai_message)
+    user_response_str = str(user_response)
+    normalized_response = user_response_str.strip().lower()
+    return {
+        "approval_route": "proceed_confirmed_tool" if normalized_response == "yes" else "rm_assistant",
+        "pending_confirmation": None,
+        "messages": [
+            AIMessage(content=ai_message),
+            HumanMessage(content=user_response_str),
+        ],
+    }
+
+
+def route_after_approval(state: AgentState) -> str:
+    """Route on the decision approval_node stored in state."""
+    return state.get("approval_route") or "rm_assistant"
 
 
 
@@ -156,72 +157,171 @@ def approval_node(state: MessagesState):
 class AgentCore:
     """Core agent implementation."""
     
-    def __init__(self):
-        """Initialize the agent with MCP tools and LLM."""
+    def __init__(
+        self,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+        store: Optional[SharedStore] = None,
+    ):
+        """
+        Initialize the agent with MCP tools and LLM.
+        
+        Args:
+            checkpointer: Checkpoint storage for conversation threads. Defaults to a
+                bounded in-memory saver; see agent.checkpointer.create_checkpointer.
+            store: State shared with other worker processes (multi-worker mode);
+                see agent.shared_store.create_shared_store.
+        """
+        # Connection pool, timeouts and retries shared by every OpenAI call
+        self.llm_client = LLMClient(
+            api_key=settings.openai_api_key,
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+            connect_timeout=settings.openai_connect_timeout_seconds,
+            read_timeout=settings.openai_read_timeout_seconds,
+            max_retries=settings.openai_max_retries,
+            retry_initial_delay=settings.openai_retry_initial_delay_seconds,
+            retry_max_delay=settings.openai_retry_max_delay_seconds,
+            retry_budget_ratio=settings.openai_retry_budget_ratio,
+        )
+        
         # Initialize OpenAI LLM
-        self.llm = ChatOpenAI(
+        self.llm = self.llm_client.chat_model("gpt-4o", temperature=0.7)
+        
+        # Keeps prompts within the token budget, summarizing evicted turns
+        self.context_builder = ContextBuilder(
+            self.llm_client.resilient(
+                self.llm_client.chat_model(settings.context_summary_model, temperature=0)
+            ).with_config(tags=[TAG_NOSTREAM]),
+            token_budget=settings.context_token_budget,
             model="gpt-4o",
-            api_key=settings.openai_api_key,
-            temperature=0.7,
         )
         
-        # Initialize MCP client (will be configured per request with RM ID)
+        # Shrinks tool results before they reach the LLM
+        self.tool_result_projector = ToolResultProjector(
+            max_list_items=settings.tool_result_max_list_items,
+            max_string_chars=settings.tool_result_max_string_chars,
+        )
+        
+        # Keep-alive HTTP connections to the MCP server, shared by every RM
+        self.mcp_connection_pool = MCPConnectionPool(
+            max_connections=settings.mcp_pool_max_connections,
+            max_keepalive_connections=settings.mcp_pool_max_keepalive_connections,
+            keepalive_expiry=settings.mcp_pool_keepalive_seconds,
+            http2=settings.mcp_http2,
+        )
+        mcp_connections = {
+            "tools": {
+                "transport": "streamable_http",
+                "url": settings.mcp_server_url,
+                "headers": {},
+                "httpx_client_factory": self.mcp_connection_pool.client_factory,
+            },
+        }
+        # Initialized MCP sessions reused between tool calls
+        self.mcp_sessions = MCPSessionPool(
+            mcp_connections,
+            max_sessions=settings.mcp_max_sessions,
+            idle_timeout=settings.mcp_session_idle_seconds,
+            mutating_tools=MUTATING_TOOLS,
+        )
+        
+        # Read tool results served from memory until their TTL or a task write
+        self.tool_cache = ToolResultCache(
+            settings.tool_cache_ttl_seconds,
+            max_entries=settings.tool_cache_max_entries,
+            store=store,
+        )
+        
+        # Initialize MCP client (the RM ID header is injected per tool call from the run config)
         self.mcp_client = MultiServerMCPClient(
-            {
-                "tools": {
-                    "transport": "streamable_http",
-                    "url": settings.mcp_server_url,
-                    "headers": {},  # Will be set per request
-                },
-            }
+            mcp_connections,
+            tool_interceptors=[rm_header_interceptor, self.tool_cache, self.mcp_sessions],
+        )
+        
+        # Cached tool list, refreshed in the background by the app lifespan
+        self.tool_catalog = ToolCatalog(
+            self.mcp_client,
+            refresh_interval=settings.tool_catalog_refresh_seconds,
+            store=store,
         )
+        self.tool_catalog.add_listener(self.build_graph)
         
         # Initialize tools (will be loaded asynchronously)
         self.tools = None
         self.all_tools = None  # All tools including internal ones
         self.graph = None
-        self.checkpointer = MemorySaver()
-        self.current_rm_id: Optional[int] = None
-        self.last_state: Optional[MessagesState] = None
+        self.checkpointer = checkpointer if checkpointer is not None else BoundedMemorySaver(
+            max_threads=settings.checkpointer_max_threads,
+            max_checkpoints_per_thread=settings.checkpointer_max_checkpoints_per_thread,
+        )
+        # Trims old checkpoints of every RM thread, run by the app lifespan
+        self.compactor = CheckpointCompactor(
+            self.checkpointer,
+            keep=settings.checkpointer_compaction_keep,
+            interval=settings.checkpointer_compaction_interval_seconds,
+        )
+        # Pending confirmation question of each thread
+        self.interrupts = (
+            SharedInterruptIndex(self.checkpointer, store) if store is not None
+            else InterruptIndex(self.checkpointer, max_threads=settings.checkpointer_max_threads)
+        )
+        self.store = store
+        # Answers to repeated read-only questions, invalidated by task writes
+        self.response_cache = ResponseCache(
+            MUTATING_TOOLS,
+            ttl=settings.response_cache_ttl_seconds,
+            max_entries_per_rm=settings.response_cache_max_entries_per_rm,
+            max_rms=settings.checkpointer_max_threads,
+            store=store,
+        ) if settings.response_cache_enabled else None
+        self._init_lock = asyncio.Lock()
 
         
-    async def initialize(self, rm_id: Optional[int] = None):
-        """Initialize tools and build the graph."""
-        # Re-initialize MCP client with headers if rm_id is provided
-        if rm_id is not None:
-            self.mcp_client = MultiServerMCPClient(
-                {
-                    "tools": {
-                        "transport": "streamable_http",
-                        "url": settings.mcp_server_url,
-                        "headers": {"x-rm-id": str(rm_id)},
-                    },
-                }
-            )
-            self.current_rm_id = rm_id
+    async def initialize(self):
+        """Load tools and compile the graph shared by every RM."""
+        async with self._init_lock:
+            if self.graph is not None:
+                return
+            
+            # Get tools from the catalog (only the first load goes to the MCP server)
+            all_tools = await self.tool_catalog.get_tools()
+            await self.build_graph(all_tools)
         
-        # Get tools from MCP server
-        all_tools = await self.mcp_client.get_tools()
+    async def build_graph(self, all_tools: List[BaseTool]):
+        """Compile the graph for the given tools.
         
+        Also registered as a tool catalog listener, so the graph is rebuilt when
+        the MCP server's tool schemas change.
+        """
         # Filter out internal tools that should not be bound to LLM
         # These tools (_create_rm_task, _update_rm_task) are only called programmatically after approval
-        self.tools = [tool for tool in all_tools if tool.name not in ["_create_rm_task", "_update_rm_task"]]
-        
-        # Store all tools (including internal ones) for use in proceed_confirmed_tool
-        self.all_tools = all_tools
+        tools = [tool for tool in all_tools if tool.name not in INTERNAL_TOOLS]
+        # Local tool reading the full results behind projected tool messages
+        graph_tools = [*tools, read_tool_result]
         
         # Build the graph
-        builder = StateGraph(MessagesState)
+        builder = StateGraph(AgentState)
         
-        # Create the assistant node using RunnablePassthrough pattern
+        # Create the assistant node using RunnablePassthrough pattern; the message
+        # window and token-budgeted context are brought up to date first so
+        # get_messages only reads them
         rm_assistant = RunnablePassthrough.assign(
+            message_window=update_message_window,
+        ).assign(
+            context=self.context_builder.build,
+        ).assign(
             messages=get_messages
-            | self.llm.bind_tools(self.tools)
+            | self.llm_client.resilient(self.llm.bind_tools(graph_tools))
             | postprocess_message
         )
         
         builder.add_node("rm_assistant", rm_assistant)
-        builder.add_node("tools", ToolNode(self.tools))
+        builder.add_node("tools", ToolExecutor(
+            graph_tools,
+            MUTATING_TOOLS,
+            self.tool_result_projector,
+            max_concurrency=settings.tool_call_max_concurrency,
+        ))
         builder.add_node("approval", approval_node)
         builder.add_node("proceed_confirmed_tool", self.proceed_confirmed_tool)
         
@@ -234,18 +334,36 @@ class AgentCore:
         builder.add_edge("tools", "approval")
         builder.add_conditional_edges(
             "approval",
-            approval_node,
+            route_after_approval,
+            ["rm_assistant", "proceed_confirmed_tool"],
         )
         builder.add_edge("proceed_confirmed_tool", END)
         
-        # Compile the graph
-        self.graph = builder.compile(checkpointer=self.checkpointer)
+        # Compile the graph, then swap tools and graph together
+        graph = builder.compile(checkpointer=self.checkpointer)
+        self.tools = tools
+        # Store all tools (including internal ones) for use in proceed_confirmed_tool
+        self.all_tools = all_tools
+        self.graph = graph
+        
+    def build_config(self, thread_id: str, rm_id: int, deadline: Optional[float] = None) -> RunnableConfig:
+        """Build the run config carrying the thread and RM identity (and the request deadline)."""
+        config: RunnableConfig = {
+            "configurable": {
+                "thread_id": thread_id,
+                "rm_id": rm_id,
+            }
+        }
+        if deadline is not None:
+            config["configurable"]["deadline"] = deadline
+        return config
         
     async def chat(
         self,
         message: str,
         thread_id: str,
         rm_id: int,
+        deadline: Optional[float] = None,
     ) -> dict:
         """
         Process a chat message.
@@ -254,57 +372,81 @@ class AgentCore:
             message: User message
             thread_id: Thread identifier for conversation history
             rm_id: Relationship Manager ID
+            deadline: time.monotonic() timestamp by which the turn must complete;
+                LLM calls shorten their timeouts and retries to meet it
             
         Returns:
-            Response dictionary with AI message. If graph interrupts, returns the
-            interrupt question as the AI message.
+            Response dictionary with AI message and context token metrics. If graph
+            interrupts, returns the interrupt question as the AI message.
+            
+        Raises:
+            DeadlineExceeded: The turn did not complete before the deadline
         """
-        # Check if we need to re-initialize (new rm_id or first time)
-        if self.graph is None or self.current_rm_id != rm_id:
-            await self.initialize(rm_id=rm_id)
+        # The graph is compiled once and shared; only the first call initializes
+        if self.graph is None:
+            await self.initialize()
         
-        config = {
-            "configurable": {
-                "thread_id": thread_id,
-            }
-        }
+        config = self.build_config(thread_id, rm_id, deadline)
         
-        # Check if there's a pending interrupt
-        interrupt_message = self.check_for_interrupt(thread_id)
+        # Check if there's a pending interrupt on this thread
+        interrupt_message = await self.check_for_interrupt(thread_id)
         
-        if interrupt_message is not None:
-            # Resume with user's response
-            result = await self.graph.ainvoke(
-                Command(resume=message.strip()),
-                config=config,
-            )
-        else:
-            # Normal invocation
-            input_state = {"messages": [HumanMessage(content=message)]}
-            result = await self.graph.ainvoke(input_state, config=config)
-
-        self.last_state = result
+        # Repeated read-only question: answer from the cache
+        if interrupt_message is None:
+            cached_answer = await self.answer_from_cache(config, message, rm_id)
+            if cached_answer is not None:
+                return {
+                    "message": cached_answer,
+                    "interrupted": False,
+                    "context": None,
+                }
+        
+        try:
+            async with asyncio.timeout(deadline - time.monotonic() if deadline is not None else None):
+                if interrupt_message is not None:
+                    # Resume with user's response
+                    result = await self.graph.ainvoke(
+                        Command(resume=message.strip()),
+                        config=config,
+                    )
+                else:
+                    # Normal invocation
+                    input_state = {"messages": [HumanMessage(content=message)]}
+                    result = await self.graph.ainvoke(input_state, config=config)
+        except TimeoutError as e:
+            await self.interrupts.invalidate(thread_id)
+            if isinstance(e, DeadlineExceeded):
+                raise
+            raise DeadlineExceeded("Request deadline exceeded") from e
+        except Exception:
+            # The run may have stopped anywhere; reload from the checkpoint next time
+            await self.interrupts.invalidate(thread_id)
+            raise
+        
+        # Prompt tokens sent versus the budget for the last assistant call
+        context_metrics = result.get("context", {}).get("metrics")
         
         # Check if graph interrupted
-        if "__interrupt__" in result:
-            interrupts = result.get("__interrupt__")
-            if interrupts and len(interrupts) > 0:
-                interrupt_value = interrupts[0].value
-                if interrupt_value is not None:
-                    # Return the interrupt question as AI message
-                    return {
-                        "message": str(interrupt_value),
-                        "interrupted": True,
-                    }
+        interrupt_question = await self.interrupts.record(thread_id, result.get("__interrupt__"))
+        if interrupt_question is not None:
+            # Return the interrupt question as AI message
+            return {
+                "message": interrupt_question,
+                "interrupted": True,
+                "context": context_metrics,
+            }
         
         # Normal response - return the last AI message
         messages = result.get("messages", [])
+        if interrupt_message is None and self.response_cache is not None:
+            await self.response_cache.put(rm_id, message, messages)
         ai_messages = [msg for msg in messages if isinstance(msg, AIMessage)]
         last_message = ai_messages[-1].content if ai_messages else ""
         
         return {
             "message": last_message,
             "interrupted": False,
+            "context": context_metrics,
         }
     
     async def stream_chat(
@@ -312,6 +454,7 @@ class AgentCore:
         message: str,
         thread_id: str,
         rm_id: int,
+        deadline: Optional[float] = None,
     ) -> AsyncGenerator[dict, None]:
         """
         Stream chat responses.
@@ -320,93 +463,111 @@ class AgentCore:
             message: User message
             thread_id: Thread identifier
             rm_id: Relationship Manager ID
+            deadline: time.monotonic() timestamp by which the graph run must complete;
+                LLM calls shorten their timeouts and retries to meet it
             
         Yields:
-            Dictionary with 'content' (text chunk), 'done' (boolean), and 'interrupted' (boolean)
+            Typed stream events (see agent.stream_events): answer tokens, tool
+            progress, then one final 'done' or 'error' event
         """
-        # Check if we need to re-initialize (new rm_id or first time)
-        if self.graph is None or self.current_rm_id != rm_id:
-            await self.initialize(rm_id=rm_id)
+        # The graph is compiled once and shared; only the first call initializes
+        if self.graph is None:
+            await self.initialize()
         
-        config = {
-            "configurable": {
-                "thread_id": thread_id,
-            }
-        }
+        config = self.build_config(thread_id, rm_id, deadline)
         
-        # Check if there's a pending interrupt
-        interrupt_message = self.check_for_interrupt(thread_id)
+        # Check if there's a pending interrupt on this thread
+        interrupt_message = await self.check_for_interrupt(thread_id)
+        
+        # Repeated read-only question: answer from the cache
+        if interrupt_message is None:
+            cached_answer = await self.answer_from_cache(config, message, rm_id)
+            if cached_answer is not None:
+                yield token_event(cached_answer)
+                yield done_event()
+                return
         
         try:
             if interrupt_message is not None:
                 # Resume with user's response
-                stream = self.graph.stream(
-                    Command(resume=message.strip()),
-                    config=config,
-                    stream_mode="messages",
-                )
+                graph_input: Any = Command(resume=message.strip())
             else:
                 # Normal invocation
-                input_state = {"messages": [HumanMessage(content=message)]}
-                stream = self.graph.stream(
-                    input_state,
-                    config=config,
-                    stream_mode="messages",
-                )
+                graph_input = {"messages": [HumanMessage(content=message)]}
             
-            # Stream AI message chunks
-            async for chunk in stream:
-                if isinstance(chunk, tuple) and len(chunk) >= 2:
-                    chunk_msg, _ = chunk[0], chunk[1]
-                    if isinstance(chunk_msg, AIMessageChunk):
-                        yield {
-                            "content": chunk_msg.content,
-                            "done": False,
-                            "interrupted": False,
-                        }
-                    elif isinstance(chunk_msg, AIMessage):
-                        yield {
-                            "content": chunk_msg.content,
-                            "done": False,
-                            "interrupted": False,
-                        }
+            # Stream LLM tokens ("messages") and node updates ("updates", for tool
+            # progress) without blocking the event loop; other RMs' streams keep
+            # running between chunks. The deadline bounds each step of the run
+            # (not the time the consumer spends between chunks)
+            stream = self.graph.astream(
+                graph_input,
+                config=config,
+                stream_mode=["updates", "messages"],
+            )
+            try:
+                while True:
+                    async with asyncio.timeout(deadline - time.monotonic() if deadline is not None else None):
+                        try:
+                            mode, chunk = await anext(stream)
+                        except StopAsyncIteration:
+                            break
+                    if mode == "messages":
+                        chunk_msg, metadata = chunk
+                        # The approval node only records the question the RM already got
+                        if metadata.get("langgraph_node") == "approval":
+                            continue
+                        if isinstance(chunk_msg, (AIMessageChunk, AIMessage)) and chunk_msg.content:
+                            yield token_event(chunk_msg.content)
+                    else:
+                        for node, update in chunk.items():
+                            for event in tool_events(node, update):
+                                yield event
+            finally:
+                await stream.aclose()
             
             # After streaming, check if graph interrupted
-            state = self.graph.get_state(config)
-            if state and hasattr(state, 'values'):
-                result = state.values
-                if "__interrupt__" in result:
-                    interrupts = result.get("__interrupt__")
-                    if interrupts and len(interrupts) > 0:
-                        interrupt_value = interrupts[0].value
-                        if interrupt_value is not None:
-                            # Stream the interrupt question
-                            interrupt_text = str(interrupt_value)
-                            yield {
-                                "content": interrupt_text,
-                                "done": True,
-                                "interrupted": True,
-                            }
-                            return
+            state = await self.graph.aget_state(config)
+            interrupt_question = await self.interrupts.record(thread_id, state.interrupts if state else None)
+            if interrupt_question is not None:
+                # Stream the interrupt question
+                yield done_event(interrupt_question, interrupted=True)
+                return
+            
+            if interrupt_message is None and self.response_cache is not None:
+                await self.response_cache.put(rm_id, message, state.values.get("messages", []))
             
             # Normal completion
-            yield {
-                "content": "",
-                "done": True,
-                "interrupted": False,
-            }
+            yield done_event()
             
+        except TimeoutError:
+            await self.interrupts.invalidate(thread_id)
+            yield error_event("Lỗi: Request deadline exceeded")
         except Exception as e:
-            yield {
-                "content": f"Lỗi: {str(e)}",
-                "done": True,
-                "interrupted": False,
-            }
+            await self.interrupts.invalidate(thread_id)
+            yield error_event(f"Lỗi: {str(e)}")
     
 
-    def check_for_interrupt(self, thread_id: str) -> Optional[str]:
+    async def clear_history(self, thread_id: str, rm_id: Optional[int] = None) -> None:
         """
-        Check if the graph is waiting for an interrupt.
+        Delete all checkpoints of a thread, whichever checkpointer backend is used.
+        
+        Args:
+            thread_id: Thread identifier
+            rm_id: RM owning the thread; its cached answers are dropped too
+        """
+        await self.checkpointer.adelete_thread(thread_id)
+        await self.interrupts.forget(thread_id)
+        if rm_id is not None and self.response_cache is not None:
+            if self.store is not None:
+                # Other workers drop their answers when they see the new version
+                await self.store.bump_data_version(rm_id)
+            self.response_cache.invalidate(rm_id)
+    
+    async def check_for_interrupt(self, thread_id: str) -> Optional[str]:
+        """
+        Check if the graph is waiting for an interrupt on a thread.
+        
+        Answered from the per-thread interrupt index; the graph is not run.
         
         Args:
             thread_id: Thread identifier
@@ -414,25 +575,73 @@ class AgentCore:
         Returns:
             Interrupt message if present, None otherwise
         """
-        state = self.last_state
-        if state and "__interrupt__" in state:
-            interrupts = state["__interrupt__"]
-            if interrupts and len(interrupts) > 0:
-                return interrupts[0].value
-        return None
+        return await self.interrupts.get(thread_id)
     
-    async def proceed_confirmed_tool(self, state: MessagesState):
+    async def answer_from_cache(self, config: RunnableConfig, message: str, rm_id: int) -> Optional[str]:
+        """
+        Answer a repeated read-only question from the response cache.
+        
+        A hit is recorded in the thread like a normal turn, so the conversation
+        history stays complete.
+        
+        Returns:
+            The cached answer, or None if the question has to go through the graph
+        """
+        if self.response_cache is None:
+            return None
+        context = None
+        if self.response_cache.needs_context(message):
+            # A follow-up is answered from the cache only right after the same answer
+            snapshot = await self.graph.aget_state(config)
+            context = previous_answer(snapshot.values.get("messages", []) if snapshot else [])
+        answer = await self.response_cache.lookup(rm_id, message, context)
+        if answer is None:
+            return None
+        await self.graph.aupdate_state(
+            config,
+            {"messages": [HumanMessage(content=message), AIMessage(content=answer)]},
+            as_node="rm_assistant",
+        )
+        return answer
+    
+    async def invalidate_rm_data(
+        self,
+        rm_id: Optional[int],
+        customer_id: Optional[int] = None,
+        task_id: Optional[int] = None,
+    ) -> None:
+        """Drop what was cached from an RM's data after the agent wrote one of its tasks.
+        
+        Args:
+            rm_id: RM owning the task
+            customer_id: Customer of a created task
+            task_id: ID of an updated task
+        """
+        if rm_id is None:
+            return
+        if self.store is not None:
+            # Other workers drop their entries when they see the new version
+            await self.store.bump_data_version(rm_id)
+        self.tool_cache.invalidate_tasks(rm_id, customer_id=customer_id, task_id=task_id)
+        if self.response_cache is not None:
+            self.response_cache.invalidate(rm_id)
+    
+    async def proceed_confirmed_tool(self, state: MessagesState, config: RunnableConfig):
         """Execute the actual tool operation after user confirmation via MCP.
         
         This function is called after user approves a create_rm_task or update_rm_task call.
         It then calls the internal MCP tools _create_rm_task or _update_rm_task to actually
         perform the database operation.
         """
-        # Find the last tool call that was made by the assistant
+        # Find the mutating call of the last assistant message with tool calls (the
+        # tools node runs only one per message, so it is the one just confirmed)
         tool_call = None
         for message in reversed(state["messages"]):
             if hasattr(message, 'tool_calls') and message.tool_calls:
-                tool_call = message.tool_calls[0]  # Get the first tool call
+                tool_call = next(
+                    (call for call in message.tool_calls if call.get("name") in MUTATING_TOOLS),
+                    message.tool_calls[0],
+                )
                 break
         
         if not tool_call:
@@ -459,11 +668,12 @@ class AgentCore:
         try:
             # Prepare arguments for the internal tool
             if tool_name == "create_rm_task":
-                if self.current_rm_id is None:
+                rm_id = get_rm_id(config)
+                if rm_id is None:
                     return {"messages": [AIMessage(content="Lỗi: Không tìm thấy ID của Quản lý Quan hệ Khách hàng.")]}
                 # Add rmId to the arguments
                 mcp_args = {
-                    "rmId": int(self.current_rm_id),
+                    "rmId": rm_id,
                     "customerId": int(tool_args.get("customerId")),  # type: ignore
                     "taskType": str(tool_args.get("taskType")),  # type: ignore
                     "taskStatus": str(tool_args.get("taskStatus")),  # type: ignore
@@ -481,7 +691,15 @@ class AgentCore:
                 return {"messages": [AIMessage(content="Công cụ đã chạy thành công!")]}
             
             # Execute the actual tool via MCP
-            result = await internal_tool.ainvoke(mcp_args)
+            try:
+                result = await internal_tool.ainvoke(mcp_args)
+            finally:
+                # The write may have gone through even if the call failed
+                await self.invalidate_rm_data(
+                    get_rm_id(config),
+                    customer_id=mcp_args.get("customerId"),
+                    task_id=mcp_args.get("rmTaskId"),
+                )
             
             # Return success message
             success_message = f"Nhiệm vụ đã được thực thi thành công! {result.get('message', '') if isinstance(result, dict) else str(result)}"
@@ -0,0 +1,128 @@
+"""Per-thread index of pending interrupts (confirmation questions)."""
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.types import Interrupt
+
+from .checkpointer import INTERRUPT_CHANNEL
+from .shared_store import SharedStore
+
+
+class InterruptIndex:
+    """Pending interrupt question of each thread, keyed by thread ID.
+
+    Every graph run records the interrupt it ended on (or its absence), so lookups
+    are a dictionary read. A thread not seen since startup is loaded once from
+    its latest checkpoint, which keeps the index correct across restarts with a
+    persistent checkpointer.
+    """
+
+    def __init__(self, checkpointer: BaseCheckpointSaver, max_threads: int = 1000):
+        """
+        Args:
+            checkpointer: Checkpoint storage consulted for threads not yet indexed
+            max_threads: Threads kept in the index; the least recently used is
+                dropped beyond it and reloaded on its next lookup (<= 0 disables)
+        """
+        self.checkpointer = checkpointer
+        self.max_threads = max_threads
+        # thread ID -> pending interrupt question, None when nothing is pending
+        self._entries: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self.hits = 0
+        self.loads = 0
+
+    async def _lookup(self, thread_id: str) -> Tuple[bool, Optional[str]]:
+        """Whether the thread is indexed, and its pending question."""
+        if thread_id not in self._entries:
+            return False, None
+        self._entries.move_to_end(thread_id)
+        return True, self._entries[thread_id]
+
+    async def _store(self, thread_id: str, message: Optional[str]) -> None:
+        self._entries[thread_id] = message
+        self._entries.move_to_end(thread_id)
+        if self.max_threads > 0 and len(self._entries) > self.max_threads:
+            self._entries.popitem(last=False)
+
+    async def _drop(self, thread_id: str) -> None:
+        self._entries.pop(thread_id, None)
+
+    async def record(self, thread_id: str, interrupts: Optional[Sequence[Interrupt]]) -> Optional[str]:
+        """
+        Record the outcome of a graph run on a thread.
+
+        Args:
+            thread_id: Thread identifier
+            interrupts: Interrupts the run ended on, empty or None if it completed
+
+        Returns:
+            The pending interrupt question, if any
+        """
+        message = None
+        if interrupts and interrupts[0].value is not None:
+            message = str(interrupts[0].value)
+        await self._store(thread_id, message)
+        return message
+
+    async def invalidate(self, thread_id: str) -> None:
+        """Drop a thread whose state is uncertain (e.g. a failed run); it is reloaded on the next lookup."""
+        await self._drop(thread_id)
+
+    async def forget(self, thread_id: str) -> None:
+        """Mark a thread as having nothing pending (e.g. after its history is cleared)."""
+        await self._store(thread_id, None)
+
+    async def get(self, thread_id: str) -> Optional[str]:
+        """Return the pending interrupt question of a thread, or None."""
+        known, message = await self._lookup(thread_id)
+        if known:
+            self.hits += 1
+            return message
+        return await self._load(thread_id)
+
+    async def _load(self, thread_id: str) -> Optional[str]:
+        self.loads += 1
+        checkpoint = await self.checkpointer.aget_tuple(
+            {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        )
+        interrupts = []
+        if checkpoint is not None:
+            for _, channel, value in checkpoint.pending_writes or []:
+                if channel == INTERRUPT_CHANNEL:
+                    interrupts.extend(value)
+        return await self.record(thread_id, interrupts)
+
+    def stats(self) -> dict:
+        """Index counters for monitoring."""
+        return {
+            "threads": len(self._entries),
+            "pending": sum(1 for message in self._entries.values() if message is not None),
+            "hits": self.hits,
+            "loads": self.loads,
+        }
+
+
+class SharedInterruptIndex(InterruptIndex):
+    """Interrupt index kept in the shared store, visible to every worker process."""
+
+    def __init__(self, checkpointer: BaseCheckpointSaver, store: SharedStore):
+        super().__init__(checkpointer)
+        self.store = store
+
+    async def _lookup(self, thread_id: str) -> Tuple[bool, Optional[str]]:
+        return await self.store.get_interrupt(thread_id)
+
+    async def _store(self, thread_id: str, message: Optional[str]) -> None:
+        await self.store.put_interrupt(thread_id, message)
+
+    async def _drop(self, thread_id: str) -> None:
+        await self.store.delete_interrupt(thread_id)
+
+    def stats(self) -> dict:
+        """Index counters for monitoring (thread counts live in the shared store)."""
+        return {
+            "shared": True,
+            "hits": self.hits,
+            "loads": self.loads,
+        }
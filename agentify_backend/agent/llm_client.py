@@ -0,0 +1,232 @@
+"""Shared OpenAI client with bounded connections, timeouts, retries and deadlines.
+
+Every chat model of the agent runs on one ``httpx.AsyncClient`` with a bounded
+connection pool and explicit connect/read timeouts, so slow upstream calls
+cannot pile up without limit. Retries are done here rather than by the OpenAI
+SDK:
+
+- only transient errors (connection errors, timeouts, 429, 5xx) are retried,
+  with exponential backoff and full jitter (honouring ``Retry-After``);
+- a retry budget caps retries to a fraction of calls, so an upstream outage is
+  not amplified by every request retrying;
+- no attempt or backoff runs past the request's deadline, which the API layer
+  puts in the run config (``configurable.deadline``, a ``time.monotonic()``
+  timestamp) and which also bounds each attempt's timeout;
+- a call that already streamed a token is not retried: under ``stream_chat``
+  the token has reached the RM, and a retry would send the answer twice.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Optional
+
+import httpx
+import openai
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackManager
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import ensure_config
+from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+# Errors worth another attempt; everything else (bad request, auth, ...) fails at once
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+# Retries available before the budget has to be earned by successful calls
+RETRY_BUDGET_BURST = 10
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request's deadline passed before it completed."""
+
+
+def get_deadline(config: Optional[RunnableConfig]) -> Optional[float]:
+    """Read the request deadline (``time.monotonic()`` timestamp) from the run config."""
+    if not config:
+        return None
+    return config.get("configurable", {}).get("deadline")
+
+
+class _TokenWatcher(AsyncCallbackHandler):
+    """Notes whether the chat model emitted a token during an attempt."""
+
+    def __init__(self) -> None:
+        self.streamed = False
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.streamed = True
+
+
+def _watched(config: Optional[RunnableConfig], watcher: _TokenWatcher) -> RunnableConfig:
+    """The run config with ``watcher`` added to its callbacks."""
+    config = ensure_config(config)
+    callbacks = config.get("callbacks")
+    if isinstance(callbacks, BaseCallbackManager):
+        callbacks = callbacks.copy()
+        callbacks.add_handler(watcher, inherit=True)
+    else:
+        callbacks = [*(callbacks or []), watcher]
+    return {**config, "callbacks": callbacks}
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of calls.
+
+    Every call deposits ``ratio`` tokens and every retry withdraws one, with at
+    most ``burst`` tokens saved up.
+    """
+
+    def __init__(self, ratio: float = 0.2, burst: int = RETRY_BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = float(burst)
+
+    def deposit(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class LLMClient:
+    """Connection pool, timeouts and retry policy shared by the agent's chat models."""
+
+    def __init__(
+        self,
+        api_key: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        connect_timeout: float = 5,
+        read_timeout: float = 60,
+        max_retries: int = 3,
+        retry_initial_delay: float = 0.5,
+        retry_max_delay: float = 8,
+        retry_budget_ratio: float = 0.2,
+        base_url: Optional[str] = None,
+    ):
+        """
+        Args:
+            api_key: OpenAI API key
+            max_connections: Open connections to the OpenAI API at most
+            max_keepalive_connections: Idle connections kept open for reuse
+            connect_timeout: Seconds to establish a connection
+            read_timeout: Seconds to wait for response data (per chunk when streaming)
+            max_retries: Retries per call after the first attempt
+            retry_initial_delay: Backoff ceiling of the first retry; doubles per retry
+            retry_max_delay: Largest backoff ceiling
+            retry_budget_ratio: Retries allowed per call on average, across all calls
+            base_url: OpenAI-compatible API URL (defaults to OPENAI_BASE_URL or the OpenAI API)
+        """
+        self.api_key = api_key
+        self.base_url = base_url
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.retry_initial_delay = retry_initial_delay
+        self.retry_max_delay = retry_max_delay
+        self.retry_budget = RetryBudget(retry_budget_ratio)
+        self.http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+            ),
+            timeout=self._timeout(None),
+        )
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.budget_exhausted = 0
+        self.deadline_exceeded = 0
+
+    def _timeout(self, remaining: Optional[float]) -> httpx.Timeout:
+        if remaining is None:
+            return httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        return httpx.Timeout(min(self.read_timeout, remaining), connect=min(self.connect_timeout, remaining))
+
+    def chat_model(self, model: str, temperature: float) -> ChatOpenAI:
+        """A chat model on the shared connection pool, without SDK-level retries."""
+        return ChatOpenAI(
+            model=model,
+            api_key=self.api_key,
+            base_url=self.base_url,
+            temperature=temperature,
+            http_async_client=self.http_client,
+            timeout=self._timeout(None),
+            max_retries=0,
+        )
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_initial_delay * 2 ** attempt))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        try:
+            return max(delay, float(retry_after)) if retry_after else delay
+        except ValueError:
+            return delay
+
+    async def ainvoke(self, runnable: Runnable, input: Any, config: Optional[RunnableConfig] = None) -> Any:
+        """
+        Invoke a chat model runnable with retries, within the run's deadline.
+
+        Raises:
+            DeadlineExceeded: The deadline passed before a call succeeded
+        """
+        deadline = get_deadline(config)
+        watcher = _TokenWatcher()
+        config = _watched(config, watcher)
+        self.calls += 1
+        self.retry_budget.deposit()
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                self.deadline_exceeded += 1
+                raise DeadlineExceeded("Request deadline exceeded before the LLM call")
+            try:
+                return await runnable.ainvoke(input, config, timeout=self._timeout(remaining))
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries or watcher.streamed:
+                    self.failures += 1
+                    raise
+                delay = self._backoff(attempt, e)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    self.deadline_exceeded += 1
+                    raise DeadlineExceeded(f"Request deadline exceeded after LLM error: {e}") from e
+                if not self.retry_budget.withdraw():
+                    self.budget_exhausted += 1
+                    self.failures += 1
+                    raise
+                attempt += 1
+                self.retries += 1
+                logger.info("Retrying LLM call (attempt %d) in %.2fs: %s", attempt + 1, delay, e)
+                await asyncio.sleep(delay)
+
+    def resilient(self, runnable: Runnable) -> Runnable:
+        """Wrap a chat model runnable so every invocation goes through ainvoke."""
+
+        async def invoke(input: Any, config: RunnableConfig) -> Any:
+            return await self.ainvoke(runnable, input, config)
+
+        return RunnableLambda(invoke, name=runnable.get_name())
+
+    async def close(self) -> None:
+        await self.http_client.aclose()
+
+    def stats(self) -> dict:
+        """Call, retry and failure counters for monitoring."""
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "retry_budget_exhausted": self.budget_exhausted,
+            "deadline_exceeded": self.deadline_exceeded,
+            "retry_tokens": round(self.retry_budget.tokens, 2),
+        }
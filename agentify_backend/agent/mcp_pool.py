@@ -0,0 +1,249 @@
+"""Long-lived HTTP connections and MCP sessions for tool calls.
+
+Out of the box every MCP tool call opens a new HTTP client, performs the MCP
+``initialize`` handshake, makes the call and tears everything down again. This
+module keeps both layers alive instead:
+
+- ``MCPConnectionPool``: one httpx transport (keep-alive connection pool,
+  optional HTTP/2) shared by every HTTP client the MCP transport creates.
+- ``MCPSessionPool``: a tool call interceptor that runs calls on initialized
+  MCP sessions kept per server and request headers (i.e. per RM, since the
+  ``x-rm-id`` header is part of the key), least recently used first out.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Collection, Dict, Optional, Tuple
+
+import httpx
+from langchain_mcp_adapters.interceptors import MCPToolCallRequest, MCPToolCallResult  # type: ignore
+from langchain_mcp_adapters.sessions import Connection, create_session  # type: ignore
+from mcp import ClientSession
+
+logger = logging.getLogger(__name__)
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Delegates to the pool's transport; closing a client leaves the pool open."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+class MCPConnectionPool:
+    """Keep-alive HTTP connection pool shared by all MCP HTTP clients."""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 60,
+        http2: bool = False,
+    ):
+        """
+        Args:
+            max_connections: Open connections to the MCP server at most
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+            http2: Negotiate HTTP/2 (requires the ``h2`` package)
+        """
+        self.transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
+        self.clients_created = 0
+
+    def client_factory(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[httpx.Timeout] = None,
+        auth: Optional[httpx.Auth] = None,
+    ) -> httpx.AsyncClient:
+        """``httpx_client_factory`` for MCP connections: a client on the shared pool."""
+        self.clients_created += 1
+        return httpx.AsyncClient(
+            transport=_SharedTransport(self.transport),
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.Timeout(30, read=300),
+            auth=auth,
+        )
+
+    async def close(self) -> None:
+        await self.transport.aclose()
+
+
+class SessionUnavailable(RuntimeError):
+    """The MCP session could not be opened or initialized; the call was not sent."""
+
+
+class _PooledSession:
+    """An initialized MCP session owned by a background task."""
+
+    def __init__(self):
+        self.session: Optional[ClientSession] = None
+        self.error: Optional[BaseException] = None
+        self.ready = asyncio.Event()
+        self.closing = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.in_use = 0
+        self.last_used = time.monotonic()
+        self.evicted = False
+
+
+class MCPSessionPool:
+    """Tool call interceptor reusing initialized MCP sessions.
+
+    The session's transport context must be entered and exited by the same task,
+    so every pooled session is owned by a background task that opens it and
+    waits until the session is evicted. Calls are JSON-RPC requests with their
+    own IDs, so one session serves concurrent calls.
+
+    A call that fails is retried once on a new session, except calls of
+    ``mutating_tools`` that reached the server: a timeout after the server wrote
+    would write twice. Those are only retried when the session could not be
+    opened, i.e. the call was never sent.
+
+    Must be the last interceptor: it makes the call itself instead of handing
+    the request on.
+    """
+
+    def __init__(
+        self,
+        connections: Dict[str, Connection],
+        max_sessions: int = 256,
+        idle_timeout: float = 300,
+        mutating_tools: Collection[str] = (),
+    ):
+        """
+        Args:
+            connections: MCP client connections by server name
+            max_sessions: Live sessions kept; the least recently used is closed beyond it
+            idle_timeout: Seconds after which an unused session is reopened on
+                its next call rather than reused (the server may have expired it)
+            mutating_tools: Tools whose calls are not repeated once sent
+        """
+        self.connections = connections
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.mutating_tools = frozenset(mutating_tools)
+        self._sessions: "OrderedDict[Tuple[str, Tuple[Tuple[str, str], ...]], _PooledSession]" = OrderedDict()
+        self.hits = 0
+        self.opened = 0
+        self.retries = 0
+
+    async def _run(self, entry: _PooledSession, connection: Connection) -> None:
+        try:
+            async with create_session(connection) as session:
+                await session.initialize()
+                entry.session = session
+                entry.ready.set()
+                await entry.closing.wait()
+        except BaseException as e:
+            entry.error = e
+            if not isinstance(e, asyncio.CancelledError):
+                logger.warning("MCP session closed with error: %s", e)
+        finally:
+            entry.session = None
+            entry.ready.set()
+
+    def _close(self, entry: _PooledSession) -> None:
+        entry.evicted = True
+        if entry.in_use == 0:
+            entry.closing.set()
+
+    def _discard(self, key: Tuple[str, Tuple[Tuple[str, str], ...]], entry: _PooledSession) -> None:
+        if self._sessions.get(key) is entry:
+            del self._sessions[key]
+        self._close(entry)
+
+    def _open(self, key: Tuple[str, Tuple[Tuple[str, str], ...]], connection: Connection) -> _PooledSession:
+        entry = _PooledSession()
+        entry.task = asyncio.create_task(self._run(entry, connection))
+        self._sessions[key] = entry
+        self.opened += 1
+        while len(self._sessions) > self.max_sessions:
+            _, oldest = self._sessions.popitem(last=False)
+            self._close(oldest)
+        return entry
+
+    async def _call(self, request: MCPToolCallRequest, fresh: bool) -> MCPToolCallResult:
+        connection: Dict[str, Any] = dict(self.connections[request.server_name])
+        headers = {**(connection.get("headers") or {}), **(request.headers or {})}
+        connection["headers"] = headers
+        key = (request.server_name, tuple(sorted((str(k), str(v)) for k, v in headers.items())))
+
+        entry = self._sessions.get(key)
+        if entry is not None and (fresh or time.monotonic() - entry.last_used > self.idle_timeout):
+            self._discard(key, entry)
+            entry = None
+        if entry is None:
+            entry = self._open(key, connection)  # type: ignore[arg-type]
+        else:
+            self.hits += 1
+            self._sessions.move_to_end(key)
+
+        entry.in_use += 1
+        try:
+            await entry.ready.wait()
+            if entry.session is None:
+                self._discard(key, entry)
+                raise SessionUnavailable(f"MCP session closed: {entry.error}") from entry.error
+            entry.last_used = time.monotonic()
+            try:
+                return await entry.session.call_tool(request.name, request.args)
+            except Exception:
+                # The session may be broken (e.g. expired on the server); open a new one next time
+                self._discard(key, entry)
+                raise
+        finally:
+            entry.in_use -= 1
+            if entry.evicted and entry.in_use == 0:
+                entry.closing.set()
+
+    async def __call__(self, request: MCPToolCallRequest, handler) -> MCPToolCallResult:
+        if request.server_name not in self.connections:
+            return await handler(request)
+        try:
+            return await self._call(request, fresh=False)
+        except SessionUnavailable as e:
+            error: Exception = e
+        except Exception as e:
+            # The server may have run a write before failing; never send it twice
+            if request.name in self.mutating_tools:
+                raise
+            error = e
+        # Retry once on a new session before giving up
+        self.retries += 1
+        logger.info("Retrying MCP tool call %s on a new session: %s", request.name, error)
+        return await self._call(request, fresh=True)
+
+    async def close(self) -> None:
+        """Close every pooled session."""
+        entries = list(self._sessions.values())
+        self._sessions.clear()
+        for entry in entries:
+            entry.evicted = True
+            entry.closing.set()
+        tasks = [entry.task for entry in entries if entry.task is not None]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> dict:
+        """Pool counters for monitoring."""
+        return {
+            "sessions": len(self._sessions),
+            "opened": self.opened,
+            "hits": self.hits,
+            "retries": self.retries,
+        }
@@ -0,0 +1,193 @@
+"""Incremental computation of the messages sent to the LLM.
+
+The filter walks the conversation from the newest message backwards:
+
+- every human message is kept;
+- of several AI messages in a row only the newest is kept;
+- successful tool results are kept for the latest two tool-using turns only;
+- failed tool results are kept only when they are newer than the latest
+  successful one.
+
+The first two rules depend on a message and its neighbours alone and are
+evaluated when the selection is read. Only the tool rules carry state along
+the walk: the successful tool budget and whether failed results are still
+accepted. The graph state keeps what they add (the selected tool results and
+the AI messages kept because of them) together with the points where the
+walk's state changed.
+
+Each turn walks from the newest message back only until the walk's state
+matches the stored one at a human message; everything older is then selected
+exactly as before. The state at a given message changes only a few times over
+the life of a thread (failed results stop being accepted once, and otherwise
+the budget only goes down), so each message is walked over a bounded number of
+times however long the thread gets. Once both budgets are used up the walk
+stops altogether.
+"""
+from bisect import bisect_left
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AnyMessage
+
+from .state import AgentState, MessageWindow
+from .tool_results import get_tool_result
+
+MAX_SUCCESSFUL_TOOL_CALLS = 2
+
+# Tool rule state before the walk: (successful tool budget, failed results accepted)
+INITIAL_STATE = (MAX_SUCCESSFUL_TOOL_CALLS, True)
+
+
+def is_successful_tool_result(message: AnyMessage) -> bool:
+    """Whether a tool message reports success (``code`` missing or "succeeded")."""
+    # Unparseable results (code None) are handled like failed ones
+    return get_tool_result(message)["code"] == "succeeded"
+
+
+def _stored_state(breakpoints: Sequence[Sequence[int]], index: int) -> Tuple[int, bool]:
+    """Tool rule state of the previous walk right after it handled ``messages[index]``."""
+    state = INITIAL_STATE
+    for position, budget, add_failed in breakpoints:
+        if position < index:
+            break
+        state = (budget, bool(add_failed))
+    return state
+
+
+def _walk(
+    messages: Sequence[AnyMessage],
+    previous: MessageWindow,
+) -> MessageWindow:
+    """
+    Apply the tool rules from the newest message backwards.
+
+    Stops when both budgets are used up, or at a human message already walked
+    over by the previous call whose stored state equals the current one; the
+    previous extras and breakpoints older than that message are reused.
+    """
+    budget, add_failed = INITIAL_STATE
+    extras: List[int] = []
+    breakpoints: List[List[int]] = []
+    # Types of the two oldest messages selected so far, and how many there are
+    last: Optional[str] = None
+    second: Optional[str] = None
+    count = 0
+    # Type of the nearest newer human or AI message
+    next_type: Optional[str] = None
+
+    index = len(messages) - 1
+    while index >= 0:
+        if budget <= 0 and not add_failed:
+            # No older tool result can be selected; only the AI message right
+            # before the oldest selected one still follows it
+            if last == "tool":
+                while index >= 0 and messages[index].type not in ("human", "ai"):
+                    index -= 1
+                if index >= 0 and messages[index].type == "ai" and next_type == "ai":
+                    extras.append(index)
+            return MessageWindow(
+                scanned=len(messages),
+                boundary=max(index, 0),
+                breakpoints=breakpoints,
+                extras=extras[::-1],
+            )
+        message_type = messages[index].type
+        selected = False
+        if message_type == "human":
+            if count > 2 and second == "tool":
+                budget -= 1
+                breakpoints.append([index, budget, int(add_failed)])
+            selected = True
+            if (
+                index < previous["scanned"]
+                and (index + 1 == len(messages) or messages[index + 1].type != "tool")
+                and (budget, add_failed) == _stored_state(previous["breakpoints"], index)
+            ):
+                # Older messages are selected as in the previous call
+                older_extras = previous["extras"][:bisect_left(previous["extras"], index)]
+                older_breakpoints = [point for point in previous["breakpoints"] if point[0] < index]
+                return MessageWindow(
+                    scanned=len(messages),
+                    boundary=previous["boundary"],
+                    breakpoints=breakpoints + older_breakpoints,
+                    extras=older_extras + extras[::-1],
+                )
+        elif message_type == "tool":
+            if is_successful_tool_result(messages[index]):
+                if add_failed:
+                    add_failed = False
+                    breakpoints.append([index, budget, 0])
+                selected = budget > 0
+            else:
+                selected = add_failed
+            if selected:
+                extras.append(index)
+        elif message_type == "ai":
+            selected = last != "ai"
+            if selected and next_type == "ai":
+                # Kept only because a selected tool result follows it
+                extras.append(index)
+        if selected:
+            second, last = last, message_type
+            count += 1
+        if message_type in ("human", "ai"):
+            next_type = message_type
+        index -= 1
+
+    return MessageWindow(
+        scanned=len(messages),
+        boundary=0,
+        breakpoints=breakpoints,
+        extras=extras[::-1],
+    )
+
+
+def update_message_window(state: AgentState) -> MessageWindow:
+    """
+    Bring the cached message window up to date with the current messages.
+
+    Walks back only as far as the new messages change the selection.
+    """
+    messages = state["messages"]
+    window: Optional[MessageWindow] = state.get("message_window")
+    if window is None or "extras" not in window or window["scanned"] > len(messages):
+        # First turn, the history was replaced, or stored by an older version
+        window = MessageWindow(scanned=0, boundary=0, breakpoints=[], extras=[])
+    if window["scanned"] == len(messages):
+        return window
+    return _walk(messages, window)
+
+
+def iter_selected(
+    messages: Sequence[AnyMessage],
+    window: MessageWindow,
+    start: int = 0,
+) -> Iterator[int]:
+    """Indices of the selected messages in ``messages[start:]``, newest first."""
+    extras = set(window["extras"])
+    next_type: Optional[str] = None
+    for index in range(len(messages) - 1, start - 1, -1):
+        message_type = messages[index].type
+        if (
+            message_type == "human"
+            or (message_type == "ai" and next_type != "ai")
+            or index in extras
+        ):
+            yield index
+        if message_type in ("human", "ai"):
+            next_type = message_type
+
+
+def selected_tool_messages(window: MessageWindow, messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+    """Tool messages in the window, oldest first."""
+    return [messages[index] for index in window["extras"] if messages[index].type == "tool"]
+
+
+def select_messages(state: AgentState) -> List[AnyMessage]:
+    """Return the messages chosen by the window, oldest first."""
+    window = state.get("message_window")
+    if window is None or "extras" not in window or window["scanned"] != len(state["messages"]):
+        window = update_message_window(state)
+    messages = state["messages"]
+    indices = list(iter_selected(messages, window))
+    indices.reverse()
+    return [messages[index] for index in indices]
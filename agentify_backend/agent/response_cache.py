@@ -0,0 +1,275 @@
+"""Cache of answers to repeated read-only questions.
+
+RMs ask the same things many times a day ("hiệu suất tháng này của tôi",
+"tìm khách hàng X"). A turn that only used read-only tools is cached per RM and
+served again, without an LLM round trip or tool calls, when the RM asks the
+same question again:
+
+- prompts are normalized (case, punctuation, whitespace) and reduced to their
+  set of content words and numbers, diacritics included, leaving out filler
+  words ("giúp", "nhé", ...). Two prompts match only when these sets are equal,
+  so rephrasings that differ in word order or filler ("Tìm khách hàng An?" /
+  "tìm giúp khách hàng An nhé") share an answer while "An" never matches "Anh"
+  nor "Hà" "Hạ"; pronouns, names and time words ("tới", "này", ...) are never
+  filler. The set is the lookup key, so a lookup is one dictionary access;
+- a follow-up that refers back to the conversation ("còn khách hàng kia thì
+  sao?", "chi tiết task đó") has no answer of its own: its key also holds a
+  digest of the answer it follows, so it is only served again right after the
+  same answer;
+- each entry belongs to the RM's data version; ``invalidate`` bumps the version
+  after a task is created or updated or the RM's history is cleared, dropping
+  every answer of that RM. Data changed outside the agent is not detected at
+  lookup: such answers are served until they expire, after a TTL or at the end
+  of the day (prompts mention relative dates). ``put`` counts the questions
+  whose tool data changed between two answers (``data_changes``), to tune the
+  TTL.
+
+In multi-worker mode the data versions live in the shared store (bumped by
+``AgentCore.invalidate_rm_data``), so a write on one worker invalidates the
+answers cached by all of them.
+"""
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Set
+
+from langchain_core.messages import AnyMessage
+
+from .shared_store import SharedStore
+
+# Words that do not change what is asked; pronouns ("mình", "tôi", "em", ...) are
+# left out, they are also names and say whose data is asked for
+FILLER_WORDS = frozenset({
+    "à", "ạ", "ah", "ơi", "nhé", "nha", "giúp", "dùm", "giùm", "xin", "vui", "lòng", "hãy", "please",
+})
+
+# Words pointing at something said earlier in the conversation
+REFERENCE_WORDS = frozenset({
+    "kia", "đó", "đấy", "ấy", "vậy", "thế", "trên", "nữa", "tiếp", "còn", "sao",
+    "it", "that", "those", "them", "above", "previous",
+})
+# "này" refers back ("khách hàng này") except after a time word ("tháng này")
+TIME_WORDS = frozenset({"hôm", "ngày", "tuần", "tháng", "quý", "năm", "sáng", "chiều", "tối", "lúc", "dạo"})
+
+_PUNCTUATION = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace (diacritics are kept)."""
+    text = unicodedata.normalize("NFC", text).lower()
+    return " ".join(_PUNCTUATION.sub(" ", text).split())
+
+
+def content_words(normalized: str) -> List[str]:
+    """Words of a normalized prompt minus filler words, in order (diacritics kept)."""
+    return [word for word in normalized.split() if word not in FILLER_WORDS]
+
+
+def refers_back(words: Sequence[str]) -> bool:
+    """Whether a prompt's content words refer to earlier turns of the conversation."""
+    for index, word in enumerate(words):
+        if word in REFERENCE_WORDS:
+            return True
+        if word == "này" and (index == 0 or words[index - 1] not in TIME_WORDS):
+            return True
+    return False
+
+
+def tool_data_digest(messages: Sequence[AnyMessage]) -> str:
+    """Digest of the tool results a turn's answer was built from."""
+    digest = hashlib.sha256()
+    for message in messages:
+        if message.type == "tool":
+            digest.update(str(getattr(message, "name", "")).encode())
+            digest.update(str(message.content).encode())
+    return digest.hexdigest()[:16]
+
+
+def turn_start(messages: Sequence[AnyMessage]) -> int:
+    """Index of the last human message (0 if there is none)."""
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index].type == "human":
+            return index
+    return 0
+
+
+def current_turn(messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+    """Messages since the last human message (inclusive)."""
+    return list(messages[turn_start(messages):])
+
+
+def previous_answer(messages: Sequence[AnyMessage]) -> Optional[str]:
+    """Content of the newest final assistant answer in ``messages``."""
+    for message in reversed(messages):
+        if message.type == "ai" and not getattr(message, "tool_calls", None) and isinstance(message.content, str):
+            return message.content
+    return None
+
+
+def cache_key(words: Sequence[str], context: Optional[str]) -> str:
+    """Lookup key of a prompt's content words, with the answer a follow-up refers to."""
+    key = " ".join(sorted(set(words)))
+    if refers_back(words):
+        key += "\n" + hashlib.sha256((context or "").encode()).hexdigest()[:16]
+    return key
+
+
+class _Entry:
+    def __init__(self, answer: str, normalized: str, tool_digest: str, version: int):
+        self.answer = answer
+        self.normalized = normalized
+        self.tool_digest = tool_digest
+        self.version = version
+        self.day = date.today().isoformat()
+        self.created_at = time.monotonic()
+
+
+class ResponseCache:
+    """Per-RM cache of answers to read-only turns, matching rephrased questions."""
+
+    def __init__(
+        self,
+        mutating_tools: Set[str],
+        ttl: float = 300,
+        max_entries_per_rm: int = 50,
+        max_rms: int = 1000,
+        store: Optional[SharedStore] = None,
+    ):
+        """
+        Args:
+            mutating_tools: Names of tools that change data; turns calling them are not cached
+            ttl: Seconds an answer is served
+            max_entries_per_rm: Answers kept per RM, least recently used first out
+            max_rms: RMs with cached answers, least recently used first out
+            store: Shared store holding the RM data versions of all worker processes
+        """
+        self.mutating_tools = mutating_tools
+        self.ttl = ttl
+        self.max_entries_per_rm = max_entries_per_rm
+        self.max_rms = max_rms
+        self.store = store
+        self._entries: "OrderedDict[int, OrderedDict[str, _Entry]]" = OrderedDict()
+        self._versions: Dict[int, int] = {}
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.data_changes = 0
+        self.invalidations = 0
+
+    async def _version(self, rm_id: int) -> int:
+        if self.store is not None:
+            return await self.store.get_data_version(rm_id)
+        return self._versions.get(rm_id, 0)
+
+    def _valid(self, entry: _Entry, version: int) -> bool:
+        return (
+            entry.version == version
+            and entry.day == date.today().isoformat()
+            and time.monotonic() - entry.created_at <= self.ttl
+        )
+
+    @staticmethod
+    def needs_context(prompt: str) -> bool:
+        """Whether ``lookup`` needs the answer the prompt follows (it refers back to it)."""
+        return refers_back(content_words(normalize_prompt(prompt)))
+
+    async def lookup(self, rm_id: int, prompt: str, context: Optional[str] = None) -> Optional[str]:
+        """
+        Args:
+            rm_id: Relationship Manager ID
+            prompt: The RM's message
+            context: Answer the prompt follows (see previous_answer); only used
+                when ``needs_context`` is true
+
+        Returns:
+            The cached answer to the prompt or a rephrasing of it, or None
+        """
+        entries = self._entries.get(rm_id)
+        if not entries:
+            self.misses += 1
+            return None
+        version = await self._version(rm_id)
+        for key in [key for key, entry in entries.items() if not self._valid(entry, version)]:
+            del entries[key]
+
+        normalized = normalize_prompt(prompt)
+        key = cache_key(content_words(normalized), context)
+        entry = entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        entries.move_to_end(key)
+        self.hits += 1
+        if entry.normalized != normalized:
+            self.near_hits += 1
+        return entry.answer
+
+    async def put(self, rm_id: int, prompt: str, messages: Sequence[AnyMessage]) -> bool:
+        """
+        Cache the answer of a completed turn unless it called a mutating tool.
+
+        Args:
+            rm_id: Relationship Manager ID
+            prompt: The RM's message
+            messages: Messages of the thread, ending with the turn's final answer
+
+        Returns:
+            Whether the answer was cached
+        """
+        start = turn_start(messages)
+        turn = messages[start:]
+        answer = turn[-1].content if turn and turn[-1].type == "ai" else None
+        if not isinstance(answer, str) or not answer or getattr(turn[-1], "tool_calls", None):
+            return False
+        for message in turn:
+            if any(call.get("name") in self.mutating_tools for call in getattr(message, "tool_calls", None) or []):
+                return False
+
+        normalized = normalize_prompt(prompt)
+        key = cache_key(content_words(normalized), previous_answer(messages[:start]))
+        entries = self._entries.get(rm_id)
+        if entries is None:
+            entries = self._entries[rm_id] = OrderedDict()
+            while len(self._entries) > self.max_rms:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(rm_id)
+        tool_digest = tool_data_digest(turn)
+        previous = entries.get(key)
+        if previous is not None and previous.tool_digest != tool_digest:
+            # The same question got different tool data (changed outside the agent);
+            # only counted, lookups cannot tell before the tools run
+            self.data_changes += 1
+        entries[key] = _Entry(answer, normalized, tool_digest, await self._version(rm_id))
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries_per_rm:
+            entries.popitem(last=False)
+        self.stores += 1
+        return True
+
+    def invalidate(self, rm_id: int) -> None:
+        """Drop every answer of an RM after its data changed or its history was cleared.
+
+        Other workers notice through the shared data version, which the caller bumps.
+        """
+        self._versions[rm_id] = self._versions.get(rm_id, 0) + 1
+        self._entries.pop(rm_id, None)
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        """Hit and invalidation counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "rms": len(self._entries),
+            "entries": sum(len(entries) for entries in self._entries.values()),
+            "hits": self.hits,
+            "near_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "data_changes": self.data_changes,
+            "invalidations": self.invalidations,
+        }
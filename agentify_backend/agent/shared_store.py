@@ -0,0 +1,225 @@
+"""State shared by the worker processes of a multi-worker deployment.
+
+With ``APP_WORKERS`` > 1 every uvicorn worker can serve any RM. Conversation
+threads already live in the sqlite checkpointer; this module keeps the rest of
+the cross-request state in a SQLite database in WAL mode next to it:
+
+- ``pending_interrupts``: the pending confirmation question of each thread;
+- ``thread_leases``: which worker is currently running a thread, so two workers
+  never run the same thread at once;
+- ``tool_catalog``: the MCP tool schemas, loaded from the MCP server by one
+  worker and reused by the others;
+- ``data_versions``: a counter per RM bumped whenever the agent writes the RM's
+  data, which invalidates what any worker cached from it.
+"""
+import asyncio
+import json
+import logging
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiosqlite
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_interrupts (
+    thread_id TEXT PRIMARY KEY,
+    message TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS thread_leases (
+    thread_id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tool_catalog (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    fingerprint TEXT NOT NULL,
+    schemas TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS data_versions (
+    rm_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+# Polling interval bounds while waiting for another worker's lease
+LEASE_POLL_MIN_SECONDS = 0.01
+LEASE_POLL_MAX_SECONDS = 0.2
+
+
+class SharedStore:
+    """SQLite-backed store used by every worker process.
+
+    Each statement runs in autocommit mode, so no transaction spans an await.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection, lease_seconds: float = 300):
+        """
+        Args:
+            conn: Open connection to the shared database
+            lease_seconds: Lifetime of a thread lease; a lease left behind by a
+                crashed worker is taken over after it expires
+        """
+        self.conn = conn
+        self.lease_seconds = lease_seconds
+        # Identifies this process in thread_leases
+        self.worker_id = uuid.uuid4().hex
+
+    async def setup(self) -> None:
+        await self.conn.executescript(SCHEMA)
+
+    # Pending interrupts
+
+    async def get_interrupt(self, thread_id: str) -> Tuple[bool, Optional[str]]:
+        """
+        Returns:
+            Whether the thread is known, and its pending interrupt question
+        """
+        async with self.conn.execute(
+            "SELECT message FROM pending_interrupts WHERE thread_id = ?", (thread_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return False, None
+        return True, row[0]
+
+    async def put_interrupt(self, thread_id: str, message: Optional[str]) -> None:
+        await self.conn.execute(
+            "INSERT INTO pending_interrupts (thread_id, message, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET message = excluded.message, updated_at = excluded.updated_at",
+            (thread_id, message, time.time()),
+        )
+
+    async def delete_interrupt(self, thread_id: str) -> None:
+        await self.conn.execute("DELETE FROM pending_interrupts WHERE thread_id = ?", (thread_id,))
+
+    # Thread leases
+
+    async def try_acquire_lease(self, thread_id: str) -> Optional[str]:
+        """
+        Take the lease on a thread if it is free or expired.
+
+        Returns:
+            Lease token to pass to release_lease, or None if another run holds it
+        """
+        token = f"{self.worker_id}:{uuid.uuid4().hex}"
+        now = time.time()
+        cursor = await self.conn.execute(
+            "INSERT INTO thread_leases (thread_id, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(thread_id) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE thread_leases.expires_at < ?",
+            (thread_id, token, now + self.lease_seconds, now),
+        )
+        acquired = cursor.rowcount == 1
+        await cursor.close()
+        return token if acquired else None
+
+    async def acquire_lease(self, thread_id: str) -> str:
+        """Wait until the lease on a thread is free, then take it (cancel to give up)."""
+        delay = LEASE_POLL_MIN_SECONDS
+        while True:
+            token = await self.try_acquire_lease(thread_id)
+            if token is not None:
+                return token
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, LEASE_POLL_MAX_SECONDS)
+
+    async def renew_lease(self, thread_id: str, token: str) -> bool:
+        """
+        Push back the expiry of a lease still held.
+
+        Returns:
+            False if the lease expired and another run took the thread over
+        """
+        cursor = await self.conn.execute(
+            "UPDATE thread_leases SET expires_at = ? WHERE thread_id = ? AND owner = ?",
+            (time.time() + self.lease_seconds, thread_id, token),
+        )
+        renewed = cursor.rowcount == 1
+        await cursor.close()
+        return renewed
+
+    async def release_lease(self, thread_id: str, token: str) -> None:
+        await self.conn.execute(
+            "DELETE FROM thread_leases WHERE thread_id = ? AND owner = ?", (thread_id, token)
+        )
+
+    # Tool catalog
+
+    async def get_tool_schemas(self) -> Optional[Tuple[str, Dict[str, List[Dict[str, Any]]], float]]:
+        """
+        Returns:
+            Fingerprint, MCP tool schemas per server and load time, or None if
+            no worker has published the catalog yet
+        """
+        async with self.conn.execute(
+            "SELECT fingerprint, schemas, updated_at FROM tool_catalog WHERE id = 1"
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1]), row[2]
+
+    async def put_tool_schemas(self, fingerprint: str, schemas: Dict[str, List[Dict[str, Any]]]) -> None:
+        await self.conn.execute(
+            "INSERT INTO tool_catalog (id, fingerprint, schemas, updated_at) VALUES (1, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET fingerprint = excluded.fingerprint, "
+            "schemas = excluded.schemas, updated_at = excluded.updated_at",
+            (fingerprint, json.dumps(schemas, ensure_ascii=False), time.time()),
+        )
+
+    # Data versions
+
+    async def get_data_version(self, rm_id: int) -> int:
+        async with self.conn.execute(
+            "SELECT version FROM data_versions WHERE rm_id = ?", (rm_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        return row[0] if row is not None else 0
+
+    async def bump_data_version(self, rm_id: int) -> None:
+        await self.conn.execute(
+            "INSERT INTO data_versions (rm_id, version) VALUES (?, 1) "
+            "ON CONFLICT(rm_id) DO UPDATE SET version = version + 1",
+            (rm_id,),
+        )
+
+
+async def create_shared_store() -> Optional[SharedStore]:
+    """
+    Open the shared store when running with several workers.
+
+    Returns:
+        None for a single worker, whose in-process state needs no sharing
+
+    Raises:
+        ValueError: Several workers are configured without the sqlite checkpointer
+    """
+    if settings.app_workers <= 1:
+        return None
+    if settings.checkpointer_backend.lower() != "sqlite":
+        raise ValueError(
+            "APP_WORKERS > 1 requires CHECKPOINTER_BACKEND=sqlite so every worker sees every thread."
+        )
+
+    conn = await aiosqlite.connect(settings.shared_state_sqlite_path, isolation_level=None)
+    await conn.execute("PRAGMA journal_mode=WAL")
+    await conn.execute("PRAGMA synchronous=NORMAL")
+    # Wait for other workers' writes instead of failing with "database is locked"
+    await conn.execute(f"PRAGMA busy_timeout={int(settings.shared_state_busy_timeout_ms)}")
+    store = SharedStore(conn, lease_seconds=settings.thread_lease_seconds)
+    await store.setup()
+    logger.info("Shared state store opened (worker %s)", store.worker_id[:8])
+    return store
+
+
+async def close_shared_store(store: Optional[SharedStore]) -> None:
+    """Close the shared store's database connection."""
+    if store is not None:
+        await store.conn.close()
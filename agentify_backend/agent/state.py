@@ -0,0 +1,69 @@
+"""Graph state for the agent."""
+from typing import Annotated, Any, Dict, List, Optional
+
+from langgraph.graph import MessagesState
+from typing_extensions import TypedDict
+
+# Upper bound on full tool payloads kept per thread; the tools node also drops
+# the payloads of messages that left the message window
+MAX_STORED_PAYLOADS = 20
+
+
+class MessageWindow(TypedDict):
+    """Incrementally maintained state of the LLM message filter.
+
+    All positions are indices into ``state["messages"]``; see agent.message_window.
+    """
+    # Number of messages already walked over
+    scanned: int
+    # messages[:boundary] is old enough that no tool result can be selected from it
+    boundary: int
+    # Where the walk's tool rule state changed, newest first:
+    # [index, successful tool budget left, failed results accepted (0/1)] after messages[index]
+    breakpoints: List[List[int]]
+    # Selected tool messages and the AI messages kept because of them, oldest first
+    extras: List[int]
+
+
+class ContextState(TypedDict):
+    """Token-budgeted prompt built from the message window."""
+    # Running summary of turns evicted from the prompt
+    summary: str
+    # Messages before this index are represented by the summary only
+    summarized_upto: int
+    # Token count of every message, by index
+    token_counts: List[int]
+    # Messages sent, oldest first
+    kept: List[int]
+    # [index, characters sent] of kept tool results cut to fit the budget
+    truncated: List[List[int]]
+    # prompt_tokens, token_budget, summary_tokens, messages_sent, messages_evicted, messages_truncated
+    metrics: Dict[str, int]
+
+
+def merge_tool_payloads(
+    left: Optional[Dict[str, Any]],
+    right: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Add new full tool payloads and drop those set to None, keeping the newest MAX_STORED_PAYLOADS."""
+    merged = dict(left or {})
+    for tool_call_id, payload in (right or {}).items():
+        if payload is None:
+            merged.pop(tool_call_id, None)
+        else:
+            merged[tool_call_id] = payload
+    if len(merged) > MAX_STORED_PAYLOADS:
+        merged = dict(list(merged.items())[-MAX_STORED_PAYLOADS:])
+    return merged
+
+
+class AgentState(MessagesState):
+    """Messages plus bookkeeping kept across turns."""
+    message_window: MessageWindow
+    context: ContextState
+    # Full decoded results of projected tool messages, by tool call id (see agent.tool_results)
+    tool_payloads: Annotated[Dict[str, Dict[str, Any]], merge_tool_payloads]
+    # Tool call whose result asks for confirmation, set by the tools node
+    pending_confirmation: Optional[str]
+    # Node the approval step routes to ("rm_assistant" or "proceed_confirmed_tool")
+    approval_route: str
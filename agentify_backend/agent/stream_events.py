@@ -0,0 +1,142 @@
+"""Typed events of the ``/chat/stream`` SSE protocol.
+
+Every event is a JSON object with a ``type``, ``done`` and ``interrupted``:
+
+- ``token``: a chunk of the answer (``content``);
+- ``tool_start``: the model called a tool (``tool``, ``tool_call_id``);
+- ``tool_end``: the tool returned (``tool``, ``tool_call_id``, ``status``,
+  ``duration_ms``);
+- ``keepalive``: nothing happened for a while; keeps proxies from closing the
+  idle stream;
+- ``done``: the last event; ``content`` is the confirmation question when
+  ``interrupted`` is true;
+- ``error``: the last event when the turn failed (``content`` describes it).
+
+Token and final events keep the ``content`` / ``done`` / ``interrupted`` keys
+of the original protocol, so clients reading only those keep working.
+"""
+import asyncio
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, List, Optional
+
+from langchain_core.messages import AnyMessage
+
+from .tool_results import get_tool_result
+
+StreamEvent = Dict[str, Any]
+
+
+def token_event(content: Any) -> StreamEvent:
+    return {"type": "token", "content": content, "done": False, "interrupted": False}
+
+
+def done_event(content: str = "", interrupted: bool = False) -> StreamEvent:
+    return {"type": "done", "content": content, "done": True, "interrupted": interrupted}
+
+
+def error_event(content: str) -> StreamEvent:
+    return {"type": "error", "content": content, "done": True, "interrupted": False}
+
+
+def keepalive_event() -> StreamEvent:
+    return {"type": "keepalive", "done": False, "interrupted": False}
+
+
+def tool_events(node: str, update: Any) -> List[StreamEvent]:
+    """
+    Tool progress events of one graph node update (``updates`` stream mode).
+
+    Args:
+        node: Name of the node that produced the update
+        update: The node's state update
+
+    Returns:
+        tool_start events for the tool calls of an assistant message, tool_end
+        events for the results of the tools node
+    """
+    messages: Any = update.get("messages") if isinstance(update, dict) else None
+    if messages is None:
+        return []
+    if not isinstance(messages, list):
+        messages = [messages]
+    events: List[StreamEvent] = []
+    message: AnyMessage
+    if node == "rm_assistant":
+        for message in messages:
+            for tool_call in getattr(message, "tool_calls", None) or []:
+                events.append({
+                    "type": "tool_start",
+                    "tool": tool_call.get("name"),
+                    "tool_call_id": tool_call.get("id"),
+                    "done": False,
+                    "interrupted": False,
+                })
+    elif node == "tools":
+        for message in messages:
+            if message.type != "tool":
+                continue
+            result = get_tool_result(message)
+            events.append({
+                "type": "tool_end",
+                "tool": getattr(message, "name", None),
+                "tool_call_id": getattr(message, "tool_call_id", None),
+                "status": "succeeded" if result["code"] == "succeeded" else "failed",
+                "duration_ms": result.get("duration_ms"),
+                "done": False,
+                "interrupted": False,
+            })
+    return events
+
+
+async def with_keepalive(
+    events: AsyncIterator[StreamEvent],
+    interval: float,
+    max_buffered: int = 64,
+) -> AsyncGenerator[StreamEvent, None]:
+    """
+    Pass events through, adding a keepalive event whenever none came for ``interval`` seconds.
+
+    The source is consumed by one background task (so the graph run keeps its
+    context) and cancelled when the consumer stops early.
+
+    Args:
+        events: Source of stream events
+        interval: Seconds of silence before a keepalive event; 0 disables them
+        max_buffered: Events buffered ahead of a slow consumer
+    """
+    if interval <= 0:
+        async for event in events:
+            yield event
+        return
+
+    queue: "asyncio.Queue[Optional[StreamEvent]]" = asyncio.Queue(maxsize=max_buffered)
+    failure: List[BaseException] = []
+
+    async def pump() -> None:
+        try:
+            async for event in events:
+                await queue.put(event)
+        except Exception as e:
+            failure.append(e)
+        # End of stream (not sent when cancelled, nobody reads it then)
+        await queue.put(None)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=interval)
+            except asyncio.TimeoutError:
+                yield keepalive_event()
+                continue
+            if event is None:
+                break
+            yield event
+        if failure:
+            raise failure[0]
+    finally:
+        if not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
@@ -0,0 +1,205 @@
+"""Read-through cache of MCP tool results.
+
+The read tools are called again and again with the same arguments, within a
+conversation and across RMs. ``ToolResultCache`` is a tool call interceptor
+(placed after the RM header interceptor, before the session pool) serving
+repeated calls from memory:
+
+- entries are keyed by tool name, canonical arguments (sorted JSON) and the RM
+  of the call; tools whose results do not depend on the RM (the card catalog)
+  share one entry across RMs;
+- each tool has its own TTL; tools without one are never cached;
+- only successful results are cached: the MCP tools report failures ("No
+  customer found", "An error occurred ...") as ordinary JSON content with
+  ``code`` "failed", so a result is kept only when it decodes to a JSON object
+  whose ``code`` is "succeeded";
+- writes invalidate precisely: after a task of an RM and customer is created
+  or updated, only that RM's task lookups that could include the customer's
+  tasks and its performance reports are dropped.
+
+In multi-worker mode each entry also records the RM's data version from the
+shared store, so a write on another worker drops the RM's entries too.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from langchain_mcp_adapters.interceptors import MCPToolCallRequest, MCPToolCallResult  # type: ignore
+
+from .shared_store import SharedStore
+from .tool_results import decode_result
+
+# Tools whose results are the same for every RM
+RM_INDEPENDENT_TOOLS = frozenset({"find_card_product"})
+# Tools reading an RM's tasks (dropped when the RM's tasks change)
+TASK_TOOLS = frozenset({"find_rm_task", "report_performance"})
+
+CacheKey = Tuple[str, str, Optional[int]]
+
+
+def canonical_args(args: Optional[Dict[str, Any]]) -> str:
+    """Arguments as sorted JSON, leaving out unset (None) arguments."""
+    return json.dumps(
+        {key: value for key, value in (args or {}).items() if value is not None},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+
+
+def _result_tasks(result: MCPToolCallResult) -> List[Dict[str, Any]]:
+    """Tasks in a find_rm_task result (``task_info`` is one task or a list)."""
+    tasks: List[Dict[str, Any]] = []
+    for content in getattr(result, "content", None) or []:
+        try:
+            task_info = json.loads(getattr(content, "text", "")).get("task_info")
+        except (json.JSONDecodeError, AttributeError):
+            continue
+        tasks.extend(task for task in (task_info if isinstance(task_info, list) else [task_info]) if isinstance(task, dict))
+    return tasks
+
+
+def _succeeded(result: MCPToolCallResult) -> bool:
+    """Whether every text content of a result is a JSON object with ``code`` "succeeded"."""
+    if getattr(result, "isError", False):
+        return False
+    contents = getattr(result, "content", None) or []
+    for content in contents:
+        text = getattr(content, "text", None)
+        if text is None:
+            continue
+        decoded = decode_result(text)
+        if decoded is None or decoded.get("code") != "succeeded":
+            return False
+    return bool(contents)
+
+
+class _Entry:
+    def __init__(self, tool: str, result: MCPToolCallResult, expires_at: float, version: int,
+                 customer_filter: Optional[int], task_ids: Set[int], customer_ids: Set[int]):
+        self.tool = tool
+        self.result = result
+        self.expires_at = expires_at
+        self.version = version
+        # customerId argument of a task lookup (None: the lookup spans all customers)
+        self.customer_filter = customer_filter
+        self.task_ids = task_ids
+        self.customer_ids = customer_ids
+
+
+class ToolResultCache:
+    """Tool call interceptor caching read tool results with per-tool TTLs."""
+
+    def __init__(
+        self,
+        ttls: Dict[str, float],
+        max_entries: int = 10000,
+        store: Optional[SharedStore] = None,
+    ):
+        """
+        Args:
+            ttls: Seconds each tool's results are served from the cache; other tools are not cached
+            max_entries: Entries kept, least recently used first out
+            store: Shared store holding the RM data versions of all worker processes
+        """
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.store = store
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self.invalidated = 0
+
+    @staticmethod
+    def _rm_id(request: MCPToolCallRequest) -> Optional[int]:
+        rm_id = (request.headers or {}).get("x-rm-id")
+        return int(rm_id) if rm_id is not None else None
+
+    async def _version(self, rm_id: Optional[int]) -> int:
+        if self.store is None or rm_id is None:
+            return 0
+        return await self.store.get_data_version(rm_id)
+
+    async def __call__(self, request: MCPToolCallRequest, handler) -> MCPToolCallResult:
+        ttl = self.ttls.get(request.name)
+        if not ttl or ttl <= 0:
+            return await handler(request)
+
+        rm_id = None if request.name in RM_INDEPENDENT_TOOLS else self._rm_id(request)
+        key: CacheKey = (request.name, canonical_args(request.args), rm_id)
+        version = await self._version(rm_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > time.monotonic() and entry.version == version:
+            self._entries.move_to_end(key)
+            self.hits[request.name] = self.hits.get(request.name, 0) + 1
+            return entry.result
+
+        self.misses[request.name] = self.misses.get(request.name, 0) + 1
+        result = await handler(request)
+        if not _succeeded(result):
+            self._entries.pop(key, None)
+            return result
+
+        customer_filter = (request.args or {}).get("customerId")
+        tasks = _result_tasks(result) if request.name == "find_rm_task" else []
+        self._entries[key] = _Entry(
+            request.name,
+            result,
+            time.monotonic() + ttl,
+            version,
+            int(customer_filter) if customer_filter is not None else None,
+            {int(task["id"]) for task in tasks if task.get("id") is not None},
+            {int(task["customerId"]) for task in tasks if task.get("customerId") is not None},
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def invalidate_tasks(self, rm_id: int, customer_id: Optional[int] = None, task_id: Optional[int] = None) -> int:
+        """
+        Drop the entries a task write of an RM may have changed.
+
+        Args:
+            rm_id: RM owning the task
+            customer_id: Customer of the task, if known
+            task_id: ID of an updated task, used to find its customer when not given
+
+        Returns:
+            Number of entries dropped
+        """
+        rm_entries = {key: entry for key, entry in self._entries.items() if key[2] == rm_id and entry.tool in TASK_TOOLS}
+        if customer_id is None and task_id is not None:
+            # An update names only the task; its customer is known if a cached lookup returned it
+            for entry in rm_entries.values():
+                if task_id in entry.task_ids and len(entry.customer_ids) == 1:
+                    customer_id = next(iter(entry.customer_ids))
+                    break
+
+        dropped = 0
+        for key, entry in rm_entries.items():
+            affected = (
+                entry.tool != "find_rm_task"
+                or customer_id is None
+                or entry.customer_filter is None
+                or entry.customer_filter == customer_id
+                or (task_id is not None and task_id in entry.task_ids)
+            )
+            if affected:
+                del self._entries[key]
+                dropped += 1
+        self.invalidated += dropped
+        return dropped
+
+    def stats(self) -> dict:
+        """Entries and hit rates per tool for monitoring."""
+        tools = {}
+        for tool in sorted(set(self.hits) | set(self.misses)):
+            hits, misses = self.hits.get(tool, 0), self.misses.get(tool, 0)
+            tools[tool] = {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 3)}
+        return {
+            "entries": len(self._entries),
+            "invalidated": self.invalidated,
+            "tools": tools,
+        }
@@ -0,0 +1,197 @@
+"""Cached MCP tool catalog with schema fingerprinting and background refresh."""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient  # type: ignore
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool  # type: ignore
+from mcp.types import Tool as MCPTool
+
+from .shared_store import SharedStore
+
+logger = logging.getLogger(__name__)
+
+
+def fingerprint_tools(tools: List[BaseTool]) -> str:
+    """Hash the name, description and argument schema of every tool."""
+    schemas = sorted(
+        (
+            {
+                "name": tool.name,
+                "description": tool.description,
+                "args": tool.args,
+            }
+            for tool in tools
+        ),
+        key=lambda schema: schema["name"],
+    )
+    payload = json.dumps(schemas, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ToolCatalog:
+    """Process-wide cache of the LangChain tools loaded from the MCP server.
+
+    Cached tools are served without a round trip to the MCP server. A background
+    task reloads the tool list on a timer and only notifies listeners when the
+    schema fingerprint actually changed.
+
+    With a shared store (multi-worker mode) the MCP tool schemas are kept in the
+    store: a worker only asks the MCP server when the stored schemas are older
+    than the refresh interval, and the other workers build their tools from them.
+    """
+
+    def __init__(
+        self,
+        mcp_client: MultiServerMCPClient,
+        refresh_interval: float = 300,
+        store: Optional[SharedStore] = None,
+    ):
+        """
+        Args:
+            mcp_client: Client used to load the tools
+            refresh_interval: Seconds between background refreshes (<= 0 disables)
+            store: Shared store holding the schemas for every worker process
+        """
+        self.mcp_client = mcp_client
+        self.refresh_interval = refresh_interval
+        self.store = store
+        self.shared_loads = 0
+        self.tools: Optional[List[BaseTool]] = None
+        self.fingerprint: Optional[str] = None
+        self.loaded_at: Optional[float] = None
+        self.hits = 0
+        self.loads = 0
+        self._listeners: List[Callable[[List[BaseTool]], Awaitable[None]]] = []
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def add_listener(self, listener: Callable[[List[BaseTool]], Awaitable[None]]) -> None:
+        """Register a coroutine called with the new tools whenever the schemas change."""
+        self._listeners.append(listener)
+
+    async def get_tools(self) -> List[BaseTool]:
+        """Return the cached tools, loading them on the first call only."""
+        if self.tools is not None:
+            self.hits += 1
+            return self.tools
+        async with self._lock:
+            if self.tools is None:
+                await self._load()
+        return self.tools  # type: ignore[return-value]
+
+    async def refresh(self) -> bool:
+        """
+        Reload the tools from the MCP server.
+
+        Returns:
+            True if the schema fingerprint changed and listeners were notified
+        """
+        async with self._lock:
+            return await self._load()
+
+    async def _list_schemas(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch the raw MCP tool schemas of every server."""
+        schemas: Dict[str, List[Dict[str, Any]]] = {}
+        for server_name in self.mcp_client.connections:
+            server_schemas: List[Dict[str, Any]] = []
+            async with self.mcp_client.session(server_name) as session:
+                cursor = None
+                while True:
+                    page = await session.list_tools(cursor=cursor)
+                    server_schemas.extend(tool.model_dump(mode="json") for tool in page.tools)
+                    cursor = page.nextCursor
+                    if not cursor:
+                        break
+            schemas[server_name] = server_schemas
+        return schemas
+
+    def _convert(self, schemas: Dict[str, List[Dict[str, Any]]]) -> List[BaseTool]:
+        """Build LangChain tools from stored MCP tool schemas."""
+        return [
+            convert_mcp_tool_to_langchain_tool(
+                None,
+                MCPTool.model_validate(schema),
+                connection=self.mcp_client.connections[server_name],
+                callbacks=self.mcp_client.callbacks,
+                tool_interceptors=self.mcp_client.tool_interceptors,
+                server_name=server_name,
+            )
+            for server_name, server_schemas in schemas.items()
+            for schema in server_schemas
+        ]
+
+    async def _load_shared(self) -> List[BaseTool]:
+        assert self.store is not None
+        shared = await self.store.get_tool_schemas()
+        if shared is not None and (self.refresh_interval <= 0 or time.time() - shared[2] < self.refresh_interval):
+            # Fresh enough: another worker (or this one) loaded them recently
+            self.shared_loads += 1
+            return self._convert(shared[1])
+        schemas = await self._list_schemas()
+        tools = self._convert(schemas)
+        await self.store.put_tool_schemas(fingerprint_tools(tools), schemas)
+        return tools
+
+    async def _load(self) -> bool:
+        if self.store is not None:
+            tools = await self._load_shared()
+        else:
+            tools = await self.mcp_client.get_tools()
+        self.loads += 1
+        fingerprint = fingerprint_tools(tools)
+        self.loaded_at = time.time()
+        if fingerprint == self.fingerprint:
+            return False
+
+        previous = self.fingerprint
+        self.tools = tools
+        self.fingerprint = fingerprint
+        if previous is not None:
+            logger.info("MCP tool schemas changed (%s -> %s)", previous[:12], fingerprint[:12])
+            for listener in self._listeners:
+                await listener(tools)
+        return True
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Keep serving the cached tools; retry on the next tick
+                logger.warning("Failed to refresh MCP tool catalog: %s", e)
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        """Start the background refresh task (warms the cache immediately)."""
+        if self.refresh_interval <= 0 or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Cancel the background refresh task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def stats(self) -> dict:
+        """Catalog counters for monitoring."""
+        return {
+            "tools": len(self.tools) if self.tools is not None else 0,
+            "fingerprint": self.fingerprint,
+            "loaded_at": self.loaded_at,
+            "hits": self.hits,
+            "loads": self.loads,
+            "shared_loads": self.shared_loads,
+        }
@@ -0,0 +1,150 @@
+"""Execution of the tool calls of one assistant message.
+
+The LLM may ask for several tools at once, e.g. three ``find_customer`` calls
+to compare customers. ``ToolExecutor`` is the graph's tools node:
+
+- read-only calls are independent and run concurrently with
+  ``asyncio.gather``, at most ``max_concurrency`` at a time per turn;
+- calls to mutating tools only validate the task and ask for confirmation, and
+  the approval stage handles one confirmation at a time. The first mutating
+  call runs; any further ones are answered with a "one task at a time" result
+  so the model asks for them again after the first is confirmed or declined.
+
+Results are returned in call order, except that the mutating call's result is
+last. Each result is decoded and projected once as it comes back (see
+agent.tool_results); the full results of projected messages go to
+``tool_payloads``, where the payloads of tool messages no longer in the
+message window are dropped in the same update. The node also records the call
+asking for confirmation in ``pending_confirmation`` for the approval stage.
+"""
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langgraph.prebuilt import ToolNode
+
+from .message_window import selected_tool_messages, update_message_window
+from .state import AgentState
+from .tool_results import ToolResultProjector, get_tool_result, make_tool_result
+
+DEFERRED_RESULT = {
+    "message": (
+        "Only one task can be created or updated at a time. Call this tool again "
+        "after the user has confirmed or declined the previous task."
+    ),
+    "code": "failed",
+}
+
+
+class ToolExecutor:
+    """Tools node running read calls concurrently and mutating calls one at a time."""
+
+    def __init__(
+        self,
+        tools: Sequence[BaseTool],
+        mutating_tools: Set[str],
+        projector: ToolResultProjector,
+        max_concurrency: int = 4,
+    ):
+        """
+        Args:
+            tools: Tools the model can call
+            mutating_tools: Names of tools that change data and need approval
+            projector: Decodes and shrinks results before they enter the state
+            max_concurrency: Read calls of one turn running at the same time
+        """
+        # Runs single calls with ToolNode's validation and error handling
+        self.tool_node = ToolNode(tools)
+        self.mutating_tools = mutating_tools
+        self.projector = projector
+        self.max_concurrency = max(1, max_concurrency)
+
+    async def _run(
+        self,
+        call: ToolCall,
+        state: AgentState,
+        config: RunnableConfig,
+    ) -> List[Tuple[ToolMessage, float]]:
+        """Run one call; returns its messages with the call's wall time in milliseconds."""
+        start = time.perf_counter()
+        # Passed with the state so tools reading it (read_tool_result) get it injected
+        output = await self.tool_node.ainvoke(
+            {"__type": "tool_call_with_context", "tool_call": {**call, "type": "tool_call"}, "state": state},
+            config,
+        )
+        duration_ms = round((time.perf_counter() - start) * 1000, 1)
+        return [(message, duration_ms) for message in output["messages"] if isinstance(message, ToolMessage)]
+
+    def _project(
+        self,
+        tool_messages: List[Tuple[ToolMessage, float]],
+        payloads: Dict[str, Any],
+    ) -> List[ToolMessage]:
+        """Attach envelopes and projected content, collecting full payloads into ``payloads``."""
+        projected = []
+        for tool_message, duration_ms in tool_messages:
+            message, payload = self.projector.project_message(tool_message, duration_ms)
+            if payload is not None:
+                payloads[message.tool_call_id] = payload
+            projected.append(message)
+        return projected
+
+    @staticmethod
+    def _stale_payloads(state: AgentState) -> Dict[str, None]:
+        """Deletions of stored payloads whose messages are not in the message window."""
+        stored = state.get("tool_payloads") or {}
+        if not stored:
+            return {}
+        window = update_message_window(state)
+        live = {
+            get_tool_result(message)["payload_ref"]
+            for message in selected_tool_messages(window, state["messages"])
+        }
+        return {payload_ref: None for payload_ref in stored if payload_ref not in live}
+
+    def _deferred(self, call: ToolCall) -> ToolMessage:
+        return ToolMessage(
+            content=json.dumps(DEFERRED_RESULT),
+            name=call["name"],
+            tool_call_id=call["id"],
+            status="error",
+            artifact=make_tool_result(DEFERRED_RESULT),
+        )
+
+    async def __call__(self, state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+        last_message = state["messages"][-1]
+        tool_calls = last_message.tool_calls if isinstance(last_message, AIMessage) else []
+
+        reads = [call for call in tool_calls if call["name"] not in self.mutating_tools]
+        mutations = [call for call in tool_calls if call["name"] in self.mutating_tools]
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_read(call: ToolCall) -> List[Tuple[ToolMessage, float]]:
+            async with semaphore:
+                return await self._run(call, state, config)
+
+        results = await asyncio.gather(*(run_read(call) for call in reads))
+        read_messages = [message for result in results for message in result]
+        mutation_messages = await self._run(mutations[0], state, config) if mutations else []
+
+        # Drop the payloads that left the window, after the reads that may have used them
+        payloads: Dict[str, Any] = self._stale_payloads(state)
+        messages = self._project(read_messages, payloads)
+        messages += [self._deferred(call) for call in mutations[1:]]
+        messages += self._project(mutation_messages, payloads)
+        # Only the mutating call that ran can ask for confirmation
+        pending_confirmation: Optional[str] = next(
+            (message.tool_call_id for message in messages if message.artifact["ask_confirmation"]),
+            None,
+        )
+
+        return {
+            "messages": messages,
+            "pending_confirmation": pending_confirmation,
+            "tool_payloads": payloads,
+        }
@@ -0,0 +1,243 @@
+"""Decoding and projection of tool results before they enter the LLM context.
+
+MCP tools return full JSON payloads. The tools node decodes each result once,
+right after the MCP adapter returns it, and attaches a ``ToolResult`` envelope
+(result code, confirmation flag, payload reference) as the message's
+``artifact``. Later stages (message window, approval) read the envelope and
+never parse the content again; the artifact is not sent to the model.
+
+Before a result reaches the model it is projected down to the fields the model
+uses, long lists are capped with an "N more omitted" marker and long strings
+are shortened. The full decoded result of a projected message is kept in
+``state["tool_payloads"]`` under its tool call id (the envelope's
+``payload_ref``) for as long as the message is in the message window. The
+model reads dropped fields and omitted list items from it with the
+``read_tool_result`` tool instead of calling the MCP tool again.
+"""
+import json
+from typing import Annotated, Any, Dict, Optional, Sequence, Tuple
+
+from langchain_core.messages import AnyMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import InjectedState
+from typing_extensions import TypedDict
+
+# Keys every result keeps: routing (code, ask_confirmation) and the tool's message
+RESULT_KEYS = ("code", "message", "ask_confirmation")
+
+# Fields of each record the model needs, per tool and result key. Records of
+# keys not listed here are passed through (subject to the list/string caps).
+TOOL_RESULT_FIELDS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    # The id for task and recommendation calls, and what the RM asks about; the
+    # behavior description is only read by recommend_card_products, server side
+    "find_customer": {
+        "customer_info": (
+            "id", "name", "email", "phone", "address", "state", "zip", "country",
+            "dob", "gender", "jobTitle", "segment", "isActive",
+        ),
+    },
+    # Every field of a task: the id and customer for update_rm_task, the rest to describe it
+    "find_rm_task": {
+        "task_info": ("id", "customerId", "taskType", "taskStatus", "taskDetails", "dueDate"),
+    },
+    "find_card_product": {
+        "product_info": ("id", "cardType", "cardProductName", "cardDescription", "cardNetwork", "isActive"),
+    },
+}
+
+
+class ToolResult(TypedDict):
+    """Envelope of a decoded tool result, carried in ``ToolMessage.artifact``."""
+    # Result code; "succeeded" when the tool reports none, None when the result is not a JSON object
+    code: Optional[str]
+    # The tool validated a task and waits for the RM's confirmation
+    ask_confirmation: bool
+    # Key of the full result in state["tool_payloads"] (the tool call id) when
+    # the content is a projection of it, None when the content is the full result
+    payload_ref: Optional[str]
+    # The adapter's own artifact (non-text MCP content), if any
+    attachments: Any
+    # Wall time of the call, for progress events
+    duration_ms: Optional[float]
+
+
+def decode_result(content: Any) -> Optional[Dict[str, Any]]:
+    """Decoded JSON object of a tool message's content, or None if it is not one."""
+    if not isinstance(content, str):
+        return None
+    try:
+        result = json.loads(content)
+    except json.JSONDecodeError:
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def make_tool_result(
+    result: Optional[Dict[str, Any]],
+    payload_ref: Optional[str] = None,
+    attachments: Any = None,
+    duration_ms: Optional[float] = None,
+) -> ToolResult:
+    """Envelope of a decoded result (None for results that are not JSON objects)."""
+    return ToolResult(
+        code=result.get("code", "succeeded") if result is not None else None,
+        ask_confirmation=bool(result.get("ask_confirmation")) if result is not None else False,
+        payload_ref=payload_ref,
+        attachments=attachments,
+        duration_ms=duration_ms,
+    )
+
+
+def get_tool_result(message: AnyMessage) -> ToolResult:
+    """Envelope of a tool message, decoding the content only for messages stored without one."""
+    artifact = getattr(message, "artifact", None)
+    if isinstance(artifact, dict) and "ask_confirmation" in artifact:
+        if "payload_ref" not in artifact:
+            # Checkpointed with a "projected" flag, before full results were stored
+            artifact = {key: value for key, value in artifact.items() if key != "projected"}
+            artifact["payload_ref"] = None
+        return artifact  # type: ignore[return-value]
+    # Checkpointed before envelopes were attached
+    return make_tool_result(decode_result(message.content), attachments=artifact)
+
+
+def get_payload(state: Dict[str, Any], envelope: ToolResult) -> Optional[Dict[str, Any]]:
+    """Full decoded result behind a projected message, None if it is not (or no longer) stored.
+
+    ``state["tool_payloads"]`` is the only store of full results; every reader
+    resolves an envelope's ``payload_ref`` through this function.
+    """
+    payload_ref = envelope.get("payload_ref")
+    if payload_ref is None:
+        return None
+    return (state.get("tool_payloads") or {}).get(payload_ref)
+
+
+def find_tool_message(messages: Sequence[AnyMessage], tool_call_id: str) -> Optional[ToolMessage]:
+    """Newest tool message answering the given call, if any."""
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage) and message.tool_call_id == tool_call_id:
+            return message
+    return None
+
+
+READ_TOOL_RESULT = "read_tool_result"
+
+
+@tool(READ_TOOL_RESULT)
+def read_tool_result(
+    call_id: str,
+    key: str,
+    state: Annotated[Dict[str, Any], InjectedState],
+    offset: int = 0,
+    limit: int = 20,
+) -> str:
+    """Read the full value of one key of an earlier tool result.
+
+    Tool results are shortened before you see them: records keep only their
+    main fields, lists end with an "N more omitted" marker and long texts are
+    cut. Use this tool to read the omitted fields, list items or text instead
+    of calling the original tool again.
+
+    Args:
+        call_id: Id of the earlier tool call whose result was shortened
+        key: Top-level key of that result, e.g. "customer_info"
+        offset: For lists, index of the first item to return
+        limit: For lists, number of items to return
+    """
+    message = find_tool_message(state.get("messages") or [], call_id)
+    if message is None:
+        return json.dumps({"code": "failed", "message": "No tool call with this id."})
+    envelope = get_tool_result(message)
+    if envelope["payload_ref"] is None:
+        return json.dumps({
+            "code": "failed",
+            "message": "This result was not shortened; its content is already complete.",
+        })
+    payload = get_payload(state, envelope)
+    if payload is None:
+        return json.dumps({
+            "code": "failed",
+            "message": "The full result is no longer stored; call the original tool again.",
+        })
+    if key not in payload:
+        return json.dumps({
+            "code": "failed",
+            "message": f"The result has no key {key!r}; available keys: {sorted(payload)}.",
+        }, ensure_ascii=False)
+    value = payload[key]
+    result: Dict[str, Any] = {"code": "succeeded"}
+    if isinstance(value, list):
+        offset = max(0, offset)
+        result.update(total=len(value), offset=offset, items=value[offset:offset + max(1, limit)])
+    else:
+        result[key] = value
+    return json.dumps(result, ensure_ascii=False, default=str)
+
+
+class ToolResultProjector:
+    """Shrinks tool results to what the model needs."""
+
+    def __init__(self, max_list_items: int = 20, max_string_chars: int = 4000):
+        """
+        Args:
+            max_list_items: Items kept of any list; the rest are replaced by a marker
+            max_string_chars: Characters kept of any string value
+        """
+        self.max_list_items = max_list_items
+        self.max_string_chars = max_string_chars
+
+    def _shrink(self, value: Any, fields: Optional[Tuple[str, ...]] = None) -> Any:
+        if isinstance(value, dict):
+            if fields is not None:
+                value = {key: value[key] for key in fields if key in value}
+            # Drop empty fields, they carry no information for the model
+            return {key: self._shrink(item) for key, item in value.items() if item is not None and item != ""}
+        if isinstance(value, list):
+            items = [self._shrink(item, fields) for item in value[:self.max_list_items]]
+            omitted = len(value) - len(items)
+            if omitted > 0:
+                items.append(f"... {omitted} more omitted")
+            return items
+        if isinstance(value, str) and len(value) > self.max_string_chars:
+            omitted = len(value) - self.max_string_chars
+            return value[:self.max_string_chars] + f"... ({omitted} more characters omitted)"
+        return value
+
+    def project(self, tool_name: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Project one decoded tool result."""
+        fields = TOOL_RESULT_FIELDS.get(tool_name, {})
+        projected: Dict[str, Any] = {}
+        for key, value in result.items():
+            if key in RESULT_KEYS:
+                projected[key] = value
+            else:
+                projected[key] = self._shrink(value, fields.get(key))
+        return projected
+
+    def project_message(
+        self,
+        message: ToolMessage,
+        duration_ms: Optional[float] = None,
+    ) -> Tuple[ToolMessage, Optional[Dict[str, Any]]]:
+        """
+        Decode a tool message's result, attach its envelope and project its content.
+
+        Args:
+            message: Tool message as returned by the tool
+            duration_ms: Wall time of the call
+
+        Returns:
+            The message to add to the state, and the full decoded result to store
+            under the envelope's payload_ref (None when the content is not projected)
+        """
+        result = decode_result(message.content)
+        # Pages read back from a stored payload are not stored again
+        if result is not None and message.name != READ_TOOL_RESULT:
+            content = json.dumps(self.project(message.name or "", result), ensure_ascii=False, default=str)
+            if len(content) < len(message.content):  # type: ignore[arg-type]
+                envelope = make_tool_result(result, message.tool_call_id, message.artifact, duration_ms)
+                return message.model_copy(update={"content": content, "artifact": envelope}), result
+        envelope = make_tool_result(result, attachments=message.artifact, duration_ms=duration_ms)
+        return message.model_copy(update={"artifact": envelope}), None
+
@@ -0,0 +1,172 @@
+"""Customer lookups with the fuzzy search index vs ``LIKE '%...%'`` scans.
+
+Generates synthetic customers (Vietnamese names, emails, phones, addresses),
+indexes them with ``mcp_server/src/tools/customer_index.py`` and looks up
+sampled customers by:
+
+- ``name``: full name as stored;
+- ``name, no diacritics``: "Nguyen Van An" for "Nguyễn Văn An";
+- ``name, typo``: two letters of the given name swapped;
+- ``email prefix``: the email's local part;
+- ``phone, local format`` / ``phone, last 7 digits``: "0376329893" for
+  "+840376329893", and a partial phone number;
+- ``name + address``: given name and street number.
+
+For each kind it prints the index's p50/p99 latency and how often the customer
+was ranked first (ties included: synthetic names repeat, and a folded or
+partial query may fit several customers equally well). The same lookups run as ``LIKE`` scans of a SQLite
+copy of the table for the baseline. It also reports build time, resident
+memory and update throughput.
+
+Usage:
+    python benchmarks/customer_index_benchmark.py [--customers 1000000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import resource
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "mcp_server", "src", "tools",
+))
+
+from customer_index import CustomerSearchIndex, fold  # noqa: E402
+
+FAMILY_NAMES = (
+    "Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Huỳnh", "Phan", "Vũ", "Võ", "Đặng",
+    "Bùi", "Đỗ", "Hồ", "Ngô", "Dương", "Lý",
+)
+MIDDLE_NAMES = (
+    "Văn", "Thị", "Hữu", "Đức", "Công", "Quang", "Minh", "Thanh", "Ngọc", "Hoài",
+    "Xuân", "Thu", "Duy", "Gia", "Bảo", "Kim", "Phương", "Tuấn", "Hải", "Anh",
+)
+GIVEN_NAMES = (
+    "An", "Anh", "Bình", "Bích", "Châu", "Chi", "Cường", "Dũng", "Dung", "Duyên",
+    "Giang", "Hà", "Hải", "Hạnh", "Hiếu", "Hòa", "Hùng", "Hương", "Huy", "Khánh",
+    "Khoa", "Kiên", "Lan", "Linh", "Loan", "Long", "Mai", "Minh", "My", "Nam",
+    "Nga", "Ngân", "Nhung", "Phong", "Phúc", "Phương", "Quân", "Quang", "Quỳnh", "Sơn",
+    "Tâm", "Thảo", "Thắng", "Thành", "Thủy", "Tiến", "Toàn", "Trang", "Trinh", "Trung",
+    "Tú", "Tuấn", "Tùng", "Uyên", "Vân", "Việt", "Vinh", "Vy", "Xuân", "Yến",
+)
+STREETS = (
+    "Điện Biên Phủ", "Nguyễn Văn Cừ", "Hoàng Văn Thụ", "Lê Lợi", "Trần Hưng Đạo", "Hai Bà Trưng",
+    "Lý Thường Kiệt", "Nguyễn Trãi", "Cách Mạng Tháng Tám", "Phạm Văn Đồng",
+)
+DISTRICTS = ("Ba Đình", "Hoàn Kiếm", "Cầu Giấy", "Quận 1", "Quận 3", "Quận 5", "Bình Thạnh", "Ô Môn", "Hải Châu")
+DOMAINS = ("gmail.com", "outlook.com", "yahoo.com", "vpbank.com.vn")
+
+Customer = Tuple[int, str, str, str, str]
+
+
+def make_customers(count: int) -> List[Customer]:
+    random.seed(3)
+    customers = []
+    for customer_id in range(1, count + 1):
+        name = f"{random.choice(FAMILY_NAMES)} {random.choice(MIDDLE_NAMES)} {random.choice(GIVEN_NAMES)}"
+        email = f"{fold(name).replace(' ', '.')}{random.randrange(1000)}@{random.choice(DOMAINS)}"
+        phone = f"+840{random.choice('379')}{random.randrange(10 ** 8):08d}"
+        address = f"{random.randrange(1, 1000)} {random.choice(STREETS)}, {random.choice(DISTRICTS)}"
+        customers.append((customer_id, name, email, phone, address))
+    return customers
+
+
+def typo(word: str) -> str:
+    if len(word) < 4:
+        return word + word[-1]
+    position = random.randrange(1, len(word) - 2)
+    return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+
+QUERIES: Dict[str, Callable[[Customer], Dict[str, str]]] = {
+    "name": lambda customer: {"name": customer[1]},
+    "name, no diacritics": lambda customer: {"name": fold(customer[1]).title()},
+    "name, typo": lambda customer: {"name": " ".join(customer[1].split()[:-1] + [typo(customer[1].split()[-1])])},
+    "email prefix": lambda customer: {"email": customer[2].split("@")[0]},
+    "phone, local format": lambda customer: {"phone": "0" + customer[3][4:]},
+    "phone, last 7 digits": lambda customer: {"phone": customer[3][-7:]},
+    "name + address": lambda customer: {"name": customer[1].split()[-1], "address": customer[4].split(",")[0]},
+}
+
+
+def like_lookup(connection: sqlite3.Connection, criteria: Dict[str, str]) -> List[int]:
+    clauses = " AND ".join(f"{field} LIKE ?" for field in criteria)
+    rows = connection.execute(
+        f"SELECT id FROM customer WHERE {clauses}", [f"%{value}%" for value in criteria.values()]
+    ).fetchall()
+    return [row[0] for row in rows]
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(args: argparse.Namespace) -> None:
+    customers = make_customers(args.customers)
+    print(f"customers: {args.customers}, queries per kind: {args.queries}")
+
+    before = rss_mb()
+    start = time.perf_counter()
+    index = CustomerSearchIndex()
+    for customer in customers:
+        index.add(*customer)
+    print(f"index build: {time.perf_counter() - start:.1f} s, peak RSS +{rss_mb() - before:.0f} MB")
+
+    with tempfile.TemporaryDirectory() as directory:
+        connection = sqlite3.connect(os.path.join(directory, "customers.db"))
+        connection.execute("CREATE TABLE customer (id INTEGER PRIMARY KEY, name TEXT, email TEXT, phone TEXT, address TEXT)")
+        connection.executemany("INSERT INTO customer VALUES (?, ?, ?, ?, ?)", customers)
+        connection.commit()
+
+        random.seed(5)
+        print(f"{'':>20} {'p50 ms':>9} {'p99 ms':>9} {'top 1':>7} {'LIKE ms':>9} {'LIKE found':>11}")
+        for kind, make_query in QUERIES.items():
+            sample = random.sample(customers, args.queries)
+            latencies, top1 = [], 0
+            for customer in sample:
+                criteria = make_query(customer)
+                start = time.perf_counter()
+                result = index.search(limit=200, **criteria)
+                latencies.append((time.perf_counter() - start) * 1000)
+                rank = {match.customer_id: (match.exact, match.contained, match.score) for match in result.matches}
+                top1 += customer[0] in rank and rank[customer[0]] == rank[result.matches[0].customer_id]
+
+            like_latencies, like_found = [], 0
+            for customer in sample[:args.like_queries]:
+                criteria = make_query(customer)
+                start = time.perf_counter()
+                found = like_lookup(connection, criteria)
+                like_latencies.append((time.perf_counter() - start) * 1000)
+                like_found += customer[0] in found
+
+            latencies.sort()
+            print(
+                f"{kind:>20} {statistics.median(latencies):>9.3f} {latencies[int(len(latencies) * 0.99) - 1]:>9.3f}"
+                f" {top1 / len(sample):>7.0%}"
+                f" {statistics.median(like_latencies):>9.1f} {like_found / len(like_latencies):>11.0%}"
+            )
+        connection.close()
+
+    updates = min(args.queries * 20, len(customers))
+    start = time.perf_counter()
+    for customer_id, name, email, phone, address in random.sample(customers, updates):
+        index.add(customer_id, name, email, phone, address.replace(",", " mới,"))
+    elapsed = time.perf_counter() - start
+    print(f"updates: {updates / elapsed:.0f}/s ({index.removed} tombstones)")
+    start = time.perf_counter()
+    index.compact()
+    print(f"compact: {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--like-queries", type=int, default=20)
+    main(parser.parse_args())
@@ -0,0 +1,94 @@
+"""find_customer with many matches: load-all disambiguation vs the streamed one.
+
+Builds the SQLite stand-in of ``tool_py_benchmark`` and runs find_customer
+lookups matching from a few thousand customers to the whole table, two ways:
+
+- ``load all``: the old path; every matching row fetched as a ``CustomerRow``
+  and the field to ask back for chosen by counting the distinct values of every
+  column (``most_distinct_column``);
+- ``streamed``: ``find_customer`` as it is now; the matches streamed in batches
+  through ``disambiguation.choose_clarifying_fields``, which stops once the
+  best fields are stable, plus a ``COUNT(*)`` for the number of matches.
+
+Prints the latency, the peak traced memory and the field each path asks for
+(the streamed path ranks by information gain, so it may pick another field
+with as many distinct values).
+
+Usage:
+    python benchmarks/disambiguation_benchmark.py [--customers 400000] [--rounds 5]
+"""
+import argparse
+import asyncio
+import os
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "mcp_server", "src", "tools",
+))
+
+import tool_py  # noqa: E402
+from tool_py_benchmark import build_database  # noqa: E402
+
+LOOKUPS: Dict[str, Dict[str, str]] = {
+    "name": {"customerName": "Nguyễn Văn An"},
+    "segment + state": {"customerSegment": "DIAMOND", "customerState": "Hà Nội"},
+    "state": {"customerState": "Hà Nội"},
+    "job title (all)": {"customerJobTitle": "Kỹ sư"},
+}
+
+
+async def load_all(criteria: Dict[str, str]) -> Tuple[int, str]:
+    customers, _ = await tool_py.search_customers(tool_py.get_database(), **criteria)
+    return len(customers), tool_py.most_distinct_column(customers)
+
+
+async def streamed(criteria: Dict[str, str]) -> Tuple[int, str]:
+    result = await tool_py.find_customer.ainvoke(criteria)
+    count, column = re.search(r"\((\d+)\).*customer's (?:full )?(\w+)", result["message"]).groups()
+    return int(count), column
+
+
+async def measure(path: Callable[[Dict[str, str]], Awaitable[Tuple[int, str]]], criteria: Dict[str, str], rounds: int) -> List[Any]:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        count, column = await path(criteria)
+        latencies.append((time.perf_counter() - start) * 1000)
+    tracemalloc.start()
+    await path(criteria)
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return [count, statistics.median(latencies), peak, column]
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "agentify.db")
+        build_database(path, args.customers, 0, 100)
+        tool_py.configure_database(tool_py.SQLiteDatabase(path))
+        print(f"customers: {args.customers}, rounds: {args.rounds}")
+        print(f"{'':>16} {'matches':>8} {'load ms':>9} {'load MB':>8} {'asks':>8} {'stream ms':>10} {'stream MB':>10} {'asks':>8} {'speedup':>8}")
+        for name, criteria in LOOKUPS.items():
+            count, old_ms, old_mb, old_column = await measure(load_all, criteria, args.rounds)
+            new_count, new_ms, new_mb, new_column = await measure(streamed, criteria, args.rounds)
+            if new_count != count:
+                raise AssertionError(f"{name}: the paths counted different matches")
+            print(
+                f"{name:>16} {count:>8} {old_ms:>9.1f} {old_mb:>8.1f} {old_column:>8}"
+                f" {new_ms:>10.1f} {new_mb:>10.2f} {new_column:>8} {old_ms / new_ms:>7.1f}x"
+            )
+        await tool_py.get_database().close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=400000)
+    parser.add_argument("--rounds", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,166 @@
+"""Aggregations over a JSON database export: ``json.load`` vs the columnar store.
+
+Writes a synthetic ``database_export_*.json`` ``--scale`` times the size of
+``mcp_server/src/data/exports/database_export_2025-11-07.json`` (its RMs,
+customers, tasks and cards repeated under new ids, 2-space indented like the
+export script) and computes customers per segment, per state and tasks per
+status of one segment, per customer segment and status, two ways:
+
+- ``json.load``: the whole document loaded, then counted with ``Counter``;
+- ``columnar``: ``mcp_server/src/tools/export_analytics.py``; the export
+  streamed into column files once, then every query run on the memory-mapped
+  store.
+
+Both must give the same counts. Prints the time and the peak traced Python
+memory of loading / converting and of the queries.
+
+Usage:
+    python benchmarks/export_analytics_benchmark.py [--scale 100]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.join(ROOT, "mcp_server", "src", "tools"))
+
+from export_analytics import ExportStore, convert_exports  # noqa: E402
+
+EXPORT = os.path.join(ROOT, "mcp_server", "src", "data", "exports", "database_export_2025-11-07.json")
+SEGMENT = "Diamond"
+
+
+def write_export(path: str, scale: int) -> None:
+    """The sample export's tables ``scale`` times, written record by record."""
+    with open(EXPORT, encoding="utf-8") as file:
+        sample = json.load(file)
+    data = sample["data"]
+    sizes = {table: max((record["id"] for record in records), default=0) for table, records in data.items()}
+    with open(path, "w", encoding="utf-8") as file:
+        file.write('{\n  "exportDate": "%s",\n  "statistics": %s,\n  "data": {' % (
+            sample["exportDate"], json.dumps({table: len(records) * scale for table, records in data.items()})
+        ))
+        for position, (table, records) in enumerate(data.items()):
+            file.write(("," if position else "") + f'\n    "{table}": [')
+            for copy in range(scale):
+                for index, record in enumerate(records):
+                    record = dict(record, id=record["id"] + copy * sizes[table])
+                    if "rmId" in record:
+                        record["rmId"] += copy * sizes["relationshipManagers"]
+                    if "customerId" in record and table == "tasks":
+                        record["customerId"] += copy * sizes["customers"]
+                    text = json.dumps(record, ensure_ascii=False, indent=2).replace("\n", "\n      ")
+                    file.write(("," if copy or index else "") + "\n      " + text)
+            file.write("\n    ]")
+        file.write("\n  }\n}\n")
+
+
+def loaded_queries(document: Dict[str, Any]) -> Dict[str, Callable[[], Dict[Any, int]]]:
+    customers = document["data"]["customers"]
+    tasks = document["data"]["tasks"]
+
+    def segments() -> Dict[int, str]:
+        return {customer["id"]: customer["segment"] for customer in customers}
+
+    def by_status() -> Dict[Any, int]:
+        segment_of = segments()
+        return Counter(task["status"] for task in tasks if segment_of.get(task["customerId"]) == SEGMENT)
+
+    def by_segment_status() -> Dict[Any, int]:
+        segment_of = segments()
+        return Counter((segment_of.get(task["customerId"]), task["status"]) for task in tasks)
+
+    return {
+        "customers by segment": lambda: Counter(customer["segment"] for customer in customers),
+        "customers by state": lambda: Counter(customer["state"] for customer in customers),
+        "tasks by status, segment": by_status,
+        "tasks by segment, status": by_segment_status,
+    }
+
+
+def store_queries(store: ExportStore) -> Dict[str, Callable[[], Dict[Any, int]]]:
+    return {
+        "customers by segment": store.customers_by_segment,
+        "customers by state": store.customers_by_state,
+        "tasks by status, segment": lambda: store.tasks_by_status(segment=SEGMENT),
+        "tasks by segment, status": lambda: store.count("tasks", ["customer.segment", "status"]),
+    }
+
+
+def traced(function: Callable[[], Any]) -> Tuple[Any, float, float]:
+    """Result, seconds and peak traced MB of one call."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def timed(function: Callable[[], Any], rounds: int) -> float:
+    times: List[float] = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def load(path: str) -> Any:
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def run_all(queries: Dict[str, Callable[[], Dict[Any, int]]]) -> Dict[str, Dict[Any, int]]:
+    return {name: query() for name, query in queries.items()}
+
+
+def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "database_export_2025-11-07.json")
+        write_export(path, args.scale)
+        print(f"scale: {args.scale}x, export: {os.path.getsize(path) / 2 ** 20:.0f} MB")
+
+        rows: Dict[str, List[str]] = {}
+        store, seconds, peak = traced(lambda: convert_exports([path], os.path.join(directory, "store")))
+        queries = store_queries(store)
+        results, _, query_peak = traced(lambda: run_all(queries))
+        rows["load / convert s"] = [f"{seconds:.2f}"]
+        rows["load / convert peak MB"] = [f"{peak:.1f}"]
+        rows["queries peak MB"] = [f"{query_peak:.1f}"]
+        for name, query in queries.items():
+            rows[f"{name} ms"] = [f"{timed(query, args.rounds) * 1000:.1f}"]
+
+        if not args.skip_load:
+            document, seconds, peak = traced(lambda: load(path))
+            queries = loaded_queries(document)
+            expected, _, query_peak = traced(lambda: run_all(queries))
+            for name, counts in results.items():
+                if sorted(map(str, counts.items())) != sorted(map(str, expected[name].items())):
+                    raise AssertionError(f"{name}: json.load and the store disagree")
+            rows["load / convert s"].insert(0, f"{seconds:.2f}")
+            rows["load / convert peak MB"].insert(0, f"{peak:.1f}")
+            rows["queries peak MB"].insert(0, f"{query_peak:.1f}")
+            for name, query in queries.items():
+                rows[f"{name} ms"].insert(0, f"{timed(query, args.rounds) * 1000:.1f}")
+
+        print(f"{'':>30}" + ("" if args.skip_load else f" {'json.load':>12}") + f" {'columnar':>12}")
+        for name, values in rows.items():
+            print(f"{name:>30}" + "".join(f" {value:>12}" for value in values))
+        store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--skip-load", action="store_true", help="only the columnar store (scales json.load cannot hold)")
+    main(parser.parse_args())
@@ -0,0 +1,173 @@
+"""Count the graph work done per turn.
+
+Runs the agent graph with a scripted chat model and in-process tools (no MCP
+server or OpenAI key needed) through four kinds of turns:
+
+- ``plain``: the model answers directly;
+- ``read``: the model calls find_customer, then answers;
+- ``create``: the model calls create_rm_task and the graph asks for confirmation;
+- ``confirm``: the RM answers "yes" and the task is created.
+
+For each turn it prints the node executions (from the ``tasks`` stream), how
+often the approval step and its router ran, how often a tool result was JSON
+decoded and the mean wall time.
+
+Usage:
+    python benchmarks/graph_node_benchmark.py [--threads 200]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Importing the agent package loads the settings, which require an API key
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.language_models import BaseChatModel  # noqa: E402
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from langchain_core.tools import StructuredTool  # noqa: E402
+from langgraph.types import Command  # noqa: E402
+
+from agent import core  # noqa: E402
+
+TOOL_RESULTS = {
+    "find_customer": json.dumps({
+        "customer_info": {"id": 1, "name": "Nguyễn Văn An", "segment": "Premium", "email": ""},
+        "message": "Customer found successfully.",
+        "code": "succeeded",
+    }, ensure_ascii=False),
+    "create_rm_task": json.dumps({
+        "message": "All input is now valid. Ask for confirmation.",
+        "ask_confirmation": True,
+        "code": "succeeded",
+    }),
+    "_create_rm_task": json.dumps({"message": "Task created successfully.", "code": "succeeded"}),
+}
+
+TURNS = (
+    ("plain", "Xin chào"),
+    ("read", "Tìm khách hàng An"),
+    ("create", "Tạo task gọi cho khách hàng 1"),
+    ("confirm", "yes"),
+)
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Calls a tool for "Tìm"/"Tạo" prompts and answers after a tool result."""
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ScriptedChatModel":
+        return self
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None,
+                  **kwargs: Any) -> ChatResult:
+        last = messages[-1]
+        message = AIMessage(content="Đây là kết quả.")
+        if last.type == "human" and str(last.content).startswith("Tìm"):
+            message = AIMessage(content="", tool_calls=[
+                {"name": "find_customer", "args": {"customerName": "An"}, "id": uuid.uuid4().hex},
+            ])
+        elif last.type == "human" and str(last.content).startswith("Tạo"):
+            message = AIMessage(content="", tool_calls=[{
+                "name": "create_rm_task",
+                "args": {"customerId": 1, "taskType": "CALL", "taskStatus": "PENDING", "taskDueDate": "2025-12-31"},
+                "id": uuid.uuid4().hex,
+            }])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def make_tools() -> List[StructuredTool]:
+    async def find_customer(customerName: str) -> str:
+        """Find a customer by name."""
+        return TOOL_RESULTS["find_customer"]
+
+    async def create_rm_task(customerId: int, taskType: str, taskStatus: str, taskDueDate: str, taskDetails: str = "") -> str:
+        """Validate a new task and ask for confirmation."""
+        return TOOL_RESULTS["create_rm_task"]
+
+    async def _create_rm_task(rmId: int, customerId: int, taskType: str, taskStatus: str, taskDueDate: str,
+                              taskDetails: str = "") -> str:
+        """Create a task."""
+        return TOOL_RESULTS["_create_rm_task"]
+
+    return [
+        StructuredTool.from_function(coroutine=function, name=function.__name__)
+        for function in (find_customer, create_rm_task, _create_rm_task)
+    ]
+
+
+class Counters:
+    """Counts approval step and router calls and tool result decodes."""
+
+    def __init__(self) -> None:
+        self.counts: Counter = Counter()
+        self._loads = json.loads
+
+        def counting_loads(value: Any, *args: Any, **kwargs: Any) -> Any:
+            # Only the agent's own decodes (of tool results, raw or projected)
+            if sys._getframe(1).f_globals.get("__name__", "").startswith("agent."):
+                self.counts["tool result decodes"] += 1
+            return self._loads(value, *args, **kwargs)
+
+        json.loads = counting_loads  # type: ignore[assignment]
+        # The graph picks these up when it is built, as node and router
+        for name in ("approval_node", "route_after_approval"):
+            function = getattr(core, name, None)
+            if function is not None:
+                setattr(core, name, self._counting(name, function))
+
+    def _counting(self, name: str, function: Any) -> Any:
+        def counted(*args: Any, **kwargs: Any) -> Any:
+            self.counts[f"{name} calls"] += 1
+            return function(*args, **kwargs)
+        return counted
+
+
+async def main(args: argparse.Namespace) -> None:
+    counters = Counters()
+    agent = core.AgentCore()
+    agent.llm = ScriptedChatModel()
+    await agent.build_graph(make_tools())  # type: ignore[arg-type]
+
+    totals: Dict[str, Counter] = {name: Counter() for name, _ in TURNS}
+    elapsed: Dict[str, float] = {name: 0.0 for name, _ in TURNS}
+    for thread in range(args.threads):
+        config = agent.build_config(f"rm_1_{thread}", 1)
+        for name, prompt in TURNS:
+            graph_input: Any = Command(resume=prompt) if name == "confirm" else {"messages": [HumanMessage(content=prompt)]}
+            counters.counts.clear()
+            start = time.perf_counter()
+            async for event in agent.graph.astream(graph_input, config, stream_mode="tasks"):
+                if "input" in event:
+                    counters.counts[f"node {event['name']}"] += 1
+            elapsed[name] += time.perf_counter() - start
+            totals[name].update(counters.counts)
+
+    print(f"threads: {args.threads} (per-turn averages)")
+    keys = sorted({key for counts in totals.values() for key in counts})
+    print(f"{'':>34}" + "".join(f"{name:>10}" for name, _ in TURNS))
+    for key in keys:
+        print(f"{key:>34}" + "".join(f"{totals[name][key] / args.threads:>10.2f}" for name, _ in TURNS))
+    print(f"{'node executions':>34}" + "".join(
+        f"{sum(v for k, v in totals[name].items() if k.startswith('node ')) / args.threads:>10.2f}"
+        for name, _ in TURNS
+    ))
+    print(f"{'mean ms':>34}" + "".join(f"{elapsed[name] / args.threads * 1000:>10.2f}" for name, _ in TURNS))
+    await agent.mcp_connection_pool.close()
+    await agent.llm_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,153 @@
+"""Exercise the shared LLM client against a fake OpenAI server injecting faults.
+
+Starts the stub OpenAI server (see stub_servers.py) failing a share of calls
+with 429/500 and stalling another share, then sends concurrent chat calls:
+
+- ``default``: ``ChatOpenAI`` with library defaults (SDK retries, 10 minute timeout);
+- ``tuned``: ``LLMClient`` as configured for the agent (bounded pool, read
+  timeout, jittered retries within a retry budget) with a per-request deadline.
+
+Prints the outcome of the calls (ok / failed / deadline exceeded), latency
+percentiles and the client's retry counters.
+
+Usage:
+    python benchmarks/llm_client_benchmark.py [--calls 200] [--concurrency 16]
+        [--error-rate 0.1] [--slow-rate 0.05] [--slow-latency 10]
+        [--read-timeout 2] [--deadline 5]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Importing the agent package loads the settings, which require an API key
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langchain_openai import ChatOpenAI  # noqa: E402
+
+from agent.llm_client import DeadlineExceeded, LLMClient  # noqa: E402
+
+STUBS = os.path.join(BACKEND_DIR, "benchmarks", "stub_servers.py")
+OPENAI_PORT = 3104
+BASE_URL = f"http://127.0.0.1:{OPENAI_PORT}/v1"
+
+
+async def wait_until_up(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def drive(invoke, calls: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    outcomes = {"ok": 0, "failed": 0, "deadline": 0}
+    remaining = calls
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                await invoke()
+                outcomes["ok"] += 1
+            except DeadlineExceeded:
+                outcomes["deadline"] += 1
+            except Exception:
+                outcomes["failed"] += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return dict(
+        outcomes,
+        elapsed=elapsed,
+        p50_ms=statistics.median(latencies) * 1000,
+        p99_ms=latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+        max_ms=latencies[-1] * 1000,
+    )
+
+
+async def run_default(args: argparse.Namespace) -> dict:
+    llm = ChatOpenAI(model="gpt-4o", api_key="benchmark", base_url=BASE_URL)
+    messages = [HumanMessage(content="Xin chào")]
+    return await drive(lambda: llm.ainvoke(messages), args.calls, args.concurrency)
+
+
+async def run_tuned(args: argparse.Namespace) -> dict:
+    client = LLMClient(
+        api_key="benchmark",
+        read_timeout=args.read_timeout,
+        retry_initial_delay=0.1,
+        retry_max_delay=1,
+        base_url=BASE_URL,
+    )
+    resilient = client.resilient(client.chat_model("gpt-4o", temperature=0.7))
+    messages = [HumanMessage(content="Xin chào")]
+
+    def invoke():
+        deadline: Optional[float] = time.monotonic() + args.deadline if args.deadline > 0 else None
+        return resilient.ainvoke(messages, {"configurable": {"deadline": deadline}})
+
+    try:
+        result = await drive(invoke, args.calls, args.concurrency)
+    finally:
+        await client.close()
+    result["stats"] = client.stats()
+    return result
+
+
+async def main(args: argparse.Namespace) -> None:
+    stub = subprocess.Popen([
+        sys.executable, STUBS, "openai", "--port", str(OPENAI_PORT), "--latency", str(args.llm_latency),
+        "--error-rate", str(args.error_rate), "--slow-rate", str(args.slow_rate),
+        "--slow-latency", str(args.slow_latency),
+    ])
+    try:
+        await wait_until_up(f"http://127.0.0.1:{OPENAI_PORT}/docs")
+        print(f"calls: {args.calls}, concurrency: {args.concurrency}, error rate: {args.error_rate}, "
+              f"slow rate: {args.slow_rate} ({args.slow_latency}s), read timeout: {args.read_timeout}s, "
+              f"deadline: {args.deadline}s")
+        print(f"{'client':>8} {'ok':>5} {'failed':>7} {'deadline':>9} {'elapsed s':>10} "
+              f"{'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+        for name, run in (("default", run_default), ("tuned", run_tuned)):
+            result = await run(args)
+            print(f"{name:>8} {result['ok']:>5} {result['failed']:>7} {result['deadline']:>9} "
+                  f"{result['elapsed']:>10.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+                  f"{result['max_ms']:>8.1f}")
+            if "stats" in result:
+                print(f"{'':>8} {result['stats']}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=10)
+    parser.add_argument("--read-timeout", type=float, default=2)
+    parser.add_argument("--deadline", type=float, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,138 @@
+"""Benchmark per-tool-call latency with and without MCP connection/session pooling.
+
+Starts the stub MCP server (see stub_servers.py) and calls ``find_customer``
+through LangChain MCP tools, as the agent's ToolNode does:
+
+- ``fresh``: the adapter's default, a new HTTP client, TCP connection and MCP
+  ``initialize`` handshake for every call;
+- ``pooled``: ``MCPConnectionPool`` + ``MCPSessionPool`` as wired in AgentCore,
+  with calls spread over several RMs (``x-rm-id`` headers).
+
+Usage:
+    python benchmarks/mcp_pool_benchmark.py [--calls 200] [--concurrency 1 8]
+        [--rms 4] [--tool-latency 0.005]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import List
+
+import httpx
+from langchain_mcp_adapters.client import MultiServerMCPClient  # type: ignore
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# Importing the agent package loads the settings, which require an API key
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+from agent.mcp_pool import MCPConnectionPool, MCPSessionPool  # noqa: E402
+
+STUBS = os.path.join(BACKEND_DIR, "benchmarks", "stub_servers.py")
+MCP_PORT = 3103
+MCP_URL = f"http://127.0.0.1:{MCP_PORT}/mcp"
+
+
+async def wait_until_up(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+def rm_interceptor(rms: int):
+    """Spread calls over ``rms`` RMs by rotating the x-rm-id header."""
+    counter = 0
+
+    async def interceptor(request, handler):
+        nonlocal counter
+        counter += 1
+        return await handler(request.override(headers={"x-rm-id": str(counter % rms)}))
+
+    return interceptor
+
+
+async def measure(client: MultiServerMCPClient, calls: int, concurrency: int) -> dict:
+    tool = next(tool for tool in await client.get_tools() if tool.name == "find_customer")
+    latencies: List[float] = []
+    remaining = calls
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            await tool.ainvoke({"customerName": "An"})
+            latencies.append(time.perf_counter() - start)
+
+    # Warm up (connections, sessions)
+    await tool.ainvoke({"customerName": "An"})
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "per_sec": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000,
+    }
+
+
+async def run(mode: str, args: argparse.Namespace, concurrency: int) -> dict:
+    connection = {"transport": "streamable_http", "url": MCP_URL, "headers": {}}
+    interceptors = [rm_interceptor(args.rms)]
+    pool = sessions = None
+    if mode == "pooled":
+        pool = MCPConnectionPool()
+        connection["httpx_client_factory"] = pool.client_factory
+        sessions = MCPSessionPool({"tools": connection})
+        interceptors.append(sessions)
+    client = MultiServerMCPClient({"tools": connection}, tool_interceptors=interceptors)
+    try:
+        result = await measure(client, args.calls, concurrency)
+    finally:
+        if sessions is not None:
+            await sessions.close()
+        if pool is not None:
+            await pool.close()
+    if sessions is not None:
+        result["sessions_opened"] = sessions.stats()["opened"]
+    return result
+
+
+async def main(args: argparse.Namespace) -> None:
+    stub = subprocess.Popen(
+        [sys.executable, STUBS, "mcp", "--port", str(MCP_PORT), "--latency", str(args.tool_latency)]
+    )
+    try:
+        await wait_until_up(MCP_URL)
+        print(f"calls: {args.calls}, RMs: {args.rms}, tool latency: {args.tool_latency * 1000:.0f}ms")
+        print(f"{'mode':>8} {'conc':>5} {'calls/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'sessions':>9}")
+        for concurrency in args.concurrency:
+            for mode in ("fresh", "pooled"):
+                result = await run(mode, args, concurrency)
+                sessions = result.get("sessions_opened", result["calls"] + 1)
+                print(f"{mode:>8} {concurrency:>5} {result['per_sec']:>8.1f} "
+                      f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f} {sessions:>9}")
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--rms", type=int, default=4)
+    parser.add_argument("--tool-latency", type=float, default=0.005)
+    asyncio.run(main(parser.parse_args()))
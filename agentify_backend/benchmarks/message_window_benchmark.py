@@ -0,0 +1,83 @@
+"""Benchmark the per-turn cost of selecting the messages sent to the LLM.
+
+Compares the incremental window kept in graph state against a full rescan of
+the thread (what every LLM call used to pay) for threads of 10 to 100k
+messages, both for tool-using turns and for plain chat, where the tool budgets
+never run out.
+
+Usage:
+    python benchmarks/message_window_benchmark.py
+"""
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("SKIP_VALIDATION", "true")
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage  # noqa: E402
+
+from agent.message_window import update_message_window  # noqa: E402
+from agent.tool_results import make_tool_result  # noqa: E402
+
+TOOL_RESULT = {
+    "task_info": [{"id": i, "taskType": "CALL", "status": "PENDING", "taskDetails": "Gọi khách hàng " * 5} for i in range(10)],
+    "message": "Task found successfully.",
+    "code": "succeeded",
+}
+TOOL_PAYLOAD = json.dumps(TOOL_RESULT, ensure_ascii=False)
+
+
+def make_turn(turn: int) -> list:
+    """One tool-using exchange: question, tool call, tool result, answer."""
+    call_id = f"call_{turn}"
+    return [
+        HumanMessage(content=f"Câu hỏi {turn}"),
+        AIMessage(content="", tool_calls=[{"name": "find_rm_task", "args": {}, "id": call_id}]),
+        ToolMessage(content=TOOL_PAYLOAD, tool_call_id=call_id, artifact=make_tool_result(TOOL_RESULT)),
+        AIMessage(content=f"Trả lời {turn}"),
+    ]
+
+
+def make_chat_turn(turn: int) -> list:
+    """One exchange without tools."""
+    return [HumanMessage(content=f"Câu hỏi {turn}"), AIMessage(content=f"Trả lời {turn}")]
+
+
+def time_call(fn, repeat: int) -> float:
+    """Median wall time of fn() in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1e6)
+    return statistics.median(samples)
+
+
+def main():
+    print(f"{'thread':>8} {'messages':>10} {'incremental (us)':>18} {'full rescan (us)':>18}")
+    for name, turn_fn in (("tools", make_turn), ("chat", make_chat_turn)):
+        for size in (10, 1_000, 10_000, 100_000):
+            messages = [message for turn in range(size // 2 + 1) for message in turn_fn(turn)][:size]
+            # Window as persisted in state at the end of the previous turn
+            window = update_message_window({"messages": messages})
+            # The new turn appends a question (and a tool round trip)
+            messages = messages + turn_fn(size)[:3]
+
+            def incremental():
+                update_message_window({"messages": messages, "message_window": window})
+
+            def full_rescan():
+                update_message_window({"messages": messages})
+
+            repeat = 200 if size <= 1_000 else 10
+            print(
+                f"{name:>8} {size:>10} {time_call(incremental, repeat):>18.1f} "
+                f"{time_call(full_rescan, repeat):>18.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
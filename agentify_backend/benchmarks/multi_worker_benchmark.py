@@ -0,0 +1,143 @@
+"""Benchmark /chat throughput with 1, 2, 4 and 8 uvicorn workers.
+
+Starts the stub MCP and OpenAI servers (see stub_servers.py), then for each
+worker count runs the backend on the sqlite checkpointer (plus the shared
+state store when there is more than one worker) and drives it with concurrent
+clients, each on its own RM thread. Every request runs a full tool-using turn: LLM tool call, MCP tool
+call, LLM answer, with checkpoints written to the shared database.
+
+Usage:
+    python benchmarks/multi_worker_benchmark.py [--workers 1 2 4 8] [--clients 32]
+        [--duration 15] [--llm-latency 0.05] [--tool-latency 0.005]
+
+Throughput only scales with workers while the backend is CPU bound and there
+are cores to spare; the number of CPUs is printed with the results.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import List
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(BACKEND_DIR, "benchmarks", "stub_servers.py")
+MCP_PORT = 3101
+OPENAI_PORT = 3102
+BACKEND_PORT = 8100
+
+
+async def wait_until_up(url: str, timeout: float = 120) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url, timeout=1)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def drive(clients: int, duration: float, rm_offset: int) -> dict:
+    """Send /chat requests from ``clients`` concurrent RMs for ``duration`` seconds."""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{BACKEND_PORT}", limits=limits, timeout=60) as client:
+        async def rm_loop(rm_id: int) -> None:
+            nonlocal errors
+            while time.monotonic() < deadline:
+                start = time.perf_counter()
+                response = await client.post("/chat", json={"message": "Tìm khách hàng An", "rm_id": rm_id})
+                if response.status_code == 200:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        start = time.monotonic()
+        await asyncio.gather(*(rm_loop(rm_offset + i) for i in range(clients)))
+        elapsed = time.monotonic() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0,
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000 if latencies else 0,
+    }
+
+
+async def run_workers(workers: int, args: argparse.Namespace, env: dict) -> dict:
+    workdir = tempfile.mkdtemp(prefix=f"agentify-bench-{workers}-")
+    worker_env = dict(
+        env,
+        APP_WORKERS=str(workers),
+        CHECKPOINTER_BACKEND="sqlite",
+        CHECKPOINTER_SQLITE_PATH=os.path.join(workdir, "checkpoints.sqlite"),
+        SHARED_STATE_SQLITE_PATH=os.path.join(workdir, "shared_state.sqlite"),
+    )
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(BACKEND_PORT), "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=worker_env,
+    )
+    try:
+        await wait_until_up(f"http://127.0.0.1:{BACKEND_PORT}/health")
+        # Warm up every worker (tool catalog, graph compilation)
+        await drive(args.clients, 2, rm_offset=100_000)
+        return await drive(args.clients, args.duration, rm_offset=workers * 1000)
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+async def main(args: argparse.Namespace) -> None:
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="benchmark",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{OPENAI_PORT}/v1",
+        MCP_SERVER_URL=f"http://127.0.0.1:{MCP_PORT}/mcp",
+    )
+    stubs = [
+        subprocess.Popen([sys.executable, STUBS, "mcp", "--port", str(MCP_PORT), "--latency", str(args.tool_latency)]),
+        subprocess.Popen([sys.executable, STUBS, "openai", "--port", str(OPENAI_PORT), "--latency", str(args.llm_latency)]),
+    ]
+    try:
+        await wait_until_up(f"http://127.0.0.1:{OPENAI_PORT}/docs")
+        await asyncio.sleep(1)
+
+        print(f"CPUs: {os.cpu_count()}, clients: {args.clients}, duration: {args.duration}s, "
+              f"LLM latency: {args.llm_latency * 1000:.0f}ms, tool latency: {args.tool_latency * 1000:.0f}ms")
+        print(f"{'workers':>8} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+        for workers in args.workers:
+            result = await run_workers(workers, args, env)
+            print(f"{workers:>8} {result['requests']:>9} {result['errors']:>7} {result['rps']:>8.1f} "
+                  f"{result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}")
+    finally:
+        for stub in stubs:
+            stub.terminate()
+            stub.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--tool-latency", type=float, default=0.005)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,169 @@
+"""Local stand-ins for the MCP server and the OpenAI API, used by the benchmarks.
+
+- ``mcp``: a streamable HTTP MCP server exposing ``find_customer``,
+  ``find_rm_task`` and ``report_performance`` with canned results after an
+  optional delay.
+- ``openai``: an OpenAI-compatible ``/v1/chat/completions`` endpoint. When the
+  last message is from the user and tools are offered it calls
+  ``find_customer``; otherwise it answers with a short text (streamed when
+  requested). It can inject faults: a share of calls fails with 429/500
+  (``--error-rate``) or stalls for ``--slow-latency`` seconds (``--slow-rate``).
+
+Usage:
+    python benchmarks/stub_servers.py mcp --port 3101 [--latency 0.005]
+    python benchmarks/stub_servers.py openai --port 3102 [--latency 0.05]
+        [--error-rate 0.1] [--slow-rate 0.05 --slow-latency 10]
+
+Point the backend at them with ``MCP_SERVER_URL=http://127.0.0.1:3101/mcp``
+and ``OPENAI_BASE_URL=http://127.0.0.1:3102/v1``.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+ANSWER = "Đã tìm thấy khách hàng Nguyễn Văn An, phân khúc Mass Affluent."
+
+
+def create_mcp_app(latency: float):
+    """Streamable HTTP MCP server with canned tool results."""
+    from mcp.server.fastmcp import FastMCP
+
+    mcp = FastMCP("stub", stateless_http=True, json_response=True, log_level="WARNING")
+
+    @mcp.tool(name="find_customer")
+    async def find_customer(customerName: str = "") -> str:
+        await asyncio.sleep(latency)
+        return json.dumps({
+            "customer_info": {"id": 1, "name": customerName or "Nguyễn Văn An", "segment": "Mass Affluent"},
+            "message": "Customer found successfully.",
+            "code": "succeeded",
+        }, ensure_ascii=False)
+
+    @mcp.tool(name="find_rm_task")
+    async def find_rm_task(customerId: int = 0) -> str:
+        await asyncio.sleep(latency)
+        return json.dumps({
+            "task_info": {"id": 7, "customerId": customerId, "taskType": "CALL", "taskStatus": "PENDING"},
+            "message": "Task found successfully.",
+            "code": "succeeded",
+        })
+
+    @mcp.tool(name="report_performance")
+    async def report_performance(startDate: str = "", endDate: str = "") -> str:
+        await asyncio.sleep(latency)
+        return json.dumps({
+            "performance_report": {"completed tasks": 12, "pending tasks": 3, "total tasks": 15},
+            "message": "Performance report retrieved successfully.",
+            "code": "succeeded",
+        })
+
+    return mcp.streamable_http_app()
+
+
+def create_openai_app(
+    latency: float,
+    error_rate: float = 0.0,
+    slow_rate: float = 0.0,
+    slow_latency: float = 0.0,
+) -> FastAPI:
+    """OpenAI-compatible chat completions endpoint with optional fault injection."""
+    app = FastAPI()
+    app.state.calls = 0
+
+    def completion_id() -> str:
+        return "chatcmpl-" + uuid.uuid4().hex
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        fault = random.random()
+        if fault < error_rate:
+            status = random.choice([429, 500])
+            return JSONResponse(
+                {"error": {"message": "Injected failure", "type": "server_error", "code": None}},
+                status_code=status,
+            )
+        await asyncio.sleep(slow_latency if fault < error_rate + slow_rate else latency)
+        last = body["messages"][-1]
+        call_tool = last["role"] == "user" and bool(body.get("tools"))
+        created = int(time.time())
+
+        if call_tool:
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": "call_" + uuid.uuid4().hex[:12],
+                    "type": "function",
+                    "function": {"name": "find_customer", "arguments": json.dumps({"customerName": "An"})},
+                }],
+            }
+        else:
+            message = {"role": "assistant", "content": ANSWER}
+        usage = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+
+        if not body.get("stream"):
+            return JSONResponse({
+                "id": completion_id(),
+                "object": "chat.completion",
+                "created": created,
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if call_tool else "stop",
+                }],
+                "usage": usage,
+            })
+
+        async def stream():
+            chunk_id = completion_id()
+
+            def chunk(delta: dict, finish_reason=None) -> str:
+                return "data: " + json.dumps({
+                    "id": chunk_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": body["model"],
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                }) + "\n\n"
+
+            if call_tool:
+                tool_call = dict(message["tool_calls"][0], index=0)
+                yield chunk({"role": "assistant", "content": None, "tool_calls": [tool_call]})
+                yield chunk({}, "tool_calls")
+            else:
+                yield chunk({"role": "assistant", "content": ""})
+                for word in ANSWER.split(" "):
+                    yield chunk({"content": word + " "})
+                yield chunk({}, "stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("server", choices=["mcp", "openai"])
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every call")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of OpenAI calls failing with 429/500")
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="Share of OpenAI calls taking --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=0.0)
+    args = parser.parse_args()
+
+    if args.server == "mcp":
+        app = create_mcp_app(args.latency)
+    else:
+        app = create_openai_app(args.latency, args.error_rate, args.slow_rate, args.slow_latency)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
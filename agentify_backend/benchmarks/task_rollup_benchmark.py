@@ -0,0 +1,173 @@
+"""report_performance from the daily task rollup vs ``GROUP BY status`` queries.
+
+Builds a SQLite stand-in of ``fact_rm_task`` (by default 10M tasks across 5k
+RMs, created over 600 days), fills a ``TaskRollup`` from it with ``sync`` and
+reports random RMs over random date ranges:
+
+- ``GROUP BY``: ``count_tasks_by_status``, the query report_performance ran on
+  every call; without an index on ``rmId`` (as the MCP server's schema) and
+  with one;
+- ``rollup``: ``report_performance`` answered from the rollup's prefix sums,
+  refreshed from the table (indexed on ``updatedAt``) every ``max_age``.
+
+Every rollup report is checked against the query's counts. Then updates and
+new tasks are recorded and reports rerun, so the lazily rebuilt prefix sums
+are measured too. Prints latencies, build time and resident memory.
+
+Usage:
+    python benchmarks/task_rollup_benchmark.py [--tasks 10000000] [--rms 5000] [--queries 10000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import resource
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, List, Tuple
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "mcp_server", "src", "tools",
+))
+
+import tool_py  # noqa: E402
+from task_rollup import TaskRollup  # noqa: E402
+
+STATUSES = ("COMPLETED", "IN_PROGRESS", "CANCELLED")
+START = datetime(2024, 3, 1)
+DAYS = 600
+
+Report = Tuple[int, date, date]
+
+
+def build_database(path: str, tasks: int, rms: int) -> None:
+    random.seed(13)
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE fact_rm_task (id INTEGER PRIMARY KEY, "rmId" INTEGER, "customerId" INTEGER, '
+        '"taskType" TEXT, status TEXT, "taskDetails" TEXT, "createdAt" TIMESTAMP, "dueDate" DATE, '
+        '"updatedAt" TIMESTAMP)'
+    )
+    # The rollup's refreshes read the recently updated tasks
+    connection.execute('CREATE INDEX task_updated ON fact_rm_task ("updatedAt")')
+    minutes = DAYS * 24 * 60
+    connection.executemany(
+        "INSERT INTO fact_rm_task VALUES (?, ?, 1, 'CALL', ?, '', ?, '2025-01-01', ?)",
+        (
+            (index, random.randrange(rms) + 1, random.choice(STATUSES), created, created)
+            for index in range(1, tasks + 1)
+            for created in ((START + timedelta(minutes=random.randrange(minutes))).isoformat(sep=" "),)
+        ),
+    )
+    connection.commit()
+    connection.close()
+
+
+def rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def random_reports(count: int, rms: int) -> List[Report]:
+    reports = []
+    for _ in range(count):
+        first = START.date() + timedelta(days=random.randrange(DAYS))
+        reports.append((random.randrange(rms) + 1, first, first + timedelta(days=random.randrange(DAYS))))
+    return reports
+
+
+async def latencies(reports: List[Report], report: Callable[[Report], Awaitable[dict]]) -> List[float]:
+    result = []
+    for arguments in reports:
+        start = time.perf_counter()
+        await report(arguments)
+        result.append((time.perf_counter() - start) * 1000)
+    return sorted(result)
+
+
+def summary(name: str, values: List[float]) -> None:
+    print(f"{name:>30} {len(values):>7} {statistics.median(values):>10.3f} {values[int(len(values) * 0.99) - 1]:>10.3f}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "tasks.db")
+        start = time.perf_counter()
+        build_database(path, args.tasks, args.rms)
+        print(f"tasks: {args.tasks}, rms: {args.rms}, database built in {time.perf_counter() - start:.0f} s")
+        database = tool_py.SQLiteDatabase(path)
+        tool_py.configure_database(database)
+
+        before = rss_mb()
+        start = time.perf_counter()
+        rollup = TaskRollup()
+        await rollup.sync(database)
+        print(f"rollup sync: {time.perf_counter() - start:.1f} s, {rollup.tasks} tasks, peak RSS +{rss_mb() - before:.0f} MB")
+
+        random.seed(17)
+        config = {"configurable": {"rm_id": 0}}
+
+        async def from_rollup(arguments: Report) -> dict:
+            config["configurable"]["rm_id"] = arguments[0]
+            return await tool_py.report_performance.ainvoke(
+                {"startDate": arguments[1].isoformat(), "endDate": arguments[2].isoformat()}, config
+            )
+
+        async def check(reports: List[Report]) -> None:
+            for rm_id, first, last in reports:
+                expected = await tool_py.count_tasks_by_status(database, rm_id, first, last)
+                if sorted(rollup.counts(rm_id, first, last)) != sorted((count.status, count.task_count) for count in expected):
+                    raise AssertionError(f"rm {rm_id} {first}..{last}: the rollup and the query disagree")
+
+        print(f"{'':>30} {'reports':>7} {'p50 ms':>10} {'p99 ms':>10}")
+        scans = random_reports(args.scan_queries, args.rms)
+        summary("GROUP BY, no rmId index", await latencies(
+            scans, lambda arguments: tool_py.count_tasks_by_status(database, *arguments)
+        ))
+        connection = sqlite3.connect(path)
+        connection.execute('CREATE INDEX task_rm ON fact_rm_task ("rmId")')
+        connection.close()
+        reports = random_reports(args.queries, args.rms)
+        summary("GROUP BY, rmId index", await latencies(
+            reports[:args.queries // 10], lambda arguments: tool_py.count_tasks_by_status(database, *arguments)
+        ))
+        tool_py.configure_task_rollup(rollup)
+        summary("rollup report_performance", await latencies(reports, from_rollup))
+        summary("rollup counts only", await latencies(
+            reports, lambda arguments: asyncio.sleep(0, rollup.counts(*arguments))
+        ))
+        await check(reports[:args.checks])
+
+        # Status changes of existing tasks and tasks created on the last day, then reports of the touched RMs
+        updates = args.queries * 10
+        start = time.perf_counter()
+        last_day = START + timedelta(days=DAYS - 1)
+        touched = []
+        for task_id in random.sample(range(1, args.tasks + 1), updates // 2):
+            rm_id = random.randrange(args.rms) + 1
+            rollup.record(task_id, rm_id, START + timedelta(days=random.randrange(DAYS)), random.choice(STATUSES))
+            touched.append(rm_id)
+        for task_id in range(args.tasks + 1, args.tasks + 1 + updates // 2):
+            rm_id = random.randrange(args.rms) + 1
+            rollup.record(task_id, rm_id, last_day, "IN_PROGRESS")
+            touched.append(rm_id)
+        print(f"{'':>30} records: {updates / (time.perf_counter() - start):.0f}/s")
+        summary("rollup after records", await latencies(
+            [(rm_id, first, last) for rm_id, (_, first, last) in zip(touched, reports)], from_rollup
+        ))
+        tool_py.configure_task_rollup(None)
+        await database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=10000000)
+    parser.add_argument("--rms", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=10000)
+    parser.add_argument("--scan-queries", type=int, default=5)
+    parser.add_argument("--checks", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,233 @@
+"""Compare the revived Python read tools' query path with the old one.
+
+Builds a SQLite stand-in of the MCP server's ``customer`` and ``fact_rm_task``
+tables and runs the queries of find_customer, find_rm_task and
+report_performance two ways:
+
+- ``string+eval``: the old path; SQL formatted with f-strings, rows printed to
+  a string (as ``SQLDatabase.run`` did) and parsed back with ``eval``;
+- ``pooled``: the queries of ``mcp_server/src/tools/tool_py.py``; parameterized
+  statements on the pooled async driver returning typed rows, awaited one by
+  one and ``--concurrency`` at a time.
+
+Both paths must return the same rows. Prints rows per second for each query.
+
+Usage:
+    python benchmarks/tool_py_benchmark.py [--customers 50000] [--tasks 200000] [--rounds 200]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "mcp_server", "src", "tools",
+))
+
+import tool_py  # noqa: E402
+
+STATES = ("Hà Nội", "Hồ Chí Minh", "Đà Nẵng", "Cần Thơ", "Hải Phòng", "Huế", "Nha Trang", "Vũng Tàu")
+FAMILY_NAMES = ("Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Võ", "Đặng", "Bùi")
+GIVEN_NAMES = ("An", "Bình", "Châu", "Dũng", "Giang", "Hà", "Kiên", "Linh", "Minh", "Thắng")
+STATUSES = ("COMPLETED", "IN_PROGRESS", "CANCELLED")
+
+
+def build_database(path: str, customers: int, tasks: int, rms: int) -> None:
+    random.seed(7)
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE customer (id INTEGER PRIMARY KEY, name TEXT, email TEXT, phone TEXT, address TEXT, '
+        'country TEXT, dob DATE, gender TEXT, "jobTitle" TEXT, segment TEXT, state TEXT, zip TEXT, '
+        '"isActive" BOOLEAN, "behaviorDescription" TEXT, "rmId" INTEGER)'
+    )
+    connection.execute(
+        'CREATE TABLE fact_rm_task (id INTEGER PRIMARY KEY, "rmId" INTEGER, "customerId" INTEGER, '
+        '"taskType" TEXT, status TEXT, "taskDetails" TEXT, "createdAt" TIMESTAMP, "dueDate" DATE)'
+    )
+    connection.execute('CREATE INDEX task_rm ON fact_rm_task ("rmId")')
+    segments = list(tool_py.SEGMENT_VALUES.values())
+    connection.executemany(
+        "INSERT INTO customer VALUES (?, ?, ?, ?, ?, 'Việt Nam', ?, ?, 'Kỹ sư', ?, ?, '70000', ?, '', ?)",
+        (
+            (
+                index,
+                f"{random.choice(FAMILY_NAMES)} Văn {random.choice(GIVEN_NAMES)}",
+                f"customer{index}@gmail.com",
+                f"+8409{index:08d}",
+                f"{index % 500} Điện Biên Phủ",
+                (date(1960, 1, 1) + timedelta(days=random.randrange(15000))).isoformat(),
+                random.choice(("male", "female")),
+                random.choice(segments),
+                random.choice(STATES),
+                random.random() > 0.1,
+                random.randrange(rms) + 1,
+            )
+            for index in range(1, customers + 1)
+        ),
+    )
+    start = datetime(2025, 1, 1)
+    connection.executemany(
+        "INSERT INTO fact_rm_task VALUES (?, ?, ?, ?, ?, 'Gọi điện tư vấn', ?, ?)",
+        (
+            (
+                index,
+                random.randrange(rms) + 1,
+                random.randrange(customers) + 1,
+                random.choice(tool_py.TASK_TYPES),
+                random.choice(STATUSES),
+                (start + timedelta(minutes=random.randrange(300 * 24 * 60))).isoformat(sep=" "),
+                (start.date() + timedelta(days=random.randrange(330))).isoformat(),
+            )
+            for index in range(1, tasks + 1)
+        ),
+    )
+    connection.commit()
+    connection.close()
+
+
+class LegacyDatabase:
+    """The old ``DATABASE.run``: formatted SQL, rows returned as a printed string."""
+
+    def __init__(self, path: str):
+        self.connection = sqlite3.connect(path)
+
+    def run(self, query: str) -> str:
+        rows = self.connection.execute(query).fetchall()
+        return str(rows) if rows else ""
+
+
+def legacy_customers(database: LegacyDatabase, state: str) -> List[tuple]:
+    response = database.run(f"""
+    SELECT id,name,email,phone,address,country,dob,gender,"jobTitle",segment,state,zip,"isActive","behaviorDescription"
+    FROM customer
+    WHERE state LIKE '%{state}%'
+    """.strip())
+    return eval(str(response)) if response.strip() else []
+
+
+def legacy_tasks(database: LegacyDatabase, rm_id: int) -> List[tuple]:
+    response = database.run(f"""
+    SELECT id, "customerId", "taskType", status, "taskDetails", "dueDate"
+    FROM fact_rm_task
+    WHERE "rmId" = {rm_id} AND "dueDate" >= '2025-03-01' AND "dueDate" <= '2025-10-31'
+    """.strip())
+    return eval(str(response)) if response.strip() else []
+
+
+def legacy_report(database: LegacyDatabase, rm_id: int) -> List[tuple]:
+    response = database.run(f"""
+    SELECT status, COUNT(*) as task_count
+    FROM fact_rm_task
+    WHERE "rmId" = {rm_id} AND "createdAt" >= '2025-01-01' AND "createdAt" < '2025-12-01'
+    GROUP BY status
+    ORDER BY task_count DESC
+    """.strip())
+    return eval(str(response)) if response.strip() else []
+
+
+def as_legacy(rows: Sequence[Any]) -> List[tuple]:
+    """Typed rows in the legacy representation (ISO strings, 0/1 booleans)."""
+    return [
+        tuple(
+            int(value) if isinstance(value, bool) else value.isoformat() if isinstance(value, date) else value
+            for value in asdict(row).values()
+        )
+        for row in rows
+    ]
+
+
+async def customer_rows(database: tool_py.Database, state: str) -> List[tool_py.CustomerRow]:
+    # search_customers also returns the filtered columns
+    rows, _ = await tool_py.search_customers(database, customerState=state)
+    return rows
+
+
+async def measure(
+    name: str,
+    arguments: Sequence[Any],
+    legacy: Callable[[Any], List[tuple]],
+    pooled: Callable[[Any], Awaitable[Sequence[Any]]],
+    concurrency: int,
+) -> None:
+    results: Dict[str, Tuple[int, float]] = {}
+
+    start = time.perf_counter()
+    legacy_rows = [legacy(argument) for argument in arguments]
+    results["string+eval"] = (sum(map(len, legacy_rows)), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pooled_rows = [await pooled(argument) for argument in arguments]
+    results["pooled"] = (sum(map(len, pooled_rows)), time.perf_counter() - start)
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(argument: Any) -> Sequence[Any]:
+        async with semaphore:
+            return await pooled(argument)
+
+    start = time.perf_counter()
+    concurrent_rows = await asyncio.gather(*(limited(argument) for argument in arguments))
+    results[f"pooled x{concurrency}"] = (sum(map(len, concurrent_rows)), time.perf_counter() - start)
+
+    for old, new, newer in zip(legacy_rows, pooled_rows, concurrent_rows):
+        if sorted(old) != sorted(as_legacy(new)) or as_legacy(new) != as_legacy(newer):
+            raise AssertionError(f"{name}: the paths returned different rows")
+
+    baseline = results["string+eval"][0] / results["string+eval"][1]
+    for path, (rows, elapsed) in results.items():
+        rate = rows / elapsed
+        print(f"{name:>20} {path:>14} {rows:>10} rows {elapsed * 1000:>10.1f} ms {rate:>12.0f} rows/s {rate / baseline:>6.2f}x")
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "agentify.db")
+        build_database(path, args.customers, args.tasks, args.rms)
+        legacy = LegacyDatabase(path)
+        database = tool_py.SQLiteDatabase(path, pool_size=args.concurrency)
+        random.seed(11)
+        states = [random.choice(STATES) for _ in range(max(1, args.rounds // 20))]
+        rm_ids = [random.randrange(args.rms) + 1 for _ in range(args.rounds)]
+        print(f"customers: {args.customers}, tasks: {args.tasks}, rms: {args.rms}, rounds: {args.rounds}")
+
+        await measure(
+            "find_customer",
+            states,
+            lambda state: legacy_customers(legacy, state),
+            lambda state: customer_rows(database, state),
+            args.concurrency,
+        )
+        await measure(
+            "find_rm_task",
+            rm_ids,
+            lambda rm_id: legacy_tasks(legacy, rm_id),
+            lambda rm_id: tool_py.search_tasks(database, rm_id, due_from=date(2025, 3, 1), due_to=date(2025, 10, 31)),
+            args.concurrency,
+        )
+        await measure(
+            "report_performance",
+            rm_ids,
+            lambda rm_id: legacy_report(legacy, rm_id),
+            lambda rm_id: tool_py.count_tasks_by_status(database, rm_id, date(2025, 1, 1), date(2025, 11, 30)),
+            args.concurrency,
+        )
+        legacy.connection.close()
+        await database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--customers", type=int, default=50000)
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--rms", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
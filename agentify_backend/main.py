@@ -1,20 +1,35 @@
 """FastAPI application for the agent backend."""
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Dict, Optional
 import json
+import time
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
 
+from agent.admission import AdmissionController, AdmissionRejected, Ticket
+from agent.checkpointer import close_checkpointer, create_checkpointer
 from agent.core import AgentCore
+from agent.llm_client import DeadlineExceeded
+from agent.shared_store import close_shared_store, create_shared_store
+from agent.stream_events import error_event, with_keepalive
 from agent.config import settings
 
 
 # Global agent instance
 agent: Optional[AgentCore] = None
 
+# Serializes requests per RM thread and caps graph runs in flight
+admission = AdmissionController(
+    max_concurrent=settings.max_concurrent_requests,
+    max_waiting=settings.max_waiting_requests,
+    max_queued_per_thread=settings.max_queued_requests_per_rm,
+    queue_timeout=settings.request_queue_timeout_seconds,
+)
+
 
 def get_thread_id_from_rm_id(rm_id: int) -> str:
     """
@@ -29,15 +44,51 @@ def get_thread_id_from_rm_id(rm_id: int) -> str:
     return f"rm_{rm_id}"
 
 
+def request_deadline() -> Optional[float]:
+    """Deadline (time.monotonic()) of a request arriving now, queue time included."""
+    if settings.chat_request_timeout_seconds <= 0:
+        return None
+    return time.monotonic() + settings.chat_request_timeout_seconds
+
+
+async def admit(thread_id: str) -> Ticket:
+    """
+    Wait for the thread's turn and a global slot.
+    
+    Raises:
+        HTTPException: 429 if the RM has too many requests queued, 503 if the
+            server is saturated
+    """
+    try:
+        return await admission.acquire(thread_id)
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers={"Retry-After": "1"})
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan context manager for startup and shutdown."""
     global agent
-    # Startup - initialize agent (tools will be loaded on first request with RM ID)
-    agent = AgentCore()
-    # Note: Full initialization happens on first request when RM ID is available
+    # Startup - initialize agent (the graph is compiled on the first request)
+    checkpointer = await create_checkpointer()
+    # Multi-worker mode: interrupts, thread leases and tool schemas shared by all workers
+    store = await create_shared_store()
+    admission.store = store
+    agent = AgentCore(checkpointer=checkpointer, store=store)
+    # Warm the tool catalog in the background and keep it fresh
+    agent.tool_catalog.start()
+    # Periodically drop old checkpoints of every RM thread
+    agent.compactor.start()
     yield
     # Shutdown
+    await agent.compactor.stop()
+    await agent.tool_catalog.stop()
+    await agent.mcp_sessions.close()
+    await agent.mcp_connection_pool.close()
+    await agent.llm_client.close()
+    await close_checkpointer(checkpointer)
+    await close_shared_store(store)
+    admission.store = None
     agent = None
 
 
@@ -69,6 +120,7 @@ class ChatResponse(BaseModel):
     """Chat response model."""
     message: str = Field(..., description="AI response message")
     interrupted: bool = Field(..., description="Whether the agent is waiting for user confirmation")
+    context: Optional[Dict[str, int]] = Field(None, description="Prompt tokens sent versus the context token budget")
 
 
 class StreamChatRequest(BaseModel):
@@ -92,7 +144,15 @@ async def health():
     """Health check endpoint."""
     return {
         "status": "healthy",
-        "agent_initialized": agent is not None
+        "agent_initialized": agent is not None,
+        "tool_catalog": agent.tool_catalog.stats() if agent is not None else None,
+        "mcp_sessions": agent.mcp_sessions.stats() if agent is not None else None,
+        "tool_cache": agent.tool_cache.stats() if agent is not None else None,
+        "llm": agent.llm_client.stats() if agent is not None else None,
+        "response_cache": agent.response_cache.stats() if agent is not None and agent.response_cache is not None else None,
+        "checkpoint_compaction": agent.compactor.stats() if agent is not None else None,
+        "interrupts": agent.interrupts.stats() if agent is not None else None,
+        "admission": admission.stats(),
     }
 
 
@@ -108,22 +168,31 @@ async def chat(request: ChatRequest):
     if agent is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
+    # Auto-generate thread_id from rm_id
+    thread_id = get_thread_id_from_rm_id(request.rm_id)
+    deadline = request_deadline()
+    
+    # One request at a time per thread; rejected early when saturated
+    ticket = await admit(thread_id)
     try:
-        # Auto-generate thread_id from rm_id
-        thread_id = get_thread_id_from_rm_id(request.rm_id)
-        
         result = await agent.chat(
             message=request.message,
             thread_id=thread_id,
             rm_id=request.rm_id,
+            deadline=deadline,
         )
         
         return ChatResponse(
             message=result["message"],
             interrupted=result["interrupted"],
+            context=result.get("context"),
         )
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=f"Error processing chat: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing chat: {str(e)}")
+    finally:
+        await ticket.release()
 
 
 @app.post("/chat/stream")
@@ -131,25 +200,34 @@ async def stream_chat(request: StreamChatRequest):
     """
     Stream chat responses in real-time.
     
-    Returns a Server-Sent Events (SSE) stream of message chunks.
-    When the graph interrupts (e.g., asking for confirmation), the interrupt question
-    is streamed with interrupted=True and done=True.
+    Returns a Server-Sent Events (SSE) stream of typed events (see
+    agent.stream_events): answer tokens, tool_start/tool_end progress and
+    keepalive heartbeats while nothing else is sent. The last event is 'done'
+    (with the interrupt question and interrupted=True when the graph asks for
+    confirmation) or 'error'.
     """
     if agent is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
+    # Auto-generate thread_id from rm_id
+    thread_id = get_thread_id_from_rm_id(request.rm_id)
+    deadline = request_deadline()
+    
+    # Admit before the response starts so rejections keep their status code;
+    # the slot is held until the stream ends
+    ticket = await admit(thread_id)
+    
     async def generate():
         """Generate streaming response."""
         try:
-            # Auto-generate thread_id from rm_id
-            thread_id = get_thread_id_from_rm_id(request.rm_id)
-            
-            async for chunk_data in agent.stream_chat(
+            events = agent.stream_chat(
                 message=request.message,
                 thread_id=thread_id,
                 rm_id=request.rm_id,
-            ):
-                # chunk_data is a dict with 'content', 'done', and 'interrupted' keys
+                deadline=deadline,
+            )
+            async for chunk_data in with_keepalive(events, settings.stream_keepalive_seconds):
+                # chunk_data is a typed event dict with 'type', 'done' and 'interrupted' keys
                 yield f"data: {json.dumps(chunk_data)}\n\n"
                 
                 # If done, break
@@ -159,12 +237,9 @@ async def stream_chat(request: StreamChatRequest):
             # Send final done signal
             yield "data: [DONE]\n\n"
         except Exception as e:
-            error_data = {
-                "content": f"Error: {str(e)}",
-                "done": True,
-                "interrupted": False,
-            }
-            yield f"data: {json.dumps(error_data)}\n\n"
+            yield f"data: {json.dumps(error_event(f'Error: {str(e)}'))}\n\n"
+        finally:
+            await ticket.release()
     
     return StreamingResponse(
         generate(),
@@ -172,7 +247,9 @@ async def stream_chat(request: StreamChatRequest):
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
-        }
+        },
+        # Releases the slot if the stream never started (release is idempotent)
+        background=BackgroundTask(ticket.release),
     )
 
 
@@ -192,7 +269,7 @@ async def check_interrupt(rm_id: int):
     
     # Auto-generate thread_id from rm_id
     thread_id = get_thread_id_from_rm_id(rm_id)
-    interrupt_message = agent.check_for_interrupt(thread_id)
+    interrupt_message = await agent.check_for_interrupt(thread_id)
     return {
         "has_interrupt": interrupt_message is not None,
         "interrupt_message": interrupt_message,
@@ -213,12 +290,15 @@ async def clear_chat_history(rm_id: int):
     if agent is None:
         raise HTTPException(status_code=503, detail="Agent not initialized")
     
+    # Auto-generate thread_id from rm_id
+    thread_id = get_thread_id_from_rm_id(rm_id)
+    
+    # Waits for a running turn of the thread, which would write its checkpoints
+    # back after the delete
+    ticket = await admit(thread_id)
     try:
-        # Auto-generate thread_id from rm_id
-        thread_id = get_thread_id_from_rm_id(rm_id)
-        
         # Delete the thread from checkpointer
-        agent.checkpointer.delete_thread(thread_id)
+        await agent.clear_history(thread_id, rm_id)
         
         return {
             "success": True,
@@ -227,14 +307,18 @@ async def clear_chat_history(rm_id: int):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error clearing chat history: {str(e)}")
+    finally:
+        await ticket.release()
 
 
 if __name__ == "__main__":
     import uvicorn
+    # Auto-reload is only available with a single worker
     uvicorn.run(
         "main:app",
         host=settings.app_host,
         port=settings.app_port,
-        reload=True,
+        workers=settings.app_workers,
+        reload=settings.app_workers <= 1,
     )
 
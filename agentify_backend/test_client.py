@@ -74,7 +74,11 @@ def test_stream():
                         break
                     try:
                         chunk = json.loads(content_str)
-                        if 'content' in chunk:
+                        if chunk.get('type') == 'tool_start':
+                            print(f"\n[tool] {chunk['tool']} ...", flush=True)
+                        elif chunk.get('type') == 'tool_end':
+                            print(f"[tool] {chunk['tool']} {chunk['status']} in {chunk['duration_ms']} ms", flush=True)
+                        elif 'content' in chunk:
                             content += chunk['content']
                             print(chunk['content'], end='', flush=True)
                         elif 'error' in chunk:
@@ -117,6 +121,7 @@ if __name__ == "__main__":
         sys.exit(1)
     
     print()
+    
     print("=" * 50)
     print("✓ All tests passed!")
     print("=" * 50)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+# The MCP server's Python tools, imported as top-level modules like the benchmarks do
+sys.path.insert(0, os.path.join(os.path.dirname(BACKEND_DIR), "mcp_server", "src", "tools"))
+# Importing the agent package loads the settings, which require an API key
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,87 @@
+"""Admission control and the thread leases of multi-worker mode."""
+import asyncio
+
+import aiosqlite
+import pytest
+
+from agent.admission import AdmissionController, ServerBusy, ThreadQueueFull
+from agent.shared_store import SharedStore
+
+
+async def open_store(path, lease_seconds):
+    conn = await aiosqlite.connect(path, isolation_level=None)
+    store = SharedStore(conn, lease_seconds=lease_seconds)
+    await store.setup()
+    return store
+
+
+def test_lease_is_renewed_while_the_ticket_is_held(tmp_path):
+    async def run():
+        store = await open_store(tmp_path / "shared.db", lease_seconds=0.3)
+        other_worker = await open_store(tmp_path / "shared.db", lease_seconds=0.3)
+        try:
+            controller = AdmissionController(store=store)
+            ticket = await controller.acquire("rm_1")
+            # Well past the lease lifetime, the thread is still held
+            await asyncio.sleep(1)
+            assert await other_worker.try_acquire_lease("rm_1") is None
+
+            await ticket.release()
+            assert ticket.renewal.done()
+            assert await other_worker.try_acquire_lease("rm_1") is not None
+        finally:
+            await store.conn.close()
+            await other_worker.conn.close()
+
+    asyncio.run(run())
+
+
+def test_full_thread_queue_is_rejected_with_429():
+    async def run():
+        controller = AdmissionController(max_queued_per_thread=1)
+        running = await controller.acquire("rm_1")
+        waiting = asyncio.create_task(controller.acquire("rm_1"))
+        await asyncio.sleep(0)
+        with pytest.raises(ThreadQueueFull) as rejected:
+            await controller.acquire("rm_1")
+        # Other threads are not affected
+        other = await controller.acquire("rm_2")
+        await running.release()
+        await (await waiting).release()
+        await other.release()
+        return rejected.value.status_code, controller.stats()
+
+    status, stats = asyncio.run(run())
+
+    assert status == 429
+    assert stats["rejected"]["thread_queue_full"] == 1
+    assert stats["active"] == stats["waiting"] == stats["threads"] == 0
+
+
+def test_full_global_queue_is_rejected_with_503():
+    async def run():
+        controller = AdmissionController(max_concurrent=1, max_waiting=1)
+        running = await controller.acquire("rm_1")
+        waiting = asyncio.create_task(controller.acquire("rm_2"))
+        await asyncio.sleep(0)
+        with pytest.raises(ServerBusy) as rejected:
+            await controller.acquire("rm_3")
+        await running.release()
+        await (await waiting).release()
+        return rejected.value.status_code, controller.rejected
+
+    assert asyncio.run(run()) == (503, {"thread_queue_full": 0, "busy": 1, "timeout": 0})
+
+
+def test_queue_timeout_is_rejected_with_503():
+    async def run():
+        controller = AdmissionController(max_concurrent=1, queue_timeout=0.05)
+        running = await controller.acquire("rm_1")
+        with pytest.raises(ServerBusy):
+            await controller.acquire("rm_2")
+        await running.release()
+        # The slot and the thread's lock are free again
+        await (await controller.acquire("rm_2")).release()
+        return controller.rejected["timeout"], controller.queue_depth("rm_2")
+
+    assert asyncio.run(run()) == (1, 0)
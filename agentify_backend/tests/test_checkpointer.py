@@ -0,0 +1,119 @@
+"""Checkpointer backends: thread eviction, history pruning and compaction."""
+import asyncio
+import operator
+from typing import Annotated, List
+
+import aiosqlite
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import interrupt
+from typing_extensions import TypedDict
+
+from agent.checkpointer import BoundedMemorySaver, CheckpointCompactor, compact_sqlite
+
+
+class State(TypedDict, total=False):
+    # Written once per thread: its blob is shared by every later checkpoint
+    profile: str
+    turns: Annotated[List[int], operator.add]
+    ask: bool
+
+
+def turn(state: State) -> dict:
+    if state.get("ask"):
+        interrupt("Xác nhận?")
+    return {"turns": [len(state.get("turns", []))]}
+
+
+def graph(checkpointer):
+    builder = StateGraph(State)
+    builder.add_node("turn", turn)
+    builder.add_edge(START, "turn")
+    builder.add_edge("turn", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+def run_turns(app, thread_id: str, count: int) -> None:
+    async def main():
+        await app.ainvoke({"profile": "x" * 1000}, config(thread_id))
+        for _ in range(count - 1):
+            await app.ainvoke({"ask": False}, config(thread_id))
+
+    asyncio.run(main())
+
+
+def test_eviction_keeps_threads_with_pending_interrupts():
+    saver = BoundedMemorySaver(max_threads=2)
+    app = graph(saver)
+
+    async def main():
+        await app.ainvoke({"ask": True}, config("rm_1"))
+        await app.ainvoke({}, config("rm_2"))
+        await app.ainvoke({}, config("rm_3"))
+
+    asyncio.run(main())
+
+    assert set(saver.storage) == {"rm_1", "rm_3"}
+    assert saver.has_pending_interrupt("rm_1")
+    assert app.get_state(config("rm_1")).interrupts
+
+
+def test_pruning_keeps_blobs_still_referenced():
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=3)
+    app = graph(saver)
+
+    run_turns(app, "rm_1", 10)
+
+    assert len(saver.storage["rm_1"][""]) == 3
+    state = app.get_state(config("rm_1")).values
+    assert state["profile"] == "x" * 1000
+    assert state["turns"] == list(range(10))
+    # Every blob left belongs to a kept checkpoint
+    referenced = {version for versions in saver._versions["rm_1"].values() for version in versions}
+    assert {(channel, version) for (_, _, channel, version) in saver.blobs} <= referenced
+
+
+def test_memory_compaction_keeps_the_pending_interrupt():
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=0)
+    app = graph(saver)
+    run_turns(app, "rm_1", 5)
+    asyncio.run(app.ainvoke({"ask": True}, config("rm_1")))
+
+    report = asyncio.run(CheckpointCompactor(saver, keep=1).compact())
+
+    assert report["checkpoints_removed"] > 0 and report["bytes_reclaimed"] > 0
+    assert saver.has_pending_interrupt("rm_1")
+    assert app.get_state(config("rm_1")).values["turns"] == list(range(5))
+
+
+def test_sqlite_compaction_keeps_the_latest_checkpoints(tmp_path):
+    async def main():
+        async with aiosqlite.connect(tmp_path / "checkpoints.db") as conn:
+            saver = AsyncSqliteSaver(conn)
+            app = graph(saver)
+            await app.ainvoke({"profile": "x" * 1000}, config("rm_1"))
+            for _ in range(9):
+                await app.ainvoke({"ask": False}, config("rm_1"))
+            await app.ainvoke({"ask": True}, config("rm_1"))
+            await app.ainvoke({}, config("other"))
+
+            report = await compact_sqlite(saver, keep=2, thread_prefix="rm_")
+
+            async with conn.execute("SELECT thread_id, COUNT(*) FROM checkpoints GROUP BY thread_id") as cursor:
+                counts = dict(await cursor.fetchall())
+            state = await app.aget_state(config("rm_1"))
+            return report, counts, state
+
+    report, counts, state = asyncio.run(main())
+
+    assert report["threads"] == 1 and report["checkpoints_removed"] > 0 and report["bytes_reclaimed"] > 0
+    assert counts["rm_1"] == 2
+    # Threads outside the prefix are left alone
+    assert counts["other"] > 2
+    assert state.values["profile"] == "x" * 1000
+    assert state.values["turns"] == list(range(10))
+    assert state.interrupts
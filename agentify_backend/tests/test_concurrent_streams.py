@@ -0,0 +1,92 @@
+"""Concurrent /chat/stream requests against the backend running on the stub servers."""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Iterator
+
+import httpx
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS = os.path.join(BACKEND_DIR, "benchmarks", "stub_servers.py")
+# Each LLM call of a turn takes this long, so serialized streams are easy to tell apart
+LLM_LATENCY = 0.2
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise RuntimeError(f"{url} did not come up")
+
+
+@pytest.fixture(scope="module")
+def backend_url() -> Iterator[str]:
+    mcp_port, openai_port, backend_port = free_port(), free_port(), free_port()
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="test",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{openai_port}/v1",
+        MCP_SERVER_URL=f"http://127.0.0.1:{mcp_port}/mcp",
+    )
+    processes = [
+        subprocess.Popen([sys.executable, STUBS, "mcp", "--port", str(mcp_port)]),
+        subprocess.Popen([sys.executable, STUBS, "openai", "--port", str(openai_port), "--latency", str(LLM_LATENCY)]),
+    ]
+    try:
+        wait_until_up(f"http://127.0.0.1:{openai_port}/docs")
+        wait_until_up(f"http://127.0.0.1:{mcp_port}/mcp")
+        processes.append(subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--port", str(backend_port), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env=env,
+        ))
+        wait_until_up(f"http://127.0.0.1:{backend_port}/health")
+        yield f"http://127.0.0.1:{backend_port}"
+    finally:
+        for process in processes:
+            process.terminate()
+            process.wait()
+
+
+async def read_stream(client: httpx.AsyncClient, rm_id: int) -> float:
+    """Consume one SSE stream; returns its duration in seconds."""
+    start = time.perf_counter()
+    async with client.stream("POST", "/chat/stream", json={"message": "Tìm khách hàng An", "rm_id": rm_id}) as response:
+        assert response.status_code == 200
+        async for line in response.aiter_lines():
+            if line == "data: [DONE]":
+                break
+            assert '"error"' not in line, line
+    return time.perf_counter() - start
+
+
+def test_concurrent_streams_do_not_block_each_other(backend_url: str) -> None:
+    count = 8
+
+    async def run() -> tuple:
+        async with httpx.AsyncClient(base_url=backend_url, timeout=60) as client:
+            # Loads the tools and compiles the graph
+            await read_stream(client, 9000)
+            single = await read_stream(client, 9001)
+            start = time.perf_counter()
+            await asyncio.gather(*(read_stream(client, 9100 + i) for i in range(count)))
+            return single, time.perf_counter() - start
+
+    single, wall = asyncio.run(run())
+
+    # Serialized streams would take count * single
+    assert wall < single * count * 0.5, (single, wall)
@@ -0,0 +1,84 @@
+import asyncio
+import json
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from agent.context_builder import MIN_TOOL_RESULT_TOKENS, ContextBuilder, build_prompt
+from agent.message_window import update_message_window
+
+SYSTEM = SystemMessage(content="system")
+
+
+def builder(token_budget):
+    summaries = GenericFakeChatModel(messages=iter([AIMessage(content="summary")] * 10))
+    return ContextBuilder(summaries, token_budget=token_budget)
+
+
+def tool_result(call_id, chars):
+    return ToolMessage(content=json.dumps({"code": "succeeded", "details": "x" * chars}), tool_call_id=call_id)
+
+
+def tool_turn(call_id, chars):
+    return [
+        HumanMessage(content="Khách hàng nào?"),
+        AIMessage(content="", tool_calls=[{"name": "find_customer", "args": {}, "id": call_id}]),
+        tool_result(call_id, chars),
+    ]
+
+
+def build(context_builder, messages):
+    state = {"messages": messages}
+    state["message_window"] = update_message_window(state)
+    state["context"] = asyncio.run(context_builder.build(state))
+    return state
+
+
+def test_turns_within_budget_are_sent_verbatim():
+    messages = tool_turn("a", 400)
+
+    state = build(builder(10_000), messages)
+
+    assert build_prompt(state, SYSTEM)[1:] == messages
+    assert state["context"]["truncated"] == []
+
+
+def test_newest_turn_over_budget_has_its_tool_results_cut():
+    context_builder = builder(2_000)
+    messages = tool_turn("a", 40_000) + [tool_result("a", 40_000), tool_result("a", 100)]
+
+    state = build(context_builder, messages)
+
+    metrics = state["context"]["metrics"]
+    assert metrics["messages_truncated"] == 2
+    assert metrics["prompt_tokens"] <= 2_000
+    prompt = build_prompt(state, SYSTEM)
+    assert len(prompt) == len(messages) + 1
+    assert "more characters omitted" in prompt[3].content
+    assert "more characters omitted" in prompt[4].content
+    # The small result is not cut
+    assert prompt[5] is messages[4]
+    assert sum(context_builder.counter.count_message(message) for message in prompt[1:]) <= 2_000
+
+
+def test_thread_without_human_message_is_kept_within_budget():
+    context_builder = builder(1_000)
+    messages = [
+        AIMessage(content="", tool_calls=[{"name": "find_customer", "args": {}, "id": "a"}]),
+        tool_result("a", 20_000),
+    ]
+
+    state = build(context_builder, messages)
+
+    assert state["context"]["metrics"]["prompt_tokens"] <= 1_000
+    assert state["context"]["metrics"]["messages_sent"] == 2
+
+
+def test_results_are_never_cut_below_the_minimum():
+    context_builder = builder(50)
+    messages = tool_turn("a", 20_000)
+
+    state = build(context_builder, messages)
+
+    truncated = build_prompt(state, SYSTEM)[3]
+    assert context_builder.counter.count_message(truncated) >= MIN_TOOL_RESULT_TOKENS - 1
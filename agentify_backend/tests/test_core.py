@@ -0,0 +1,100 @@
+"""AgentCore entry points with a stand-in graph."""
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableLambda
+from langchain_mcp_adapters.interceptors import MCPToolCallRequest
+
+from agent.core import AgentCore, rm_header_interceptor
+from agent.response_cache import ResponseCache
+
+
+class SlowGraph:
+    """Streams one token, then hangs like a stuck tool call."""
+
+    def __init__(self):
+        self.closed = False
+
+    async def astream(self, graph_input, config, stream_mode):
+        try:
+            yield "updates", {}
+            await asyncio.sleep(3600)
+        finally:
+            self.closed = True
+
+
+def test_stream_ends_with_an_error_at_the_deadline():
+    agent = AgentCore()
+    agent.graph = SlowGraph()
+    agent.response_cache = None
+
+    async def run():
+        events = []
+        async for event in agent.stream_chat("Xin chào", "rm_1", 1, deadline=time.monotonic() + 0.2):
+            events.append(event)
+        return events
+
+    events = asyncio.run(asyncio.wait_for(run(), 5))
+
+    assert events[-1]["type"] == "error"
+    assert "deadline" in events[-1]["content"]
+    assert agent.graph.closed
+
+
+def test_clear_history_drops_the_rm_cached_answers():
+    agent = AgentCore()
+    agent.response_cache = ResponseCache(mutating_tools=set())
+    turn = [HumanMessage(content="hiệu suất tuần này"), AIMessage(content="10 task")]
+
+    async def run():
+        await agent.response_cache.put(1, "hiệu suất tuần này", turn)
+        await agent.clear_history("rm_1", 1)
+        return await agent.response_cache.lookup(1, "hiệu suất tuần này")
+
+    assert asyncio.run(run()) is None
+
+
+def test_rm_header_comes_from_each_run_config():
+    seen = {}
+
+    async def handler(request):
+        seen[request.args["call"]] = request.headers["x-rm-id"]
+
+    async def call(name):
+        request = MCPToolCallRequest(name="find_customer", args={"call": name}, server_name="tools")
+        await rm_header_interceptor(request, handler)
+
+    async def run():
+        # Concurrent runs of different RMs through the same runnable
+        runnable = RunnableLambda(call)
+        await asyncio.gather(*(
+            runnable.ainvoke(f"call {rm_id}", {"configurable": {"rm_id": rm_id}}) for rm_id in range(1, 6)
+        ))
+
+    asyncio.run(run())
+
+    assert seen == {f"call {rm_id}": str(rm_id) for rm_id in range(1, 6)}
+
+
+def test_graph_is_compiled_once_for_every_rm(monkeypatch):
+    agent = AgentCore()
+    loads = []
+
+    async def get_tools():
+        loads.append(1)
+        return []
+
+    monkeypatch.setattr(agent.tool_catalog, "get_tools", get_tools)
+
+    async def run():
+        await asyncio.gather(agent.initialize(), agent.initialize())
+        graph = agent.graph
+        await agent.initialize()
+        return graph
+
+    graph = asyncio.run(run())
+
+    assert graph is agent.graph and loads == [1]
+    assert agent.build_config("rm_1", 1)["configurable"]["rm_id"] == 1
+    assert agent.build_config("rm_2", 2)["configurable"]["rm_id"] == 2
@@ -0,0 +1,42 @@
+"""ExportStore on the sample database export."""
+import glob
+import json
+import os
+from collections import Counter
+
+import pytest
+
+from export_analytics import ExportStore, convert_exports
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+EXPORTS = os.path.join(ROOT, "mcp_server", "src", "data", "exports")
+EXPORT = sorted(glob.glob(os.path.join(EXPORTS, "database_export_*.json")))[-1]
+
+
+@pytest.fixture
+def store(tmp_path) -> ExportStore:
+    store = convert_exports([EXPORT], str(tmp_path / "store"))
+    yield store
+    store.close()
+
+
+def test_counts_match_the_loaded_export(store: ExportStore) -> None:
+    with open(EXPORT, encoding="utf-8") as file:
+        customers = json.load(file)["data"]["customers"]
+    assert store.customers_by_segment() == dict(Counter(customer["segment"] for customer in customers))
+    assert list(store.column("customers", "id")) == [customer["id"] for customer in customers]
+
+
+def test_column_outlives_close(store: ExportStore) -> None:
+    ids = store.column("customers", "id")
+    store.close()
+    assert len(ids) == store.rows("customers")
+
+
+def test_close_with_a_view_held(store: ExportStore) -> None:
+    view = store._view("customers", "segment")
+    store.column("tasks", "status")
+    store.close()
+    assert store._maps == {}
+    # The segment map is unmapped once the view goes
+    assert len(view) == store.rows("customers")
@@ -0,0 +1,64 @@
+"""The agent graph end to end, with the scripted model and tools of the graph benchmark."""
+import asyncio
+from collections import Counter
+
+from langchain_core.messages import HumanMessage
+from langgraph.types import Command
+
+from agent import core, tool_results
+from benchmarks.graph_node_benchmark import ScriptedChatModel, make_tools
+
+
+def run_turns(monkeypatch, turns):
+    decodes = Counter()
+    decode_result = tool_results.decode_result
+
+    def counting_decode(content):
+        decodes["count"] += 1
+        return decode_result(content)
+
+    monkeypatch.setattr(tool_results, "decode_result", counting_decode)
+    agent = core.AgentCore()
+    agent.llm = ScriptedChatModel()
+
+    async def main():
+        await agent.build_graph(make_tools())
+        config = agent.build_config("rm_1", 1)
+        results = []
+        for prompt in turns:
+            graph_input = Command(resume=prompt) if prompt == "yes" else {"messages": [HumanMessage(content=prompt)]}
+            nodes = Counter()
+            decodes.clear()
+            async for event in agent.graph.astream(graph_input, config, stream_mode="tasks"):
+                if "input" in event:
+                    nodes[event["name"]] += 1
+            state = await agent.graph.aget_state(config)
+            results.append((nodes, decodes["count"], state))
+        await agent.mcp_connection_pool.close()
+        await agent.llm_client.close()
+        return results
+
+    return asyncio.run(main())
+
+
+def test_read_turn_runs_approval_once_and_decodes_the_result_once(monkeypatch):
+    [(nodes, decodes, state)] = run_turns(monkeypatch, ["Tìm khách hàng An"])
+
+    assert nodes == Counter({"rm_assistant": 2, "tools": 1, "approval": 1})
+    assert decodes == 1
+    assert not state.interrupts
+    assert state.values["messages"][-1].content == "Đây là kết quả."
+
+
+def test_confirmed_task_is_created(monkeypatch):
+    (create_nodes, create_decodes, asked), (confirm_nodes, _, done) = run_turns(
+        monkeypatch, ["Tạo task gọi cho khách hàng 1", "yes"]
+    )
+
+    assert create_nodes == Counter({"rm_assistant": 1, "tools": 1, "approval": 1})
+    assert create_decodes == 1
+    assert asked.interrupts and "create_rm_task" in asked.interrupts[0].value
+    # Resuming re-runs only the approval step, then creates the task
+    assert confirm_nodes == Counter({"approval": 1, "proceed_confirmed_tool": 1})
+    assert not done.interrupts
+    assert done.values["approval_route"] == "proceed_confirmed_tool"
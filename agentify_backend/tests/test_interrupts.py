@@ -0,0 +1,77 @@
+"""Per-thread pending interrupt index."""
+import asyncio
+
+import aiosqlite
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.types import Interrupt, interrupt
+
+from agent.interrupts import InterruptIndex, SharedInterruptIndex
+from agent.shared_store import SharedStore
+
+
+def ask(state: MessagesState) -> dict:
+    interrupt("Xác nhận tạo task?")
+    return {}
+
+
+def interrupted_thread(checkpointer, thread_id: str) -> None:
+    builder = StateGraph(MessagesState)
+    builder.add_node("ask", ask)
+    builder.add_edge(START, "ask")
+    builder.add_edge("ask", END)
+    graph = builder.compile(checkpointer=checkpointer)
+    asyncio.run(graph.ainvoke({"messages": []}, {"configurable": {"thread_id": thread_id}}))
+
+
+def test_each_thread_keeps_its_own_question():
+    index = InterruptIndex(InMemorySaver())
+
+    async def run():
+        await index.record("rm_1", [Interrupt(value="Xác nhận tạo task?")])
+        await index.record("rm_2", [])
+        return await index.get("rm_1"), await index.get("rm_2")
+
+    assert asyncio.run(run()) == ("Xác nhận tạo task?", None)
+    # Answered from the index, without reading a checkpoint
+    assert index.stats() == {"threads": 2, "pending": 1, "hits": 2, "loads": 0}
+
+
+def test_unknown_thread_is_loaded_once_from_its_checkpoint():
+    checkpointer = InMemorySaver()
+    interrupted_thread(checkpointer, "rm_1")
+    # A new process: nothing indexed yet
+    index = InterruptIndex(checkpointer)
+
+    async def run():
+        return [await index.get("rm_1"), await index.get("rm_1"), await index.get("rm_2")]
+
+    assert asyncio.run(run()) == ["Xác nhận tạo task?", "Xác nhận tạo task?", None]
+    assert (index.loads, index.hits) == (2, 1)
+
+
+def test_invalidated_thread_is_reloaded():
+    checkpointer = InMemorySaver()
+    interrupted_thread(checkpointer, "rm_1")
+    index = InterruptIndex(checkpointer)
+
+    async def run():
+        await index.forget("rm_1")
+        assert await index.get("rm_1") is None
+        await index.invalidate("rm_1")
+        return await index.get("rm_1")
+
+    assert asyncio.run(run()) == "Xác nhận tạo task?"
+
+
+def test_workers_see_each_other_questions(tmp_path):
+    async def run():
+        async with aiosqlite.connect(tmp_path / "shared.db", isolation_level=None) as conn:
+            store = SharedStore(conn)
+            await store.setup()
+            first = SharedInterruptIndex(InMemorySaver(), store)
+            second = SharedInterruptIndex(InMemorySaver(), store)
+            await first.record("rm_1", [Interrupt(value="Xác nhận cập nhật task?")])
+            return await second.get("rm_1"), second.loads
+
+    assert asyncio.run(run()) == ("Xác nhận cập nhật task?", 0)
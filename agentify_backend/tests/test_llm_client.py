@@ -0,0 +1,158 @@
+"""LLMClient retries, retry budget and deadlines against a fake OpenAI server."""
+import asyncio
+import json
+import time
+from typing import Any, Callable, Iterator, List
+
+import httpx
+import openai
+import pytest
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGenerationChunk, ChatResult
+
+from agent.llm_client import DeadlineExceeded, LLMClient
+
+ANSWER = "Xin chào"
+
+
+def completion(content: str = ANSWER) -> httpx.Response:
+    return httpx.Response(200, json={
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "gpt-4o",
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+    })
+
+
+def error(status: int, retry_after: str = "") -> httpx.Response:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    return httpx.Response(status, headers=headers, json={"error": {"message": "Injected failure", "type": "server_error"}})
+
+
+class FakeOpenAI:
+    """``/v1/chat/completions`` answering with the given responses in turn."""
+
+    def __init__(self, *responses: Callable[[], httpx.Response]):
+        self.responses = list(responses)
+        self.requests: List[dict] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(json.loads(request.content))
+        return self.responses.pop(0)()
+
+
+def client_for(server: FakeOpenAI, **options: Any) -> LLMClient:
+    options.setdefault("retry_initial_delay", 0.01)
+    client = LLMClient(api_key="test", base_url="http://openai.test/v1", **options)
+    client.http_client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return client
+
+
+def invoke(client: LLMClient, config: Any = None, runnable: Any = None) -> Any:
+    runnable = runnable or client.chat_model("gpt-4o", temperature=0)
+    return asyncio.run(client.ainvoke(runnable, [HumanMessage(content="hi")], config))
+
+
+@pytest.mark.parametrize("status", [429, 500, 503])
+def test_transient_error_is_retried(status: int) -> None:
+    server = FakeOpenAI(lambda: error(status), completion)
+    client = client_for(server)
+
+    assert invoke(client).content == ANSWER
+    assert len(server.requests) == 2
+    assert client.stats()["retries"] == 1
+
+
+def test_client_error_is_not_retried() -> None:
+    server = FakeOpenAI(lambda: error(400), completion)
+    client = client_for(server)
+
+    with pytest.raises(openai.BadRequestError):
+        invoke(client)
+    assert len(server.requests) == 1
+
+
+def test_retries_stop_after_max_retries() -> None:
+    server = FakeOpenAI(*[lambda: error(500)] * 4)
+    client = client_for(server, max_retries=2)
+
+    with pytest.raises(openai.InternalServerError):
+        invoke(client)
+    assert len(server.requests) == 3
+    assert client.stats()["failures"] == 1
+
+
+def test_exhausted_budget_fails_without_retry() -> None:
+    server = FakeOpenAI(lambda: error(429), completion)
+    client = client_for(server)
+    client.retry_budget.tokens = 0
+
+    with pytest.raises(openai.RateLimitError):
+        invoke(client)
+    assert len(server.requests) == 1
+    assert client.stats()["retry_budget_exhausted"] == 1
+
+
+def test_expired_deadline_sends_nothing() -> None:
+    server = FakeOpenAI(completion)
+    client = client_for(server)
+
+    with pytest.raises(DeadlineExceeded):
+        invoke(client, {"configurable": {"deadline": time.monotonic() - 1}})
+    assert server.requests == []
+
+
+def test_backoff_past_deadline_is_not_slept() -> None:
+    server = FakeOpenAI(lambda: error(429, retry_after="30"), completion)
+    client = client_for(server)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        invoke(client, {"configurable": {"deadline": start + 5}})
+    assert time.monotonic() - start < 1
+    assert len(server.requests) == 1
+    assert client.stats()["deadline_exceeded"] == 1
+
+
+class FailingMidStream(BaseChatModel):
+    """Streams one token, then fails like an upstream 500."""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "failing-mid-stream"
+
+    def _generate(self, *args: Any, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError
+
+    def _stream(self, *args: Any, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self.calls += 1
+        yield ChatGenerationChunk(message=AIMessageChunk(content="Xin"))
+        request = httpx.Request("POST", "http://openai.test/v1/chat/completions")
+        raise openai.InternalServerError("Injected failure", response=httpx.Response(500, request=request), body=None)
+
+
+class Tokens(AsyncCallbackHandler):
+    def __init__(self) -> None:
+        self.tokens: List[str] = []
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        self.tokens.append(token)
+
+
+def test_streamed_call_is_not_retried() -> None:
+    client = client_for(FakeOpenAI())
+    model = FailingMidStream()
+    tokens = Tokens()
+
+    with pytest.raises(openai.InternalServerError):
+        # Streamed like under stream_chat, where LangGraph's "messages" mode asks for tokens
+        invoke(client, {"callbacks": [tokens]}, model.bind(stream=True))
+    assert model.calls == 1
+    assert tokens.tokens == ["Xin"]
+    assert client.stats()["retries"] == 0
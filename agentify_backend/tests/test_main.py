@@ -0,0 +1,33 @@
+"""Route-level behaviour of the FastAPI app with a stand-in agent."""
+import asyncio
+
+import main
+
+
+class FakeAgent:
+    def __init__(self):
+        self.cleared = []
+
+    async def clear_history(self, thread_id, rm_id=None):
+        self.cleared.append(thread_id)
+
+
+def test_clear_chat_history_waits_for_the_running_turn(monkeypatch):
+    fake = FakeAgent()
+    monkeypatch.setattr(main, "agent", fake)
+
+    async def run():
+        # A chat turn of RM 1 is in progress
+        ticket = await main.admission.acquire("rm_1")
+        clear = asyncio.create_task(main.clear_chat_history(1))
+        await asyncio.sleep(0.05)
+        assert fake.cleared == []
+
+        await ticket.release()
+        result = await asyncio.wait_for(clear, 1)
+        assert fake.cleared == ["rm_1"]
+        assert result["success"]
+        # The clear released its own ticket
+        assert main.admission.queue_depth("rm_1") == 0
+
+    asyncio.run(run())
@@ -0,0 +1,230 @@
+"""Session reuse and retries of the MCP session pool, and the shared HTTP transport."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+import pytest
+from langchain_mcp_adapters.interceptors import MCPToolCallRequest
+
+from agent import mcp_pool
+from agent.mcp_pool import MCPConnectionPool, MCPSessionPool, SessionUnavailable
+
+CONNECTIONS = {"agentify": {"transport": "streamable_http", "url": "http://mcp.test/mcp"}}
+
+
+class FakeSession:
+    def __init__(self, server, headers):
+        self.server = server
+        self.headers = headers
+        self.calls = 0
+
+    async def initialize(self):
+        pass
+
+    async def call_tool(self, name, args):
+        self.calls += 1
+        self.server.calls.append((name, self.headers.get("x-rm-id")))
+        if self.server.failures:
+            raise self.server.failures.pop(0)
+        return f"{name} ok"
+
+
+class FakeServer:
+    """Stands in for create_session; records the sessions opened and calls made."""
+
+    def __init__(self):
+        self.sessions = []
+        self.closed = 0
+        self.calls = []
+        self.failures = []
+        self.unavailable = 0
+
+    @asynccontextmanager
+    async def create_session(self, connection):
+        if self.unavailable:
+            self.unavailable -= 1
+            raise ConnectionError("connection refused")
+        session = FakeSession(self, connection["headers"])
+        self.sessions.append(session)
+        try:
+            yield session
+        finally:
+            self.closed += 1
+
+
+@pytest.fixture
+def server(monkeypatch):
+    fake = FakeServer()
+    monkeypatch.setattr(mcp_pool, "create_session", fake.create_session)
+    return fake
+
+
+def request(tool="find_customer", rm_id="1", server_name="agentify"):
+    return MCPToolCallRequest(name=tool, args={}, server_name=server_name, headers={"x-rm-id": rm_id})
+
+
+async def unreachable(request):
+    raise AssertionError("the pool makes the call itself")
+
+
+def test_sessions_are_reused_per_rm(server):
+    async def run():
+        pool = MCPSessionPool(CONNECTIONS)
+        for _ in range(3):
+            assert await pool(request(rm_id="1"), unreachable) == "find_customer ok"
+        await asyncio.gather(*(pool(request(rm_id="2"), unreachable) for _ in range(3)))
+        stats = pool.stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(run())
+
+    # One initialized session per x-rm-id, shared by concurrent calls
+    assert [session.headers["x-rm-id"] for session in server.sessions] == ["1", "2"]
+    assert stats == {"sessions": 2, "opened": 2, "hits": 4, "retries": 0}
+    assert server.closed == 2
+
+
+def test_other_servers_go_to_the_handler(server):
+    async def handler(request):
+        return "handled"
+
+    async def run():
+        pool = MCPSessionPool(CONNECTIONS)
+        return await pool(request(server_name="other"), handler)
+
+    assert asyncio.run(run()) == "handled"
+    assert server.sessions == []
+
+
+def test_failed_read_is_retried_once_on_a_new_session(server):
+    server.failures = [httpx.ReadTimeout("timed out")]
+
+    async def run():
+        pool = MCPSessionPool(CONNECTIONS, mutating_tools={"create_task"})
+        result = await pool(request(), unreachable)
+        stats = pool.stats()
+        await pool.close()
+        return result, stats
+
+    result, stats = asyncio.run(run())
+
+    assert result == "find_customer ok"
+    assert len(server.calls) == 2
+    assert len(server.sessions) == 2
+    assert stats["retries"] == 1
+    # The broken session was closed
+    assert server.closed == 2
+
+
+def test_failed_mutation_that_reached_the_server_is_not_retried(server):
+    server.failures = [httpx.ReadTimeout("timed out")]
+
+    async def run():
+        pool = MCPSessionPool(CONNECTIONS, mutating_tools={"create_task"})
+        with pytest.raises(httpx.ReadTimeout):
+            await pool(request(tool="create_task"), unreachable)
+        stats = pool.stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert server.calls == [("create_task", "1")]
+    assert stats["retries"] == 0
+
+
+def test_mutation_is_retried_when_the_session_could_not_open(server):
+    server.unavailable = 1
+
+    async def run():
+        pool = MCPSessionPool(CONNECTIONS, mutating_tools={"create_task"})
+        result = await pool(request(tool="create_task"), unreachable)
+        stats = pool.stats()
+        await pool.close()
+        return result, stats
+
+    result, stats = asyncio.run(run())
+
+    # The first session never opened, so the write was sent exactly once
+    assert result == "create_task ok"
+    assert server.calls == [("create_task", "1")]
+    assert stats["retries"] == 1
+
+
+def test_session_unavailable_twice_gives_up(server):
+    server.unavailable = 2
+
+    async def run():
+        pool = MCPSessionPool(CONNECTIONS)
+        with pytest.raises(SessionUnavailable):
+            await pool(request(), unreachable)
+        return pool.stats()
+
+    stats = asyncio.run(run())
+
+    assert server.calls == []
+    assert stats["retries"] == 1
+    assert stats["sessions"] == 0
+
+
+def test_idle_session_is_reopened(server):
+    async def run():
+        pool = MCPSessionPool(CONNECTIONS, idle_timeout=0)
+        await pool(request(), unreachable)
+        await asyncio.sleep(0.01)
+        await pool(request(), unreachable)
+        stats = pool.stats()
+        await pool.close()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert len(server.sessions) == 2
+    assert stats["hits"] == 0
+
+
+def test_least_recently_used_session_is_closed_beyond_the_cap(server):
+    async def run():
+        pool = MCPSessionPool(CONNECTIONS, max_sessions=2)
+        for rm_id in ("1", "2", "1", "3"):
+            await pool(request(rm_id=rm_id), unreachable)
+        await asyncio.sleep(0.01)
+        closed = server.closed
+        stats = pool.stats()
+        await pool.close()
+        return closed, stats
+
+    closed, stats = asyncio.run(run())
+
+    # RM 2 was the least recently used when RM 3 arrived
+    assert closed == 1
+    assert server.sessions[1].headers["x-rm-id"] == "2"
+    assert stats["sessions"] == 2
+
+
+def test_clients_share_one_transport():
+    seen = []
+
+    def respond(request):
+        seen.append(request.headers.get("x-rm-id"))
+        return httpx.Response(200, json={})
+
+    async def run():
+        pool = MCPConnectionPool()
+        await pool.transport.aclose()
+        pool.transport = httpx.MockTransport(respond)
+        for rm_id in ("1", "2"):
+            async with pool.client_factory(headers={"x-rm-id": rm_id}) as client:
+                await client.get("http://mcp.test/mcp")
+        # Closing a client left the shared transport usable
+        async with pool.client_factory() as client:
+            response = await client.get("http://mcp.test/mcp")
+        await pool.close()
+        return pool.clients_created, response.status_code
+
+    clients, status = asyncio.run(run())
+
+    assert clients == 3
+    assert status == 200
+    assert seen == ["1", "2", None]
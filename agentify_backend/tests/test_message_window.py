@@ -0,0 +1,131 @@
+import json
+import random
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agent.message_window import iter_selected, select_messages, update_message_window
+from agent.tool_results import make_tool_result
+
+SUCCEEDED = {"code": "succeeded"}
+FAILED = {"code": "failed"}
+
+
+def reference_selection(messages):
+    """The filter as a full walk over the thread, as get_messages did before the window."""
+    max_successful_tool_calls = 2
+    add_fail_tool_call = True
+    filtered = []
+    for message in reversed(messages):
+        if message.type == "human":
+            if len(filtered) > 2 and filtered[-2].type == "tool":
+                max_successful_tool_calls -= 1
+            filtered.append(message)
+        elif message.type == "tool":
+            if json.loads(message.content).get("code", "succeeded") == "succeeded":
+                add_fail_tool_call = False
+                if max_successful_tool_calls > 0:
+                    filtered.append(message)
+            elif add_fail_tool_call:
+                filtered.append(message)
+        elif message.type == "ai":
+            if not filtered or filtered[-1].type != "ai":
+                filtered.append(message)
+    return filtered[::-1]
+
+
+def tool_message(result, call_id):
+    return ToolMessage(content=json.dumps(result), tool_call_id=call_id, artifact=make_tool_result(result))
+
+
+def random_messages(rng, count):
+    """Message sequences with every kind of neighbour except a tool result right after a human message."""
+    messages = [HumanMessage(content="q")]
+    while len(messages) < count:
+        previous = messages[-1].type
+        kinds = ["human", "ai"] if previous == "human" else ["human", "ai", "tool", "tool"]
+        kind = rng.choice(kinds)
+        if kind == "human":
+            messages.append(HumanMessage(content="q"))
+        elif kind == "ai":
+            messages.append(AIMessage(content="a"))
+        else:
+            messages.append(tool_message(rng.choice([SUCCEEDED, FAILED]), str(len(messages))))
+    return messages
+
+
+def random_turn(rng, turn):
+    """A realistic exchange: question, zero or more tool rounds, answer."""
+    messages = [HumanMessage(content=f"q{turn}")]
+    for round_ in range(rng.choice([0, 0, 1, 1, 2])):
+        call_id = f"{turn}-{round_}"
+        messages.append(AIMessage(content="", tool_calls=[{"name": "find_customer", "args": {}, "id": call_id}]))
+        for _ in range(rng.choice([1, 1, 2])):
+            messages.append(tool_message(rng.choice([SUCCEEDED, SUCCEEDED, FAILED]), call_id))
+    messages.append(AIMessage(content=f"a{turn}"))
+    if rng.random() < 0.1:
+        # Confirmation question and the RM's reply
+        messages += [AIMessage(content="confirm?"), HumanMessage(content="no"), AIMessage(content="ok")]
+    return messages
+
+
+def assert_matches_reference(state):
+    state["message_window"] = update_message_window(state)
+    assert select_messages(state) == reference_selection(state["messages"])
+
+
+def test_incremental_window_matches_full_walk_on_realistic_threads():
+    rng = random.Random(0)
+    for _ in range(200):
+        state = {"messages": []}
+        for turn in range(rng.randint(1, 30)):
+            new = random_turn(rng, turn)
+            base = state["messages"]
+            # The window is updated at every LLM call: after the question and after each tool round
+            for end in range(1, len(new) + 1):
+                if end == len(new) or new[end].type != "tool":
+                    state["messages"] = base + new[:end]
+                    assert_matches_reference(state)
+
+
+def test_incremental_window_matches_full_walk_on_arbitrary_sequences():
+    rng = random.Random(1)
+    for _ in range(300):
+        messages = random_messages(rng, rng.randint(1, 60))
+        state = {"messages": []}
+        position = 0
+        while position < len(messages):
+            position = min(len(messages), position + rng.randint(1, 6))
+            state["messages"] = messages[:position]
+            assert_matches_reference(state)
+
+
+def test_window_walks_back_only_to_the_first_matching_turn():
+    messages = []
+    for turn in range(5_000):
+        messages += [HumanMessage(content=f"q{turn}"), AIMessage(content=f"a{turn}")]
+    state = {"messages": messages}
+    state["message_window"] = update_message_window(state)
+
+    walked = []
+
+    class Counting(list):
+        def __getitem__(self, index):
+            walked.append(index)
+            return list.__getitem__(self, index)
+
+    state["messages"] = Counting(messages + [HumanMessage(content="next")])
+    window = update_message_window(state)
+
+    assert len(walked) < 10
+    assert list(iter_selected(state["messages"], window, len(messages) - 2)) == [
+        len(messages), len(messages) - 1, len(messages) - 2,
+    ]
+
+
+def test_window_from_an_older_version_is_rebuilt():
+    messages = [HumanMessage(content="q"), AIMessage(content="a")]
+    legacy = {"scanned": 2, "failed_tools": [], "boundary": 0, "prefix": [], "selected": [0, 1]}
+
+    window = update_message_window({"messages": messages, "message_window": legacy})
+
+    assert window == {"scanned": 2, "boundary": 0, "breakpoints": [], "extras": []}
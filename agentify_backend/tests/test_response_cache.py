@@ -0,0 +1,54 @@
+"""ResponseCache matching of rephrased questions and follow-ups."""
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from agent.response_cache import ResponseCache
+
+
+def cached(question: str, history=()) -> ResponseCache:
+    cache = ResponseCache(mutating_tools=set())
+    turn = [*history, HumanMessage(content=question), AIMessage(content=f"answer to {question}")]
+    assert asyncio.run(cache.put(1, question, turn))
+    return cache
+
+
+@pytest.mark.parametrize("question, rephrased", [
+    ("Tìm khách hàng Nguyễn Văn An", "tìm giúp khách hàng nguyễn văn an nhé!"),
+    ("hiệu suất tuần này", "Hiệu suất tuần này ạ?"),
+])
+def test_rephrasing_hits(question: str, rephrased: str) -> None:
+    assert asyncio.run(cached(question).lookup(1, rephrased)) == f"answer to {question}"
+
+
+@pytest.mark.parametrize("question, other", [
+    ("Tìm khách hàng Nguyễn Văn Minh", "Tìm khách hàng Nguyễn Văn"),
+    ("Tìm khách hàng Hà", "Tìm khách hàng Hạ"),
+    ("hiệu suất tuần tới", "hiệu suất tuần"),
+    ("công việc của tôi", "công việc của em"),
+    ("Tìm khách hàng An", "Tìm khách hàng Anh"),
+])
+def test_different_question_misses(question: str, other: str) -> None:
+    assert asyncio.run(cached(question).lookup(1, other)) is None
+
+
+def test_follow_up_is_served_only_after_the_same_answer() -> None:
+    history = [HumanMessage(content="Tìm khách hàng An"), AIMessage(content="Khách hàng An, id 1")]
+    cache = cached("còn khách hàng kia thì sao?", history)
+
+    assert ResponseCache.needs_context("chi tiết task đó")
+    assert asyncio.run(cache.lookup(1, "còn khách hàng kia thì sao?", "Khách hàng Bình, id 2")) is None
+    assert asyncio.run(cache.lookup(1, "còn khách hàng kia thì sao?", None)) is None
+    assert asyncio.run(cache.lookup(1, "Còn khách hàng kia thì sao", "Khách hàng An, id 1")) is not None
+
+
+def test_time_words_do_not_make_a_follow_up() -> None:
+    assert not ResponseCache.needs_context("hiệu suất tháng này của tôi")
+    assert ResponseCache.needs_context("khách hàng này")
+
+
+def test_invalidate_drops_the_rm_answers() -> None:
+    cache = cached("hiệu suất tuần này")
+    cache.invalidate(1)
+    assert asyncio.run(cache.lookup(1, "hiệu suất tuần này")) is None
@@ -0,0 +1,84 @@
+"""Typed /chat/stream events: tool progress and keepalives."""
+import asyncio
+
+import pytest
+
+from agent import core
+from agent.stream_events import token_event, with_keepalive
+from benchmarks.graph_node_benchmark import ScriptedChatModel, make_tools
+
+
+def collect(events, interval):
+    async def main():
+        return [event async for event in with_keepalive(events, interval)]
+
+    return asyncio.run(main())
+
+
+def test_keepalives_fill_the_silences():
+    async def slow():
+        yield token_event("a")
+        await asyncio.sleep(0.25)
+        yield token_event("b")
+
+    events = collect(slow(), 0.1)
+
+    types = [event["type"] for event in events]
+    assert types[0] == "token" and types[-1] == "token"
+    assert types.count("keepalive") >= 1
+    assert [event["content"] for event in events if event["type"] == "token"] == ["a", "b"]
+
+
+def test_source_failure_is_raised_to_the_consumer():
+    async def failing():
+        yield token_event("a")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        collect(failing(), 0.1)
+
+
+def test_source_is_cancelled_when_the_consumer_stops():
+    stopped = []
+
+    async def endless():
+        try:
+            while True:
+                yield token_event("a")
+                await asyncio.sleep(0.01)
+        finally:
+            stopped.append(True)
+
+    async def main():
+        stream = with_keepalive(endless(), 1)
+        await anext(stream)
+        await stream.aclose()
+        await asyncio.sleep(0)
+
+    asyncio.run(main())
+
+    assert stopped == [True]
+
+
+def test_read_turn_streams_tool_progress_then_the_answer():
+    agent = core.AgentCore()
+    agent.llm = ScriptedChatModel()
+    agent.response_cache = None
+
+    async def main():
+        await agent.build_graph(make_tools())
+        events = [event async for event in agent.stream_chat("Tìm khách hàng An", "rm_1", 1)]
+        await agent.mcp_connection_pool.close()
+        await agent.llm_client.close()
+        return events
+
+    events = asyncio.run(main())
+
+    types = [event["type"] for event in events]
+    assert types.index("tool_start") < types.index("tool_end") < types.index("token")
+    assert types[-1] == "done"
+    tool_start, tool_end = events[types.index("tool_start")], events[types.index("tool_end")]
+    assert tool_start["tool"] == tool_end["tool"] == "find_customer"
+    assert tool_start["tool_call_id"] == tool_end["tool_call_id"]
+    assert tool_end["status"] == "succeeded" and tool_end["duration_ms"] >= 0
+    assert "".join(event["content"] for event in events if event["type"] == "token") == "Đây là kết quả."
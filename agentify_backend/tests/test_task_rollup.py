@@ -0,0 +1,144 @@
+"""TaskRollup kept current from the tasks table."""
+import asyncio
+import sqlite3
+from datetime import date, timedelta
+from typing import Any
+
+import pytest
+
+import tool_py
+from task_rollup import TaskRollup
+
+NOW = "2025-03-31 12:00:00"
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    path = str(tmp_path / "tasks.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE fact_rm_task (id INTEGER PRIMARY KEY, "rmId" INTEGER, "customerId" INTEGER, '
+        '"taskType" TEXT, status TEXT, "taskDetails" TEXT, "createdAt" TIMESTAMP, "dueDate" DATE, '
+        '"updatedAt" TIMESTAMP)'
+    )
+    connection.executemany(
+        "INSERT INTO fact_rm_task VALUES (?, 1, 1, 'CALL', ?, '', '2025-03-01 09:00:00', '2025-03-01', ?)",
+        [(1, "COMPLETED", NOW), (2, "IN_PROGRESS", "2025-03-30 08:00:00")],
+    )
+    connection.commit()
+    connection.close()
+    return path
+
+
+def execute(path: str, statement: str, *params: Any) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute(statement, params)
+    connection.commit()
+    connection.close()
+
+
+def synced(path: str, rollup: TaskRollup, *statements: Any) -> list:
+    """Counts of RM 1 after a first sync, the statements and a second sync."""
+    async def main() -> list:
+        database = tool_py.SQLiteDatabase(path)
+        try:
+            await rollup.sync(database)
+            for statement in statements:
+                execute(path, *statement)
+            await rollup.sync(database)
+            return rollup.counts(1)
+        finally:
+            await database.close()
+
+    return asyncio.run(main())
+
+
+def test_sync_reads_rows_with_the_last_seen_timestamp(path: str) -> None:
+    insert = "INSERT INTO fact_rm_task VALUES (3, 1, 1, 'CALL', 'COMPLETED', '', '2025-03-02 09:00:00', '2025-03-02', ?)"
+    assert synced(path, TaskRollup(), (insert, NOW)) == [("COMPLETED", 2), ("IN_PROGRESS", 1)]
+
+
+def test_sync_reads_rows_committed_late_within_the_overlap(path: str) -> None:
+    update = "UPDATE fact_rm_task SET status = 'COMPLETED', \"updatedAt\" = '2025-03-31 11:58:00' WHERE id = 2"
+    assert synced(path, TaskRollup(overlap=timedelta(minutes=5)), (update,)) == [("COMPLETED", 2)]
+
+
+def test_sync_rereads_the_overlap_without_double_counting(path: str) -> None:
+    assert synced(path, TaskRollup(overlap=timedelta(days=30))) == [("COMPLETED", 1), ("IN_PROGRESS", 1)]
+
+
+def test_report_performance_refreshes_stale_counts(path: str) -> None:
+    rollup = TaskRollup(max_age=0)
+    config = {"configurable": {"rm_id": 1}}
+
+    async def main() -> dict:
+        database = tool_py.SQLiteDatabase(path)
+        tool_py.configure_database(database)
+        tool_py.configure_task_rollup(rollup)
+        try:
+            await rollup.sync(database)
+            execute(path, "UPDATE fact_rm_task SET status = 'CANCELLED', \"updatedAt\" = '2025-03-31 13:00:00' WHERE id = 2")
+            day = date(2025, 3, 1).isoformat()
+            return await tool_py.report_performance.ainvoke({"startDate": day, "endDate": day}, config)
+        finally:
+            tool_py.configure_task_rollup(None)
+            tool_py.DATABASE = None
+            await database.close()
+
+    assert asyncio.run(main())["performance_report"] == {"cancelled tasks": 1, "completed tasks": 1, "total tasks": 2}
+
+
+def test_refresh_waits_for_max_age(path: str) -> None:
+    async def main() -> list:
+        database = tool_py.SQLiteDatabase(path)
+        rollup = TaskRollup(max_age=3600)
+        try:
+            return [await rollup.refresh(database), await rollup.refresh(database)]
+        finally:
+            await database.close()
+
+    assert asyncio.run(main()) == [True, False]
+
+
+def test_first_report_counts_in_sql_while_the_rollup_warms_up(path: str) -> None:
+    rollup = TaskRollup()
+    config = {"configurable": {"rm_id": 1}}
+
+    async def main() -> list:
+        database = tool_py.SQLiteDatabase(path)
+        tool_py.configure_database(database)
+        tool_py.configure_task_rollup(rollup)
+        try:
+            # Started the first sync without waiting for it
+            reports = [await tool_py.report_performance.ainvoke({}, config)]
+            await rollup.warm_up(database)
+            reports.append(await tool_py.report_performance.ainvoke({}, config))
+            return [report["performance_report"] for report in reports]
+        finally:
+            tool_py.configure_task_rollup(None)
+            tool_py.DATABASE = None
+            await database.close()
+
+    expected = {"completed tasks": 1, "in_progress tasks": 1, "total tasks": 2}
+    assert asyncio.run(main()) == [expected, expected]
+    assert rollup.ready
+
+
+def test_failed_sync_does_not_move_the_sync_point(path: str) -> None:
+    class FailingDatabase(tool_py.SQLiteDatabase):
+        async def stream(self, *args: Any, **kwargs: Any):
+            async for rows in super().stream(*args, **kwargs):
+                yield rows
+            raise ConnectionError("connection lost")
+
+    async def main() -> None:
+        database = FailingDatabase(path)
+        rollup = TaskRollup()
+        try:
+            with pytest.raises(ConnectionError):
+                await rollup.sync(database)
+        finally:
+            await database.close()
+        assert rollup.synced_until is None and not rollup.ready
+
+    asyncio.run(main())
@@ -0,0 +1,48 @@
+"""Read-through caching of MCP tool results."""
+import asyncio
+import json
+
+from langchain_mcp_adapters.interceptors import MCPToolCallRequest
+from mcp.types import CallToolResult, TextContent
+
+from agent.tool_cache import ToolResultCache
+
+
+def call_result(payload, is_error=False):
+    return CallToolResult(content=[TextContent(type="text", text=json.dumps(payload))], isError=is_error)
+
+
+def request(tool="find_customer", **args):
+    return MCPToolCallRequest(name=tool, args=args, server_name="agentify", headers={"x-rm-id": "1"})
+
+
+def call_twice(result):
+    cache = ToolResultCache({"find_customer": 60})
+    calls = []
+
+    async def handler(req):
+        calls.append(req)
+        return result
+
+    async def run():
+        await cache(request(name="An"), handler)
+        await cache(request(name="An"), handler)
+
+    asyncio.run(run())
+    return len(calls)
+
+
+def test_successful_results_are_served_from_the_cache():
+    assert call_twice(call_result({"code": "succeeded", "customer_info": {"id": 1}})) == 1
+
+
+def test_failures_reported_as_content_are_not_cached():
+    not_found = {
+        "code": "failed",
+        "customer_info": {},
+        "message": "No customer found matching the provided criteria. Please ask back for different information.",
+    }
+    assert call_twice(call_result(not_found)) == 2
+    assert call_twice(call_result({"customer_info": {}, "message": "An error occurred while searching for customer: timeout"})) == 2
+    assert call_twice(call_result({"code": "succeeded"}, is_error=True)) == 2
+    assert call_twice(CallToolResult(content=[TextContent(type="text", text="not json")])) == 2
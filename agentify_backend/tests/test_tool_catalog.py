@@ -0,0 +1,99 @@
+"""ToolCatalog caching, change detection and sharing between workers."""
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiosqlite
+from langchain_core.tools import tool
+from mcp.types import ListToolsResult, Tool
+
+from agent.shared_store import SharedStore
+from agent.tool_catalog import ToolCatalog
+
+
+def make_tool(description: str):
+    @tool
+    def find_customer(customerName: str) -> str:
+        """Placeholder."""
+        return customerName
+
+    find_customer.description = description
+    return find_customer
+
+
+class FakeClient:
+    """Stands in for MultiServerMCPClient; counts the requests to the MCP server."""
+
+    connections = {"tools": {"transport": "streamable_http", "url": "http://127.0.0.1:1/mcp"}}
+    callbacks = None
+    tool_interceptors = []
+
+    def __init__(self, description: str = "Find a customer"):
+        self.description = description
+        self.requests = 0
+
+    async def get_tools(self):
+        self.requests += 1
+        return [make_tool(self.description)]
+
+    @asynccontextmanager
+    async def session(self, server_name):
+        client = self
+
+        class Session:
+            async def list_tools(self, cursor=None):
+                client.requests += 1
+                schema = {"type": "object", "properties": {"customerName": {"type": "string"}}}
+                return ListToolsResult(tools=[Tool(name="find_customer", description=client.description, inputSchema=schema)])
+
+        yield Session()
+
+
+def test_cached_tools_are_served_without_mcp_requests():
+    client = FakeClient()
+    catalog = ToolCatalog(client)
+
+    async def run():
+        first = await catalog.get_tools()
+        assert await catalog.get_tools() is first
+
+    asyncio.run(run())
+
+    assert client.requests == 1 and catalog.hits == 1
+
+
+def test_listeners_are_notified_only_when_the_schemas_change():
+    client = FakeClient()
+    catalog = ToolCatalog(client)
+    notified = []
+
+    async def listener(tools):
+        notified.append(tools[0].description)
+
+    catalog.add_listener(listener)
+
+    async def run():
+        await catalog.get_tools()
+        assert not await catalog.refresh()
+        client.description = "Find one customer by name"
+        assert await catalog.refresh()
+
+    asyncio.run(run())
+
+    assert notified == ["Find one customer by name"]
+
+
+def test_workers_share_the_schemas_through_the_store(tmp_path):
+    async def run():
+        async with aiosqlite.connect(tmp_path / "shared.db", isolation_level=None) as conn:
+            store = SharedStore(conn)
+            await store.setup()
+            first, second = FakeClient(), FakeClient()
+            tools = await ToolCatalog(first, store=store).get_tools()
+            shared = ToolCatalog(second, store=store)
+            shared_tools = await shared.get_tools()
+            return first.requests, second.requests, shared.shared_loads, tools, shared_tools
+
+    first_requests, second_requests, shared_loads, tools, shared_tools = asyncio.run(run())
+
+    assert (first_requests, second_requests, shared_loads) == (1, 0, 1)
+    assert [tool.name for tool in shared_tools] == [tool.name for tool in tools] == ["find_customer"]
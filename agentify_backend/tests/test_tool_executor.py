@@ -0,0 +1,93 @@
+"""ToolExecutor fan-out of read calls and deferral of extra mutating calls."""
+import asyncio
+import json
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+from langgraph.graph import END, START, StateGraph
+
+from agent.state import AgentState
+from agent.tool_executor import ToolExecutor
+from agent.tool_results import ToolResultProjector
+
+TOOL_LATENCY = 0.2
+
+
+def make_tools(running):
+    async def find_customer(customerName: str) -> str:
+        """Find a customer by name."""
+        running.append(1)
+        try:
+            await asyncio.sleep(TOOL_LATENCY)
+        finally:
+            running.pop()
+        return json.dumps({"customer_info": {"name": customerName}, "code": "succeeded"})
+
+    async def create_rm_task(customerId: int) -> str:
+        """Validate a new task and ask for confirmation."""
+        return json.dumps({"message": "Ask for confirmation.", "ask_confirmation": True, "code": "succeeded"})
+
+    return [StructuredTool.from_function(coroutine=function) for function in (find_customer, create_rm_task)]
+
+
+def call(name, call_id, **args):
+    return {"name": name, "args": args, "id": call_id}
+
+
+def run_tools(tool_calls, max_concurrency=4):
+    running = []
+    peak = []
+
+    async def watch():
+        while True:
+            peak.append(len(running))
+            await asyncio.sleep(0.01)
+
+    executor = ToolExecutor(make_tools(running), {"create_rm_task"}, ToolResultProjector(), max_concurrency)
+    builder = StateGraph(AgentState)
+    builder.add_node("tools", executor)
+    builder.add_edge(START, "tools")
+    builder.add_edge("tools", END)
+    graph = builder.compile()
+
+    async def main():
+        watcher = asyncio.create_task(watch())
+        start = time.perf_counter()
+        try:
+            result = await graph.ainvoke({"messages": [AIMessage(content="", tool_calls=tool_calls)]})
+        finally:
+            watcher.cancel()
+        return result, time.perf_counter() - start
+
+    result, elapsed = asyncio.run(main())
+    return result, elapsed, max(peak)
+
+
+def test_read_calls_run_concurrently_within_the_limit():
+    calls = [call("find_customer", f"read_{i}", customerName=name) for i, name in enumerate(["An", "Bình", "Chi", "Dũng"])]
+
+    result, elapsed, peak = run_tools(calls, max_concurrency=2)
+
+    assert peak == 2
+    # Two rounds of two calls, not four in a row
+    assert elapsed < TOOL_LATENCY * 3
+    assert [message.tool_call_id for message in result["messages"][1:]] == ["read_0", "read_1", "read_2", "read_3"]
+
+
+def test_mutating_calls_after_the_first_are_deferred():
+    calls = [
+        call("create_rm_task", "create_1", customerId=1),
+        call("find_customer", "read", customerName="An"),
+        call("create_rm_task", "create_2", customerId=2),
+    ]
+
+    result, _, _ = run_tools(calls)
+
+    messages = {message.tool_call_id: message for message in result["messages"][1:]}
+    # The mutating call that ran comes last and is the one awaiting confirmation
+    assert [message.tool_call_id for message in result["messages"][1:]] == ["read", "create_2", "create_1"]
+    assert result["pending_confirmation"] == "create_1"
+    assert json.loads(messages["create_2"].content)["code"] == "failed"
+    assert messages["create_2"].status == "error"
+    assert json.loads(messages["create_1"].content)["ask_confirmation"]
@@ -0,0 +1,228 @@
+"""The MCP read tools of tool_py on the SQLite stand-in database."""
+import asyncio
+import sqlite3
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict
+
+import pytest
+
+import tool_py
+from customer_index import CustomerSearchIndex
+
+RM_ID = 1
+CONFIG = {"configurable": {"rm_id": RM_ID}}
+# updatedAt of the customers when the index fixture was synced
+SYNCED_UNTIL = datetime(2025, 1, 1)
+
+CUSTOMERS = [
+    (1, "Nguyễn Văn An", "an@gmail.com", "+840900000001", "1 Điện Biên Phủ", "Hà Nội", "Diamond"),
+    (2, "Trần Thị Bình", "binh@gmail.com", "+840900000002", "2 Lê Lợi", "Hà Nội", "Diamond"),
+    (3, "Trần Thị Bình", "binh.tran@gmail.com", "+840900000003", "3 Lê Lợi", "Huế", "Mega Prime"),
+    (4, "Lê 100% Hà", "ha_le@gmail.com", "+840900000004", "4 Trần Phú", "Đà Nẵng", "Diamond"),
+    (5, "Lê 1000 Hà", "haxle@gmail.com", "+840900000005", "5 Trần Phú", "Đà Nẵng", "Diamond"),
+    (6, "Lê Văn Hà", "le.van.ha@gmail.com", "+840900000006", "6 Nguyễn Trãi", "Cần Thơ", "Diamond"),
+    (7, "Lê Văn Hạ", "le.van.ha7@gmail.com", "+840900000007", "7 Nguyễn Trãi", "Cần Thơ", "Diamond"),
+    (8, "Lê Văn Hả", "le.van.ha8@gmail.com", "+840900000008", "8 Nguyễn Trãi", "Cần Thơ", "Diamond"),
+]
+# (id, rmId, status, createdAt, dueDate)
+TASKS = [
+    (1, RM_ID, "COMPLETED", "2025-03-01 00:00:00", "2025-03-01"),
+    (2, RM_ID, "COMPLETED", "2025-03-15 12:00:00", "2025-03-15"),
+    (3, RM_ID, "IN_PROGRESS", "2025-03-31 23:59:59", "2025-03-31"),
+    (4, RM_ID, "CANCELLED", "2025-04-01 00:00:00", "2025-04-01"),
+    (5, 2, "COMPLETED", "2025-03-10 09:00:00", "2025-03-10"),
+]
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    path = str(tmp_path / "agentify.db")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        'CREATE TABLE customer (id INTEGER PRIMARY KEY, name TEXT, email TEXT, phone TEXT, address TEXT, '
+        'country TEXT, dob DATE, gender TEXT, "jobTitle" TEXT, segment TEXT, state TEXT, zip TEXT, '
+        '"isActive" BOOLEAN, "behaviorDescription" TEXT, "rmId" INTEGER, "updatedAt" TIMESTAMP)'
+    )
+    connection.execute(
+        'CREATE TABLE fact_rm_task (id INTEGER PRIMARY KEY, "rmId" INTEGER, "customerId" INTEGER, '
+        '"taskType" TEXT, status TEXT, "taskDetails" TEXT, "createdAt" TIMESTAMP, "dueDate" DATE)'
+    )
+    connection.executemany(
+        "INSERT INTO customer VALUES (?, ?, ?, ?, ?, 'Việt Nam', '1990-01-01', 'male', 'Kỹ sư', ?, ?, '70000', 1, '', 1, ?)",
+        [
+            (id, name, email, phone, address, segment, state, SYNCED_UNTIL)
+            for id, name, email, phone, address, state, segment in CUSTOMERS
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO fact_rm_task VALUES (?, ?, 1, 'CALL', ?, 'Gọi điện tư vấn', ?, ?)", TASKS
+    )
+    connection.commit()
+    connection.close()
+    return path
+
+
+@pytest.fixture
+def run(path: str) -> Callable[[Callable[[], Awaitable[Any]]], Any]:
+    def run(call: Callable[[], Awaitable[Any]]) -> Any:
+        async def main() -> Any:
+            database = tool_py.SQLiteDatabase(path)
+            tool_py.configure_database(database)
+            try:
+                return await call()
+            finally:
+                await database.close()
+
+        return asyncio.run(main())
+
+    yield run
+    tool_py.DATABASE = None
+
+
+@pytest.fixture
+def index() -> CustomerSearchIndex:
+    index = CustomerSearchIndex()
+    for id, name, email, phone, address, _, _ in CUSTOMERS:
+        index.add(id, name, email, phone, address)
+    index.synced_until = SYNCED_UNTIL
+    tool_py.configure_customer_index(index)
+    yield index
+    tool_py.configure_customer_index(None)
+
+
+def execute(path: str, statement: str, *params: Any) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute(statement, params)
+    connection.commit()
+    connection.close()
+
+
+def find_customer(run, **criteria: str) -> Dict[str, Any]:
+    return run(lambda: tool_py.find_customer.ainvoke(criteria))
+
+
+def test_find_customer_none(run) -> None:
+    result = find_customer(run, customerName="Phạm Văn Dũng")
+    assert result["customer_info"] == {}
+    assert result["message"].startswith("No customer found")
+
+
+def test_find_customer_one(run) -> None:
+    result = find_customer(run, customerName="Nguyễn Văn An")
+    assert result["customer_info"]["id"] == 1
+    assert result["customer_info"]["dob"] == "1990-01-01"
+    assert result["message"] == "Customer found successfully."
+
+
+def test_find_customer_several(run) -> None:
+    result = find_customer(run, customerName="Trần Thị Bình")
+    assert result["customer_info"] == {}
+    assert result["message"].startswith("Multiple customers (2) found")
+
+
+def test_find_customer_narrowed_by_other_criteria(run) -> None:
+    result = find_customer(run, customerName="Trần Thị Bình", customerState="Huế")
+    assert result["customer_info"]["id"] == 3
+
+
+@pytest.mark.parametrize("name, customer_id", [("100%", 4), ("1000", 5)])
+def test_find_customer_percent_is_literal(run, name: str, customer_id: int) -> None:
+    assert find_customer(run, customerName=name)["customer_info"]["id"] == customer_id
+
+
+@pytest.mark.parametrize("email, customer_id", [("ha_le", 4), ("haxle", 5)])
+def test_find_customer_underscore_is_literal(run, email: str, customer_id: int) -> None:
+    assert find_customer(run, customerEmail=email)["customer_info"]["id"] == customer_id
+
+
+def find_rm_task(run, start: str, end: str) -> Dict[str, Any]:
+    return run(lambda: tool_py.find_rm_task.ainvoke({"taskDueDate": (start, end)}, CONFIG))
+
+
+def test_find_rm_task_due_dates_are_inclusive(run) -> None:
+    assert find_rm_task(run, "2025-03-01", "2025-03-01")["task_info"]["id"] == 1
+    assert find_rm_task(run, "2025-03-31", "2025-04-01")["message"].startswith("(2) tasks found")
+    assert find_rm_task(run, "2025-03-02", "2025-03-14")["message"].startswith("No task found")
+
+
+def test_find_rm_task_rejects_reversed_range(run) -> None:
+    assert find_rm_task(run, "2025-04-01", "2025-03-01")["message"].startswith("Start date cannot be greater")
+
+
+def test_find_rm_task_only_returns_the_rms_tasks(run) -> None:
+    assert find_rm_task(run, "2025-03-10", "2025-03-10")["message"].startswith("No task found")
+
+
+def report(run, start: str, end: str) -> Dict[str, Any]:
+    return run(lambda: tool_py.report_performance.ainvoke({"startDate": start, "endDate": end}, CONFIG))
+
+
+def test_report_performance_counts_the_whole_end_day(run) -> None:
+    assert report(run, "2025-03-01", "2025-03-31")["performance_report"] == {
+        "completed tasks": 2,
+        "in_progress tasks": 1,
+        "total tasks": 3,
+    }
+
+
+def test_report_performance_single_day(run) -> None:
+    assert report(run, "2025-04-01", "2025-04-01")["performance_report"] == {
+        "cancelled tasks": 1,
+        "total tasks": 1,
+    }
+    assert report(run, "2025-04-02", "2025-04-30")["message"].startswith("No task found")
+
+
+def test_database_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        tool_py.Database()
+
+
+def test_database_from_env_passes_the_password_as_is(monkeypatch) -> None:
+    monkeypatch.setenv("POSTGRES_PASSWORD", "p@ss/w:rd")
+    monkeypatch.setenv("POSTGRES_PORT", "6543")
+    database = tool_py.database_from_env()
+    assert database.dsn is None
+    assert database.connect_kwargs["password"] == "p@ss/w:rd"
+    assert database.connect_kwargs["port"] == 6543
+
+
+def test_indexed_full_name_with_diacritics_is_exact(run, index) -> None:
+    assert find_customer(run, customerName="Lê Văn Hạ")["customer_info"]["id"] == 7
+
+
+def test_indexed_name_without_diacritics_matches_every_spelling(run, index) -> None:
+    assert find_customer(run, customerName="Le Van Ha")["message"].startswith("Multiple customers (3) found")
+
+
+def test_indexed_match_renamed_since_sync(run, index, path) -> None:
+    execute(path, "UPDATE customer SET name = ?, \"updatedAt\" = ? WHERE id = 6", "Trần Thị Mai", datetime(2025, 6, 1))
+
+    assert find_customer(run, customerName="Lê Văn Hà")["customer_info"].get("id") != 6
+    assert find_customer(run, customerName="Trần Thị Mai")["customer_info"]["id"] == 6
+
+
+def test_indexed_match_deleted_since_sync(run, index, path) -> None:
+    execute(path, "DELETE FROM customer WHERE id = 7")
+
+    assert find_customer(run, customerName="Lê Văn Hạ")["customer_info"].get("id") != 7
+    assert 7 not in index
+
+
+def test_index_miss_syncs_customers_added_since(run, index, path) -> None:
+    execute(
+        path,
+        "INSERT INTO customer (id, name, email, phone, address, \"updatedAt\") VALUES (9, ?, ?, ?, ?, ?)",
+        "Phạm Văn Dũng", "dung@gmail.com", "+840900000009", "9 Lê Lợi", datetime(2025, 6, 1),
+    )
+
+    assert find_customer(run, customerName="Phạm Văn Dũng")["customer_info"]["id"] == 9
+    assert 9 in index
+    assert index.synced_until == datetime(2025, 6, 1)
+
+
+def test_index_sync_rereads_the_overlap(run, index, path) -> None:
+    # Committed after the last sync with an updatedAt just before the newest one seen
+    execute(path, "UPDATE customer SET name = ?, \"updatedAt\" = ? WHERE id = 6", "Trần Thị Mai", datetime(2024, 12, 31, 23, 59))
+
+    assert find_customer(run, customerName="Trần Thị Mai")["customer_info"]["id"] == 6
@@ -0,0 +1,153 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import StructuredTool
+from langgraph.graph import END, START, StateGraph
+
+from agent.state import MAX_STORED_PAYLOADS, AgentState, merge_tool_payloads
+from agent.tool_executor import ToolExecutor
+from agent.tool_results import (
+    READ_TOOL_RESULT,
+    ToolResultProjector,
+    get_payload,
+    get_tool_result,
+    make_tool_result,
+    read_tool_result,
+)
+
+CUSTOMER = {
+    "id": 7, "name": "Nguyễn Văn A", "email": "a@example.com", "phone": "0900000000",
+    "address": "1 Lê Lợi", "state": "HCM", "zip": "700000", "country": "VN",
+    "dob": "1990-01-01", "gender": "male", "jobTitle": "Engineer", "segment": "VIP",
+    "isActive": True, "behaviorDescription": "x" * 500,
+}
+
+
+def customers(count):
+    return [{**CUSTOMER, "id": index} for index in range(count)]
+
+
+def run_tools(state, tools):
+    """Run the tools node on ``state`` inside a graph, returning the new state."""
+    builder = StateGraph(AgentState)
+    builder.add_node("tools", ToolExecutor(tools, set(), ToolResultProjector(max_list_items=5)))
+    builder.add_edge(START, "tools")
+    builder.add_edge("tools", END)
+    return asyncio.run(builder.compile().ainvoke(state))
+
+
+def list_customers_tool(count):
+    async def list_customers() -> str:
+        """List customers."""
+        return json.dumps({"code": "succeeded", "customer_info": customers(count)})
+
+    return StructuredTool.from_function(coroutine=list_customers, name="list_customers")
+
+
+def test_find_customer_projection_keeps_profile_fields():
+    projected = ToolResultProjector().project("find_customer", {"code": "succeeded", "customer_info": CUSTOMER})
+
+    info = projected["customer_info"]
+    for field in ("dob", "gender", "jobTitle", "country", "zip", "segment"):
+        assert info[field] == CUSTOMER[field]
+    assert "behaviorDescription" not in info
+
+
+def test_projected_result_is_stored_under_its_tool_call_id():
+    call = {"name": "list_customers", "args": {}, "id": "call-1"}
+    state = run_tools(
+        {"messages": [HumanMessage(content="hi"), AIMessage(content="", tool_calls=[call])]},
+        [list_customers_tool(30), read_tool_result],
+    )
+
+    message = state["messages"][-1]
+    assert json.loads(message.content)["customer_info"][-1] == "... 25 more omitted"
+    assert message.artifact["payload_ref"] == "call-1"
+    assert get_payload(state, message.artifact)["customer_info"] == customers(30)
+
+
+def test_model_reads_omitted_items_from_the_stored_payload():
+    calls = [
+        {"name": "list_customers", "args": {}, "id": "call-1"},
+        {"name": READ_TOOL_RESULT, "args": {"call_id": "call-1", "key": "customer_info", "offset": 25}, "id": "call-2"},
+    ]
+    state = run_tools(
+        {"messages": [HumanMessage(content="hi"), AIMessage(content="", tool_calls=calls[:1])]},
+        [list_customers_tool(30), read_tool_result],
+    )
+    state = run_tools(
+        {**state, "messages": [*state["messages"], AIMessage(content="", tool_calls=calls[1:])]},
+        [list_customers_tool(30), read_tool_result],
+    )
+
+    page = json.loads(state["messages"][-1].content)
+    assert page["total"] == 30
+    assert [item["id"] for item in page["items"]] == [25, 26, 27, 28, 29]
+    # Pages come back in full and are not stored again
+    assert page["items"][0]["behaviorDescription"] == CUSTOMER["behaviorDescription"]
+    assert state["messages"][-1].artifact["payload_ref"] is None
+
+
+def test_payloads_leaving_the_message_window_are_dropped():
+    call = {"name": "list_customers", "args": {}, "id": "call-1"}
+    state = run_tools(
+        {"messages": [HumanMessage(content="hi"), AIMessage(content="", tool_calls=[call])]},
+        [list_customers_tool(30)],
+    )
+    assert "call-1" in state["tool_payloads"]
+
+    # The window no longer selects the first tool message
+    later = [*state["messages"], HumanMessage(content="next"), AIMessage(content="", tool_calls=[{**call, "id": "call-2"}])]
+    window = {"scanned": len(later), "boundary": 3, "breakpoints": [], "extras": []}
+    state = run_tools({**state, "messages": later, "message_window": window}, [list_customers_tool(30)])
+
+    assert set(state["tool_payloads"]) == {"call-2"}
+
+
+def test_merge_tool_payloads_deletes_and_caps():
+    merged = merge_tool_payloads({"a": {"code": "succeeded"}}, {"a": None, "b": {"code": "succeeded"}})
+    assert merged == {"b": {"code": "succeeded"}}
+
+    many = {str(index): {} for index in range(MAX_STORED_PAYLOADS + 5)}
+    assert list(merge_tool_payloads({}, many)) == list(many)[-MAX_STORED_PAYLOADS:]
+
+
+def test_read_tool_result_reports_missing_payloads():
+    result = json.loads(read_tool_result.invoke({
+        "type": "tool_call", "name": READ_TOOL_RESULT, "id": "x",
+        "args": {"call_id": "gone", "key": "customer_info", "state": {"messages": [], "tool_payloads": {}}},
+    }).content)
+    assert result["code"] == "failed"
+
+
+def test_read_tool_result_resolves_through_the_envelope():
+    state = {
+        "messages": [
+            ToolMessage(content="{}", tool_call_id="full", artifact=make_tool_result({}, attachments=None)),
+            ToolMessage(content="{}", tool_call_id="shortened", artifact=make_tool_result({}, "shortened")),
+        ],
+        "tool_payloads": {"full": {"customer_info": CUSTOMER}},
+    }
+
+    def read(call_id):
+        return json.loads(read_tool_result.invoke({
+            "type": "tool_call", "name": READ_TOOL_RESULT, "id": "x",
+            "args": {"call_id": call_id, "key": "customer_info", "state": state},
+        }).content)
+
+    # Unprojected messages have no payload_ref, whatever the store holds
+    assert read("full")["code"] == "failed"
+    # Projected but pruned from the store
+    assert "no longer stored" in read("shortened")["message"]
+    state["tool_payloads"]["shortened"] = {"customer_info": CUSTOMER}
+    assert read("shortened")["customer_info"] == CUSTOMER
+
+
+def test_envelopes_checkpointed_with_a_projected_flag_have_no_payload_ref():
+    legacy = {"code": "succeeded", "ask_confirmation": False, "projected": True, "attachments": None, "duration_ms": 1.0}
+    envelope = get_tool_result(ToolMessage(content="{}", tool_call_id="a", artifact=legacy))
+
+    assert envelope["payload_ref"] is None
+    assert "projected" not in envelope
+    assert get_payload({"tool_payloads": {"a": {}}}, envelope) is None
@@ -0,0 +1,539 @@
+"""In-memory fuzzy search index over customers' name, email, phone and address.
+
+``find_customer`` used to turn every criterion into ``LIKE '%value%'``: a full
+table scan per lookup, which also misses names typed without Vietnamese
+diacritics ("Nguyen Van An") or with a typo ("Nguyen Van Thnag").
+``CustomerSearchIndex`` indexes each field as diacritic-folded, lowercased
+tokens (words and digit runs; phone numbers without their +84 / 0 prefix):
+
+- tokens and whole names and addresses map to posting lists of customers;
+- a query token that is not a known token is expanded to the known tokens it
+  starts (or, for digits, ends) with, found in the sorted vocabulary, and to
+  words one edit away (typos, found through their one-letter deletions) or,
+  for long words, sharing a character trigram within two edits;
+- candidates are the customers of the query's rarest token (or of the whole
+  queried value), narrowed by the posting lists of the other query tokens,
+  then scored against the candidate's own tokens.
+
+Matches are ranked exact first (every query token is a token of the field),
+then those containing the query tokens as parts of tokens (partial phone
+numbers, emails), then by score (closeness of the tokens, fields without
+extra tokens and in the query's order first). Query words typed with
+diacritics must keep them to be exact or contained: the customer's words are
+also kept unfolded, so "Lê Văn Hà" is an exact match of Hà only, not of Hạ
+or Hả, while "Le Van Ha" is one of all three.
+
+Posting lists are ``array('I')`` of slots in insertion order, so they stay
+sorted. ``add`` of a known customer and ``remove`` tombstone the old slot;
+``compact`` rebuilds the index once tombstones pile up.
+
+Customers are written by the MCP server, so nothing here sees the writes:
+``sync`` indexes the customers created or updated in the database since the
+last sync, and ``refresh`` (called by find_customer before it trusts a miss or
+a closest match) syncs once the index is older than ``max_age`` seconds,
+concurrent callers sharing one sync. Like the task rollup, each sync reads
+again an ``overlap`` before the newest ``updatedAt`` it saw, for rows with that
+same timestamp and rows committed late with an older one; ``add`` of an
+unchanged customer is a no-op. Deleted customers are dropped when a search
+returns them (see ``tool_py.refresh_customer_index``).
+"""
+import asyncio
+import json
+import re
+import sys
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass
+from itertools import islice, product
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+FIELDS = ("name", "email", "phone", "address")
+PHONE = FIELDS.index("phone")
+# Fields whose whole values repeat across customers and are indexed too
+VALUE_FIELDS = frozenset({FIELDS.index("name"), FIELDS.index("address")})
+
+# Weight of a query token matching part of a customer's token
+CONTAINED = 0.9
+# Highest weight of a query token matching a customer's token with typos
+TYPO = 0.85
+# Words this long may have two typos
+LONG_WORD = 7
+# Whole values looked up per query (combinations of its tokens' alternatives)
+MAX_VALUES = 32
+
+_TOKEN = re.compile(r"[a-z]+|[0-9]+")
+_WORD = re.compile(r"[^\W\d_]+|[0-9]+")
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip Vietnamese diacritics ("Đinh Công Thắng" -> "dinh cong thang")."""
+    decomposed = unicodedata.normalize("NFD", text.replace("đ", "d").replace("Đ", "D"))
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).lower()
+
+
+def tokenize(text: str, field: int = 0) -> Tuple[str, ...]:
+    """Folded words and digit runs; a phone number is one token without its country or trunk prefix."""
+    if field == PHONE:
+        digits = "".join(char for char in text if char.isdigit())
+        if len(digits) > 10 and digits.startswith("84"):
+            digits = digits[2:]
+        return (digits.lstrip("0"),) if digits.strip("0") else ()
+    # Interned: the same few thousand words repeat across a million customers
+    return tuple(sys.intern(token) for token in _TOKEN.findall(fold(text)))
+
+
+def words(text: str) -> Tuple[str, ...]:
+    """Lowercased words and digit runs with their diacritics."""
+    return tuple(sys.intern(word) for word in _WORD.findall(unicodedata.normalize("NFC", text).lower()))
+
+
+def trigrams(word: str) -> Set[str]:
+    """Character trigrams of the space-padded word."""
+    padded = f" {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def deletions(word: str) -> Set[str]:
+    """The word with one letter left out, in every way."""
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Damerau-Levenshtein distance (adjacent transpositions count once), or ``limit + 1`` beyond ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def typo_weight(token: str, word: str) -> float:
+    """Weight of a word matching a query token with typos (0 when too different)."""
+    if not token.isalpha() or not word.isalpha() or len(token) < 3:
+        return 0.0
+    limit = 1 if len(token) < LONG_WORD else 2
+    distance = edit_distance(token, word, limit)
+    if distance > limit:
+        return 0.0
+    return min(TYPO, 1 - distance / max(len(token), len(word)))
+
+
+def narrow(slots: Sequence[int], postings: List[array]) -> List[int]:
+    """The sorted slots that are in one of the sorted posting lists."""
+    if sum(map(len, postings)) <= 8 * len(slots):
+        members = {slot for posting in postings for slot in posting}
+        return [slot for slot in slots if slot in members]
+    # Few slots: look them up in the long posting lists
+    kept = set()
+    for posting in postings:
+        index, end = 0, len(posting)
+        for slot in slots:
+            index = bisect_left(posting, slot, index)
+            if index == end:
+                break
+            if posting[index] == slot:
+                kept.add(slot)
+    return [slot for slot in slots if slot in kept]
+
+
+@dataclass(frozen=True, slots=True)
+class CustomerMatch:
+    customer_id: int
+    score: float
+    # Every query token is a token of the customer's field, with the diacritics it was typed with
+    exact: bool
+    # Every query token is a token or part of a token of the field (what ``LIKE '%...%'`` matched)
+    contained: bool
+
+
+@dataclass(frozen=True, slots=True)
+class CustomerSearchResult:
+    # Best matches first, at most ``limit``
+    matches: List[CustomerMatch]
+    # Customers with every query token (may exceed ``limit``; beyond the
+    # index's ``max_candidates``, counted on diacritic-folded tokens)
+    exact_total: int
+
+
+class _FieldIndex:
+    """Postings and vocabulary of one field."""
+
+    __slots__ = ("values", "tokens", "vocabulary", "reversed_numbers", "neighbours", "grams", "unsorted")
+
+    def __init__(self) -> None:
+        # Whole value of several tokens (joined by spaces) -> slots
+        self.values: Dict[str, array] = {}
+        self.tokens: Dict[str, array] = {}
+        # Sorted tokens (prefix lookups) and reversed digit tokens (suffix lookups)
+        self.vocabulary: List[str] = []
+        self.reversed_numbers: List[str] = []
+        # Word or one-letter deletion of it -> words (typo lookups), trigram -> long words
+        self.neighbours: Dict[str, List[str]] = {}
+        self.grams: Dict[str, List[str]] = {}
+        # New tokens were appended to the vocabularies since they were last sorted
+        self.unsorted = False
+
+    def add(self, slot: int, tokens: Tuple[str, ...], whole_value: bool) -> None:
+        if whole_value and len(tokens) > 1:
+            value = " ".join(tokens)
+            posting = self.values.get(value)
+            if posting is None:
+                posting = self.values[value] = array("I")
+            posting.append(slot)
+        for token in set(tokens):
+            posting = self.tokens.get(token)
+            if posting is None:
+                posting = self.tokens[token] = array("I")
+                self.vocabulary.append(token)
+                self.unsorted = True
+                if token.isdigit():
+                    self.reversed_numbers.append(token[::-1])
+                else:
+                    for variant in deletions(token) | {token}:
+                        self.neighbours.setdefault(variant, []).append(token)
+                    if len(token) >= LONG_WORD:
+                        for gram in trigrams(token):
+                            self.grams.setdefault(gram, []).append(token)
+            posting.append(slot)
+
+    def alternatives(self, token: str, max_tokens: int) -> List[str]:
+        """Known tokens a query token may stand for: itself, tokens it starts or ends, close words."""
+        if token in self.tokens:
+            return [token]
+        if self.unsorted:
+            # Sorted on first use after changes (nearly sorted: a fast merge)
+            self.vocabulary.sort()
+            self.reversed_numbers.sort()
+            self.unsorted = False
+        found: List[str] = []
+        index = bisect_left(self.vocabulary, token)
+        while index < len(self.vocabulary) and self.vocabulary[index].startswith(token) and len(found) < max_tokens:
+            found.append(self.vocabulary[index])
+            index += 1
+        if token.isdigit():
+            reversed_token = token[::-1]
+            index = bisect_left(self.reversed_numbers, reversed_token)
+            while (index < len(self.reversed_numbers) and self.reversed_numbers[index].startswith(reversed_token)
+                   and len(found) < max_tokens):
+                found.append(self.reversed_numbers[index][::-1])
+                index += 1
+        else:
+            # Words one edit away share the word or a deletion with it
+            words = {word for variant in deletions(token) | {token} for word in self.neighbours.get(variant, ())}
+            if len(token) >= LONG_WORD:
+                words.update(word for gram in trigrams(token) for word in self.grams.get(gram, ()))
+            found.extend(word for word in words if typo_weight(token, word) > 0)
+        return found
+
+
+class _Query:
+    __slots__ = ("field", "tokens", "value", "accented")
+
+    def __init__(self, field: int, text: str):
+        self.field = field
+        self.tokens = tokenize(text, field)
+        self.value = " ".join(self.tokens)
+        # Words typed with diacritics, which matches must have as typed
+        self.accented = () if field == PHONE else tuple(word for word in words(text) if fold(word) != word)
+
+
+class CustomerSearchIndex:
+    """Token index of customers for ranked fuzzy lookups."""
+
+    def __init__(
+        self,
+        min_similarity: float = 0.6,
+        max_candidates: int = 5000,
+        overlap: timedelta = timedelta(minutes=5),
+        max_age: float = 2,
+    ):
+        """
+        Args:
+            min_similarity: Lowest weight of a query token's best match in a customer's field
+            max_candidates: Customers checked per search at most
+            overlap: How far before the newest ``updatedAt`` seen each sync reads again
+            max_age: Seconds ``refresh`` trusts the index for before it syncs again
+        """
+        self.min_similarity = min_similarity
+        self.max_candidates = max_candidates
+        # Per slot: customer ID, the field tokens (None once removed) and the
+        # field words with diacritics (the tokens themselves when they have none)
+        self._customer_ids: List[int] = []
+        self._documents: List[Optional[Tuple[Tuple[str, ...], ...]]] = []
+        self._accents: List[Optional[Tuple[Tuple[str, ...], ...]]] = []
+        self._slots: Dict[int, int] = {}
+        self._fields = [_FieldIndex() for _ in FIELDS]
+        self.removed = 0
+        self.overlap = overlap
+        self.max_age = max_age
+        # updatedAt of the newest customer loaded by ``sync`` (or ``from_json``)
+        self.synced_until: Optional[datetime] = None
+        # time.monotonic() when the last sync started
+        self.synced_at: Optional[float] = None
+        self._sync_lock = asyncio.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, customer_id: int) -> bool:
+        return customer_id in self._slots
+
+    def add(self, customer_id: int, name: str = "", email: str = "", phone: str = "", address: str = "") -> bool:
+        """
+        Index a customer, replacing its previous entry.
+
+        Returns:
+            Whether the customer was new or changed (an unchanged one is left as it is)
+        """
+        document = []
+        accents = []
+        for field, value in enumerate((name, email, phone, address)):
+            tokens = tokenize(value or "", field)
+            document.append(tokens)
+            # Without diacritics (emails, phones) the words are the tokens
+            accents.append(tokens if field == PHONE or (value or "").isascii() else words(value) or tokens)
+        slot = self._slots.get(customer_id)
+        if slot is not None and self._documents[slot] == tuple(document) and self._accents[slot] == tuple(accents):
+            return False
+        self._add(customer_id, tuple(document), tuple(accents))
+        return True
+
+    def _add(
+        self, customer_id: int, document: Tuple[Tuple[str, ...], ...], accents: Tuple[Tuple[str, ...], ...]
+    ) -> None:
+        self.remove(customer_id)
+        slot = len(self._documents)
+        self._customer_ids.append(customer_id)
+        self._documents.append(document)
+        self._accents.append(accents)
+        self._slots[customer_id] = slot
+        for field, (field_index, tokens) in enumerate(zip(self._fields, document)):
+            field_index.add(slot, tokens, field in VALUE_FIELDS)
+
+    def add_customer(self, customer: Dict[str, Any]) -> None:
+        """Index a customer record (``id``, ``name``, ``email``, ``phone``, ``address``)."""
+        self.add(int(customer["id"]), *(str(customer.get(field) or "") for field in FIELDS))
+
+    def remove(self, customer_id: int) -> bool:
+        """Drop a customer; its postings are skipped until ``compact``."""
+        slot = self._slots.pop(customer_id, None)
+        if slot is None:
+            return False
+        self._documents[slot] = self._accents[slot] = None
+        self.removed += 1
+        if self.removed > 1000 and self.removed > len(self._slots):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Rebuild the postings without removed customers."""
+        documents = [
+            (customer_id, document, accents)
+            for customer_id, document, accents in zip(self._customer_ids, self._documents, self._accents)
+            if document is not None
+        ]
+        self._customer_ids, self._documents, self._accents, self._slots = [], [], [], {}
+        self._fields = [_FieldIndex() for _ in FIELDS]
+        self.removed = 0
+        for customer_id, document, accents in documents:
+            self._add(customer_id, document, accents)
+
+    def _candidates(self, queries: List[_Query]) -> Tuple[List[int], Optional[int]]:
+        """
+        Slots to score: customers having every query token or one of its alternatives.
+
+        Returns:
+            The slots (exact matches first when there are more than ``max_candidates``)
+            and, in that case, the number of exact matches
+        """
+        groups: List[Tuple[int, List[array]]] = []
+        all_exact = True
+        start: Optional[List[array]] = None
+        start_query = -1
+        for position, query in enumerate(queries):
+            field_index = self._fields[query.field]
+            token_alternatives = []
+            for token in query.tokens:
+                alternatives = field_index.alternatives(token, self.max_candidates)
+                all_exact = all_exact and alternatives == [token]
+                token_alternatives.append(alternatives)
+                groups.append((position, [field_index.tokens[alternative] for alternative in alternatives]))
+            if len(query.tokens) < 2 or query.field not in VALUE_FIELDS:
+                continue
+            # Customers whose whole field is the query, or the query with its typos fixed
+            values = [" ".join(combination) for combination in islice(product(*token_alternatives), MAX_VALUES)]
+            postings = [field_index.values[value] for value in values if value in field_index.values]
+            if postings and (start is None or sum(map(len, postings)) < sum(map(len, start))):
+                start, start_query = postings, position
+        groups.sort(key=lambda group: sum(map(len, group[1])))
+
+        if start is not None and sum(map(len, start)) <= sum(map(len, groups[0][1])):
+            # The best matches, when there are some; they have their query's tokens
+            postings = start
+            rest = [group for group in groups if group[0] != start_query]
+        else:
+            postings, rest = groups[0][1], groups[1:]
+        slots: Sequence[int] = postings[0] if len(postings) == 1 else sorted({slot for posting in postings for slot in posting})
+        for _, postings in rest:
+            slots = narrow(slots, postings)
+        slots = [slot for slot in slots if self._documents[slot] is not None]
+        if len(slots) <= self.max_candidates:
+            return slots, None
+
+        # Too many to score: the exact matches first
+        if all_exact:
+            return slots[:self.max_candidates], len(slots)
+        exact = []
+        for slot in slots:
+            document = self._documents[slot]
+            if all(token in document[query.field] for query in queries for token in query.tokens):  # type: ignore[index]
+                exact.append(slot)
+        return (exact or slots)[:self.max_candidates], len(exact)
+
+    @staticmethod
+    def _weight(token: str, word: str, cache: Dict[Tuple[str, str], float]) -> float:
+        """How well a customer's word matches a query token (1 when equal)."""
+        if token == word:
+            return 1.0
+        key = (token, word)
+        weight = cache.get(key)
+        if weight is None:
+            weight = cache[key] = CONTAINED if token in word else typo_weight(token, word)
+        return weight
+
+    def _match(self, query: _Query, tokens: Tuple[str, ...], cache: Dict[Tuple[str, str], float]) -> float:
+        """Mean weight of the query tokens' best matches in a field, 0 when one matches too poorly."""
+        total = 0.0
+        for token in query.tokens:
+            if token in tokens:
+                total += 1.0
+                continue
+            best = max(self._weight(token, word, cache) for word in tokens)
+            if best < self.min_similarity:
+                return 0.0
+            total += best
+        return total / len(query.tokens)
+
+    def search(self, limit: int = 10, **criteria: Optional[str]) -> CustomerSearchResult:
+        """
+        Customers matching every given criterion, best first.
+
+        Args:
+            limit: Matches returned at most
+            **criteria: Text to look for per field (``name``, ``email``, ``phone``, ``address``)
+
+        Returns:
+            The ranked matches and the number of exact matches
+        """
+        unknown = set(criteria) - set(FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown customer search fields: {', '.join(sorted(unknown))}")
+        queries = [_Query(FIELDS.index(field), text) for field, text in criteria.items() if text]
+        queries = [query for query in queries if query.tokens]
+        if not queries:
+            return CustomerSearchResult([], 0)
+
+        candidates, exact_total = self._candidates(queries)
+        cache: Dict[Tuple[str, str], float] = {}
+        matches = []
+        exact_count = 0
+        for slot in candidates:
+            document = self._documents[slot]
+            if document is None:
+                continue
+            score, exact, contained = 0.0, True, True
+            for query in queries:
+                tokens = document[query.field]
+                weight = self._match(query, tokens, cache)
+                if weight == 0.0:
+                    break
+                exact = exact and weight == 1.0
+                contained = contained and weight >= CONTAINED
+                if query.accented and (exact or contained):
+                    # Folded tokens matched; the words typed with diacritics must match as typed
+                    accented = self._accents[slot][query.field]  # type: ignore[index]
+                    exact = exact and all(word in accented for word in query.accented)
+                    contained = contained and all(
+                        any(word in other for other in accented) for word in query.accented
+                    )
+                # Favour fields with no tokens beyond the query's ("An" over "An Khang"), in its order
+                in_order = len(query.tokens) == len(tokens) and all(
+                    self._weight(token, word, cache) >= self.min_similarity
+                    for token, word in zip(query.tokens, tokens)
+                )
+                score += 0.8 * weight + 0.1 * min(1.0, len(query.tokens) / len(tokens)) + 0.1 * in_order
+            else:
+                exact_count += exact
+                matches.append(CustomerMatch(self._customer_ids[slot], round(score / len(queries), 4), exact, contained))
+        matches.sort(key=lambda match: (not match.exact, not match.contained, -match.score, match.customer_id))
+        return CustomerSearchResult(matches[:limit], exact_count if exact_total is None else exact_total)
+
+    @classmethod
+    def from_json(cls, path: str, **kwargs: Any) -> "CustomerSearchIndex":
+        """Index the customers of a JSON export (e.g. ``data/exports/customers_2025-11-07.json``)."""
+        index = cls(**kwargs)
+        with open(path, encoding="utf-8") as file:
+            for customer in json.load(file):
+                index.add_customer(customer)
+                if customer.get("updatedAt"):
+                    # Stored as UTC in a timestamp column without time zone
+                    updated_at = datetime.fromisoformat(customer["updatedAt"]).astimezone(timezone.utc)
+                    updated_at = updated_at.replace(tzinfo=None)
+                    if index.synced_until is None or updated_at > index.synced_until:
+                        index.synced_until = updated_at
+        return index
+
+    def _fresh(self) -> bool:
+        return self.synced_at is not None and time.monotonic() - self.synced_at < self.max_age
+
+    async def refresh(self, database: Any, table: str = "customer") -> bool:
+        """
+        Sync unless the last sync is more recent than ``max_age``; concurrent callers share one sync.
+
+        Returns:
+            Whether it synced
+        """
+        if self._fresh():
+            return False
+        async with self._sync_lock:
+            if self._fresh():
+                return False
+            await self.sync(database, table)
+            return True
+
+    async def sync(self, database: Any, table: str = "customer") -> int:
+        """
+        Index the customers created or updated since the last sync (less ``overlap``).
+
+        Args:
+            database: ``tool_py.Database`` to read the customers from
+            table: Customers table
+
+        Returns:
+            Number of customer rows read
+        """
+        self.synced_at = time.monotonic()
+        query = f'SELECT "id", "name", "email", "phone", "address", "updatedAt" FROM "{table}"'
+        params: List[Any] = []
+        if self.synced_until is not None:
+            query += f' WHERE "updatedAt" >= {database.placeholder(1)}'
+            params.append(self.synced_until - self.overlap)
+        rows = await database.fetch(query, params)
+        for customer_id, name, email, phone, address, updated_at in rows:
+            self.add(int(customer_id), name or "", email or "", phone or "", address or "")
+            if updated_at is not None and (self.synced_until is None or updated_at > self.synced_until):
+                self.synced_until = updated_at
+        return len(rows)
@@ -0,0 +1,138 @@
+"""Choose the question that best tells apart the rows of an ambiguous lookup.
+
+When a lookup matches several rows the tool asks the user for one more field.
+The best field is the one whose answer is expected to tell the most about which
+row is meant: the entropy of its values among the matches (the information
+gained by asking for it), with the number of distinct values as a tie-break.
+
+``choose_clarifying_fields`` reads the matches as a stream of row batches
+(``Database.stream``), so the result set is never held in memory:
+
+- each batch is transposed into columns once and every column of the batch is
+  counted by one ``Counter`` (a C loop); Python code only runs once per
+  distinct value of the batch, to merge the batch counts;
+- values are dictionary-encoded: each column maps a distinct value to a code
+  and keeps the row count of every code in an ``array``, so only one copy of
+  each distinct value is kept, whatever the number of rows;
+- the entropy comes from the counts of counts (``Counter`` over the count array),
+  so scoring a column costs one pass over its distinct values in C and a Python
+  step per distinct *count*, not per row;
+- after ``min_rows`` rows it stops as soon as the ranking of the best
+  ``top`` fields has not changed for ``stable_batches`` batches, or at
+  ``max_rows``: later rows of a large result only refine the estimates. The
+  caller closes the stream, which stops the database cursor.
+"""
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from math import log2
+from typing import Any, AsyncIterator, Dict, List, Sequence, Tuple
+
+# Rows read before the ranking may be trusted, and at most
+MIN_ROWS = 256
+MAX_ROWS = 4096
+# Batches in a row with the same best fields before stopping early
+STABLE_BATCHES = 2
+
+
+@dataclass(frozen=True, slots=True)
+class ClarifyingField:
+    column: str
+    # Entropy in bits of the column's values among the rows seen
+    information_gain: float
+    distinct: int
+
+
+@dataclass(frozen=True, slots=True)
+class Disambiguation:
+    # Best question first
+    fields: List[ClarifyingField]
+    rows_seen: int
+    # Every matching row was read (``rows_seen`` is the number of matches)
+    complete: bool
+
+
+class ColumnProfile:
+    """Dictionary-encoded value counts of the columns of a stream of rows."""
+
+    def __init__(self, columns: Sequence[str], skip: Sequence[str] = ("id",)):
+        self.positions = [position for position, column in enumerate(columns) if column not in skip]
+        self.columns = [columns[position] for position in self.positions]
+        # Per column: value -> code, and the row count of every code
+        self.codes: List[Dict[Any, int]] = [{} for _ in self.positions]
+        self.counts: List[array] = [array("I") for _ in self.positions]
+        self.rows = 0
+
+    def update(self, rows: Sequence[Sequence[Any]]) -> None:
+        if not rows:
+            return
+        self.rows += len(rows)
+        transposed = list(zip(*rows))
+        for codes, counts, position in zip(self.codes, self.counts, self.positions):
+            batch = Counter(transposed[position])
+            for value, count in batch.items():
+                code = codes.get(value)
+                if code is None:
+                    codes[value] = len(counts)
+                    counts.append(count)
+                else:
+                    counts[code] += count
+
+    def ranked(self) -> List[ClarifyingField]:
+        """Columns by information gain, then distinct values (best first)."""
+        if not self.rows:
+            return []
+        total = self.rows
+        result = []
+        for column, counts in zip(self.columns, self.counts):
+            # H = log2(n) - sum(c * log2(c)) / n, grouping the values by their count
+            weighted = sum(
+                count * log2(count) * values
+                for count, values in Counter(counts).items()
+                if count > 1
+            )
+            result.append(ClarifyingField(column, log2(total) - weighted / total, len(counts)))
+        result.sort(key=lambda field: (-round(field.information_gain, 9), -field.distinct))
+        return result
+
+
+async def choose_clarifying_fields(
+    batches: AsyncIterator[Sequence[Sequence[Any]]],
+    columns: Sequence[str],
+    skip: Sequence[str] = ("id",),
+    top: int = 3,
+    min_rows: int = MIN_ROWS,
+    max_rows: int = MAX_ROWS,
+    stable_batches: int = STABLE_BATCHES,
+) -> Disambiguation:
+    """
+    Rank the fields to ask for, reading only as many rows as it takes.
+
+    Args:
+        batches: Batches of rows, each row with one value per ``columns``
+        columns: Column names of the rows
+        skip: Columns never asked for (keys, free text the user cannot tell)
+        top: Number of best fields returned
+        min_rows: Rows read before stopping early
+        max_rows: Rows read at most
+        stable_batches: Batches with an unchanged best ``top`` fields to stop after
+
+    Returns:
+        The best fields and how many rows were read
+    """
+    profile = ColumnProfile(columns, skip)
+    best: Tuple[str, ...] = ()
+    stable = 0
+    async for rows in batches:
+        profile.update(rows)
+        if profile.rows >= max_rows:
+            return Disambiguation(profile.ranked()[:top], profile.rows, complete=False)
+        if profile.rows < min_rows:
+            continue
+        ranked = profile.ranked()[:top]
+        ranking = tuple(field.column for field in ranked)
+        stable = stable + 1 if ranking == best else 0
+        best = ranking
+        if stable >= stable_batches:
+            return Disambiguation(ranked, profile.rows, complete=False)
+    return Disambiguation(profile.ranked()[:top], profile.rows, complete=True)
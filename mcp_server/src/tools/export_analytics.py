@@ -0,0 +1,494 @@
+"""Columnar store of the MCP server's JSON data exports, for offline analytics.
+
+The exports in ``mcp_server/src/data/exports`` (``customers_*.json``,
+``rm_tasks_*.json``, ``database_export_*.json``) are single JSON documents;
+``json.load`` holds the whole snapshot, nested relations included, in memory.
+``convert_exports`` streams them instead and writes the fields analytics need
+as column files:
+
+- ``JsonStream`` parses the document incrementally: it walks objects key by
+  key and decodes one array element at a time with ``json``'s C decoder over
+  a sliding buffer, skipping unused values (the other tables of a database
+  export) element by element too, so memory is one chunk plus one record;
+- every column is a file of fixed-size values (``array`` type codes: ids as
+  int32, dates as day ordinals, booleans as int8, categories as uint16 codes
+  into a dictionary kept in ``manifest.json``), written in blocks of
+  ``FLUSH_ROWS`` rows;
+- ``ExportStore`` memory-maps the column files and aggregates them
+  ``CHUNK_ROWS`` at a time with C-level iteration (``zip``, ``compress``,
+  ``Counter``), so queries touch pages, not Python objects per row. Tasks are
+  joined to their customer's category columns (``customer.segment``,
+  ``customer.state``) through an id-indexed lookup array.
+
+NumPy and Arrow are not dependencies of the MCP tools; the column files are
+plain little-endian arrays that ``numpy.memmap`` or Arrow can read as they are.
+"""
+import json
+import mmap
+import os
+import re
+import sys
+from array import array
+from collections import Counter
+from datetime import date
+from itertools import compress
+from operator import and_
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+MANIFEST = "manifest.json"
+# Rows buffered per column before writing, and aggregated per step of a query
+FLUSH_ROWS = 65536
+CHUNK_ROWS = 1 << 20
+
+# Column kind -> array type code
+TYPE_CODES = {"int": "i", "day": "i", "bool": "b", "category": "H"}
+# Columns kept per table: (field, kind)
+TABLES: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    "customers": (
+        ("id", "int"),
+        ("rmId", "int"),
+        ("segment", "category"),
+        ("state", "category"),
+        ("gender", "category"),
+        ("country", "category"),
+        ("jobTitle", "category"),
+        ("isActive", "bool"),
+        ("dob", "day"),
+    ),
+    "tasks": (
+        ("id", "int"),
+        ("rmId", "int"),
+        ("customerId", "int"),
+        ("taskType", "category"),
+        ("status", "category"),
+        ("createdAt", "day"),
+        ("dueDate", "day"),
+    ),
+}
+# Keys of the tables in ``database_export_*.json``'s ``data`` object and file name prefixes
+EXPORT_KEYS = {"customers": "customers", "tasks": "tasks"}
+FILE_PREFIXES = {"customers_": "customers", "rm_tasks_": "tasks"}
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class JsonStream:
+    """Incremental reader of one JSON document from a text file."""
+
+    def __init__(self, file: IO[str], chunk_size: int = 1 << 16):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def _read(self) -> bool:
+        if self.eof:
+            return False
+        # At least as much as is buffered, so a value longer than a chunk is retried a few times only
+        chunk = self.file.read(max(self.chunk_size, len(self.buffer) - self.position))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def peek(self) -> str:
+        """Next character that is not whitespace."""
+        while True:
+            if self.position < len(self.buffer):
+                char = self.buffer[self.position]
+                if char not in " \t\n\r":
+                    return char
+                self.position = _WHITESPACE.match(self.buffer, self.position).end()
+                if self.position < len(self.buffer):
+                    return self.buffer[self.position]
+            if not self._read():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON document, found {found!r}")
+        self.position += 1
+
+    def value(self) -> Any:
+        """Decode the next value whole."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self._read():
+                    continue
+                raise
+            # A number at the end of the buffer may go on in the next chunk
+            if end == len(self.buffer) and self._read():
+                continue
+            self.position = end
+            return value
+
+    def _separator(self, closing: str) -> bool:
+        """Consume ``,`` or ``closing``; True at ``closing``."""
+        char = self.peek()
+        self.position += 1
+        if char == closing:
+            return True
+        if char != ",":
+            raise ValueError(f"Expected ',' or {closing!r} in JSON document, found {char!r}")
+        return False
+
+    def members(self) -> Iterator[str]:
+        """Keys of the next object; read or ``skip`` each value before the next key."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.position += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self._separator("}"):
+                return
+
+    def elements(self) -> Iterator[Any]:
+        """Elements of the next array, decoded one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.position += 1
+            return
+        while True:
+            yield self.value()
+            if self._separator("]"):
+                return
+
+    def skip(self) -> None:
+        """Pass the next value; arrays are decoded an element at a time."""
+        if self.peek() == "[":
+            for _ in self.elements():
+                pass
+        else:
+            self.value()
+
+
+def _day(value: Any) -> int:
+    # ISO dates and timestamps ("2025-11-05T01:41:06.674Z") -> day ordinal, 0 when missing
+    return date.fromisoformat(value[:10]).toordinal() if value else 0
+
+
+class _TableWriter:
+    """Column files of one table, written a block of rows at a time."""
+
+    def __init__(self, directory: str, table: str, flush_rows: int = FLUSH_ROWS):
+        self.directory = os.path.join(directory, table)
+        os.makedirs(self.directory, exist_ok=True)
+        self.columns = TABLES[table]
+        self.flush_rows = flush_rows
+        self.files = [open(os.path.join(self.directory, f"{name}.bin"), "wb") for name, _ in self.columns]
+        self.blocks = [array(TYPE_CODES[kind]) for _, kind in self.columns]
+        self.dictionaries: Dict[str, Dict[Any, int]] = {
+            name: {} for name, kind in self.columns if kind == "category"
+        }
+        self.rows = 0
+
+    def append(self, record: Dict[str, Any]) -> None:
+        for (name, kind), block in zip(self.columns, self.blocks):
+            value = record.get(name)
+            if kind == "category":
+                codes = self.dictionaries[name]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+                    if code > 0xFFFF:
+                        raise ValueError(f"Too many distinct values in column {name!r}")
+                block.append(code)
+            elif kind == "day":
+                block.append(_day(value))
+            elif kind == "bool":
+                block.append(-1 if value is None else int(bool(value)))
+            else:
+                block.append(int(value or 0))
+        self.rows += 1
+        if self.rows % self.flush_rows == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        for file, block in zip(self.files, self.blocks):
+            if sys.byteorder != "little":
+                block.byteswap()
+            block.tofile(file)
+            del block[:]
+
+    def close(self) -> Dict[str, Any]:
+        """Write the remaining rows; returns the table's manifest entry."""
+        self.flush()
+        for file in self.files:
+            file.close()
+        return {
+            "rows": self.rows,
+            "columns": {
+                name: {"kind": kind, **({"dictionary": list(self.dictionaries[name])} if kind == "category" else {})}
+                for name, kind in self.columns
+            },
+        }
+
+
+def _export_tables(stream: JsonStream, path: str) -> Iterator[Tuple[str, Iterator[Dict[str, Any]]]]:
+    """Tables of an export file and their records, in file order."""
+    if stream.peek() == "[":
+        name = os.path.basename(path)
+        for prefix, table in FILE_PREFIXES.items():
+            if name.startswith(prefix):
+                yield table, stream.elements()
+                return
+        raise ValueError(f"Unknown export file {name!r}")
+    # database_export_*.json: {"exportDate": ..., "statistics": ..., "data": {"customers": [...], ...}}
+    tables = {key: table for table, key in EXPORT_KEYS.items()}
+    for key in stream.members():
+        if key != "data":
+            stream.skip()
+            continue
+        for table_key in stream.members():
+            if table_key in tables:
+                yield tables[table_key], stream.elements()
+            else:
+                stream.skip()
+
+
+def convert_exports(paths: Sequence[str], directory: str, flush_rows: int = FLUSH_ROWS) -> "ExportStore":
+    """
+    Stream JSON exports into a columnar store.
+
+    Args:
+        paths: Export files (``customers_*.json``, ``rm_tasks_*.json`` or ``database_export_*.json``);
+            give each table once
+        directory: Store directory, created or overwritten
+        flush_rows: Rows buffered per column before writing
+
+    Returns:
+        The store
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest: Dict[str, Any] = {"sources": [os.path.basename(path) for path in paths], "tables": {}}
+    for path in paths:
+        with open(path, encoding="utf-8") as file:
+            stream = JsonStream(file)
+            for table, records in _export_tables(stream, path):
+                if table in manifest["tables"]:
+                    raise ValueError(f"Table {table!r} is in more than one export file")
+                writer = _TableWriter(directory, table, flush_rows)
+                try:
+                    for record in records:
+                        writer.append(record)
+                finally:
+                    manifest["tables"][table] = writer.close()
+    with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as file:
+        json.dump(manifest, file, ensure_ascii=False, indent=2)
+    return ExportStore(directory)
+
+
+class ExportStore:
+    """Memory-mapped columns of converted exports, with aggregation queries."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as file:
+            self.manifest = json.load(file)
+        self._maps: Dict[Tuple[str, str], Any] = {}
+        self._lookups: Dict[str, array] = {}
+
+    def rows(self, table: str) -> int:
+        return self.manifest["tables"][table]["rows"] if table in self.manifest["tables"] else 0
+
+    def _column_info(self, table: str, name: str) -> Dict[str, Any]:
+        try:
+            return self.manifest["tables"][table]["columns"][name]
+        except KeyError:
+            raise ValueError(f"Unknown column {table}.{name}") from None
+
+    def _load(self, table: str, name: str) -> Tuple[Any, str]:
+        """A column file's memory map (an array when it cannot be mapped) and its type code."""
+        type_code = TYPE_CODES[self._column_info(table, name)["kind"]]
+        if (table, name) not in self._maps:
+            path = os.path.join(self.directory, table, f"{name}.bin")
+            if sys.byteorder != "little" or not os.path.getsize(path):
+                values = array(type_code)
+                with open(path, "rb") as file:
+                    values.frombytes(file.read())
+                if sys.byteorder != "little":
+                    values.byteswap()
+                self._maps[(table, name)] = values
+            else:
+                with open(path, "rb") as file:
+                    self._maps[(table, name)] = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._maps[(table, name)], type_code
+
+    def _view(self, table: str, name: str) -> Sequence[int]:
+        """Raw values of a column, memory-mapped; only held while a query runs (see ``close``)."""
+        data, type_code = self._load(table, name)
+        return data if isinstance(data, array) else memoryview(data).cast(type_code)
+
+    def column(self, table: str, name: str) -> array:
+        """Raw values of a column (category codes, day ordinals), copied out of the memory map."""
+        data, type_code = self._load(table, name)
+        values = array(type_code)
+        values.frombytes(data)
+        return values
+
+    def _customer_lookup(self, name: str) -> array:
+        """Code of the customers' category column ``name``, indexed by customer id."""
+        if name not in self._lookups:
+            dictionary = self._column_info("customers", name)["dictionary"]
+            ids = self._view("customers", "id")
+            task_customers = self._view("tasks", "customerId") if self.rows("tasks") else ()
+            size = max(max(ids, default=0), max(task_customers, default=0)) + 1
+            # Customers missing from the export get the code after the dictionary (None)
+            lookup = array("H", [len(dictionary)]) * size
+            for customer_id, code in zip(ids, self._view("customers", name)):
+                lookup[customer_id] = code
+            self._lookups[name] = lookup
+        return self._lookups[name]
+
+    def _source(self, table: str, name: str) -> Tuple[Callable[[int, int], Iterable[int]], Dict[str, Any]]:
+        """Values of a column (or a task's ``customer.<column>``) per row range, and the column's info."""
+        if table == "tasks" and name.startswith("customer."):
+            column = name[len("customer."):]
+            info = self._column_info("customers", column)
+            if info["kind"] != "category":
+                raise ValueError(f"Only category columns of customers can be joined, not {column!r}")
+            lookup = self._customer_lookup(column)
+            customers = self._view("tasks", "customerId")
+            return lambda start, end: map(lookup.__getitem__, customers[start:end]), info
+        values = self._view(table, name)
+        return lambda start, end: values[start:end], self._column_info(table, name)
+
+    @staticmethod
+    def _predicate(name: str, info: Dict[str, Any], condition: Any) -> Optional[Callable[[int], bool]]:
+        """Test of a column's raw values; None when no row can match."""
+        kind = info["kind"]
+        if kind == "day":
+            first, last = condition
+            first = 1 if first is None else first.toordinal()
+            last = date.max.toordinal() if last is None else last.toordinal()
+            return range(first, last + 1).__contains__
+        if kind == "category":
+            try:
+                return info["dictionary"].index(condition).__eq__
+            except ValueError:
+                return None
+        if kind == "bool":
+            return (-1 if condition is None else int(bool(condition))).__eq__
+        return int(condition).__eq__
+
+    @staticmethod
+    def _decoder(info: Dict[str, Any]) -> Callable[[int], Any]:
+        kind = info["kind"]
+        if kind == "category":
+            dictionary = info["dictionary"] + [None]
+            return dictionary.__getitem__
+        if kind == "day":
+            return lambda day: date.fromordinal(day) if day else None
+        if kind == "bool":
+            return lambda value: None if value < 0 else bool(value)
+        return int
+
+    def count(
+        self,
+        table: str,
+        by: Sequence[str],
+        where: Optional[Dict[str, Any]] = None,
+        chunk_rows: int = CHUNK_ROWS,
+    ) -> Dict[Any, int]:
+        """
+        Rows per value of the ``by`` columns, like ``GROUP BY ... ORDER BY count DESC``.
+
+        Args:
+            table: ``customers`` or ``tasks``
+            by: Columns to group by; tasks may use their customer's category columns as ``customer.<column>``
+            where: Column -> value rows must have; for date columns, a ``(first, last)`` pair of
+                dates (inclusive, None: unbounded)
+            chunk_rows: Rows aggregated per step
+
+        Returns:
+            Count per value (per tuple of values with several ``by`` columns), largest first
+        """
+        sources = [self._source(table, name) for name in by]
+        filters = []
+        for name, condition in (where or {}).items():
+            source, info = self._source(table, name)
+            predicate = self._predicate(name, info, condition)
+            if predicate is None:
+                return {}
+            filters.append((source, predicate))
+
+        counts: Counter = Counter()
+        rows = self.rows(table)
+        for start in range(0, rows, chunk_rows):
+            end = min(start + chunk_rows, rows)
+            keys = sources[0][0](start, end) if len(sources) == 1 else zip(*(source(start, end) for source, _ in sources))
+            if filters:
+                masks = [map(predicate, source(start, end)) for source, predicate in filters]
+                mask = masks[0]
+                for other in masks[1:]:
+                    mask = map(and_, mask, other)
+                keys = compress(keys, mask)
+            counts.update(keys)
+
+        decoders = [self._decoder(info) for _, info in sources]
+        if len(decoders) == 1:
+            decode = decoders[0]
+            return {decode(key): count for key, count in counts.most_common()}
+        return {
+            tuple(decoder(value) for decoder, value in zip(decoders, key)): count
+            for key, count in counts.most_common()
+        }
+
+    def customers_by_segment(self, state: Optional[str] = None, active: Optional[bool] = None) -> Dict[str, int]:
+        """Customers per segment, optionally of one state and active or not."""
+        where: Dict[str, Any] = {}
+        if state is not None:
+            where["state"] = state
+        if active is not None:
+            where["isActive"] = active
+        return self.count("customers", ["segment"], where)
+
+    def customers_by_state(self, segment: Optional[str] = None) -> Dict[str, int]:
+        """Customers per state, optionally of one segment."""
+        return self.count("customers", ["state"], {"segment": segment} if segment is not None else None)
+
+    def tasks_by_status(
+        self,
+        rm_id: Optional[int] = None,
+        segment: Optional[str] = None,
+        state: Optional[str] = None,
+        created_from: Optional[date] = None,
+        created_to: Optional[date] = None,
+    ) -> Dict[str, int]:
+        """Tasks per status, optionally of one RM, customer segment or state and creation period."""
+        where: Dict[str, Any] = {}
+        if rm_id is not None:
+            where["rmId"] = rm_id
+        if segment is not None:
+            where["customer.segment"] = segment
+        if state is not None:
+            where["customer.state"] = state
+        if created_from is not None or created_to is not None:
+            where["createdAt"] = (created_from, created_to)
+        return self.count("tasks", ["status"], where)
+
+    def close(self) -> None:
+        """Unmap the column files.
+
+        A map still viewed (a query running in another thread) cannot be closed
+        now; it is unmapped once its last view is released.
+        """
+        for data in self._maps.values():
+            if isinstance(data, mmap.mmap):
+                try:
+                    data.close()
+                except BufferError:
+                    pass
+        self._maps = {}
+        self._lookups = {}
@@ -0,0 +1,237 @@
+"""In-memory daily task counts per RM and status, for ``report_performance``.
+
+``report_performance`` used to ``GROUP BY status`` every task of the RM on each
+call; ``fact_rm_task`` has no index on ``rmId``, so that is a scan of the whole
+table. ``TaskRollup`` keeps, per RM and status, the number of tasks created on
+each day:
+
+- each (RM, status) series is two parallel arrays, the days with tasks
+  (sorted ordinals) and their counts, plus prefix sums of the counts; a date
+  range is two bisections and a subtraction, O(log days);
+- ``record`` of a new or updated task moves one count from its old (RM, day,
+  status) to the new one; the prefix sums are rebuilt lazily, from the first
+  changed day, on the next report (new tasks land on the last day, so that is
+  usually a step or two);
+- the RM, day and status of every task are kept in arrays indexed by task id
+  (PostgreSQL serial ids, dense from 1) to know what an update replaces.
+
+Tasks are written by the MCP server, so nothing here sees the writes:
+``sync`` records the tasks created or updated in the database since the last
+sync, and ``refresh`` (called by report_performance) syncs once the counts are
+older than ``max_age`` seconds. Each sync reads again an ``overlap`` before the
+newest ``updatedAt`` it saw, for rows with that same timestamp and rows
+committed late with an older one; ``record`` of an unchanged task is a no-op.
+Syncs are cheap with an index on ``updatedAt``.
+
+The first sync reads the whole table (minutes at ten million tasks), so it
+does not run inline: until it completes (``ready``) report_performance counts
+in SQL and ``warm_up`` runs it in the background. A host can also sync before
+configuring the rollup.
+
+Deletions are not detected: a deleted row leaves no ``updatedAt`` to read. The
+agent never deletes tasks, but the MCP server's ``DELETE /tasks/:id`` hard
+delete does; whoever calls it must ``remove`` the task, or the RM's counts
+keep it until the rollup is built again.
+"""
+import asyncio
+import logging
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from itertools import accumulate, islice
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class _DailyCounts:
+    """Task counts of one RM and status per creation day, with prefix sums."""
+
+    __slots__ = ("days", "counts", "prefix", "valid")
+
+    def __init__(self) -> None:
+        self.days = array("i")
+        self.counts = array("q")
+        # prefix[i] = sum(counts[:i]), correct up to prefix[valid]
+        self.prefix = array("q", [0])
+        self.valid = 0
+
+    def add(self, day: int, delta: int) -> None:
+        position = bisect_left(self.days, day)
+        if position < len(self.days) and self.days[position] == day:
+            self.counts[position] += delta
+        else:
+            self.days.insert(position, day)
+            self.counts.insert(position, delta)
+        self.valid = min(self.valid, position)
+
+    def total(self, first: Optional[int], last: Optional[int]) -> int:
+        """Tasks created from day ``first`` to day ``last`` (inclusive; None: unbounded)."""
+        if self.valid < len(self.days):
+            del self.prefix[self.valid + 1:]
+            self.prefix.extend(islice(accumulate(self.counts[self.valid:], initial=self.prefix[self.valid]), 1, None))
+            self.valid = len(self.days)
+        start = 0 if first is None else bisect_left(self.days, first)
+        end = len(self.days) if last is None else bisect_right(self.days, last)
+        return self.prefix[end] - self.prefix[start] if end > start else 0
+
+
+class TaskRollup:
+    """Daily task counts per RM and status, kept current task by task."""
+
+    def __init__(self, overlap: timedelta = timedelta(minutes=5), max_age: float = 10) -> None:
+        """
+        Args:
+            overlap: How far before the newest ``updatedAt`` seen each sync reads again
+            max_age: Seconds ``refresh`` serves the counts for before it syncs again
+        """
+        self.overlap = overlap
+        self.max_age = max_age
+        self.statuses: List[str] = []
+        self._status_codes: Dict[str, int] = {}
+        self._series: Dict[Tuple[int, int], _DailyCounts] = {}
+        # Per task id: RM, creation day and status code + 1 (0: not recorded)
+        self._task_rm = array("i")
+        self._task_day = array("i")
+        self._task_status = array("B")
+        self.tasks = 0
+        self.synced_until: Optional[Any] = None
+        # time.monotonic() when the last sync started
+        self.synced_at: Optional[float] = None
+        # A sync read the whole table
+        self.ready = False
+        self._sync_lock = asyncio.Lock()
+        self._warm_up: Optional["asyncio.Task[None]"] = None
+
+    def _move(self, rm_id: int, day: int, status: int, delta: int) -> None:
+        series = self._series.get((rm_id, status))
+        if series is None:
+            series = self._series[(rm_id, status)] = _DailyCounts()
+        series.add(day, delta)
+
+    def record(self, task_id: int, rm_id: int, created_at: date, status: str) -> None:
+        """Count a created task, or move an updated one to its new RM, day and status."""
+        code = self._status_codes.get(status)
+        if code is None:
+            code = self._status_codes[status] = len(self.statuses)
+            self.statuses.append(status)
+        day = created_at.toordinal()
+        if task_id >= len(self._task_status):
+            grow = task_id + 1 - len(self._task_status)
+            self._task_rm.extend(array("i", bytes(4 * grow)))
+            self._task_day.extend(array("i", bytes(4 * grow)))
+            self._task_status.extend(bytes(grow))
+        old = self._task_status[task_id]
+        if old:
+            if (self._task_rm[task_id], self._task_day[task_id], old - 1) == (rm_id, day, code):
+                return
+            self._move(self._task_rm[task_id], self._task_day[task_id], old - 1, -1)
+        else:
+            self.tasks += 1
+        self._move(rm_id, day, code, 1)
+        self._task_rm[task_id] = rm_id
+        self._task_day[task_id] = day
+        self._task_status[task_id] = code + 1
+
+    def remove(self, task_id: int) -> bool:
+        """Stop counting a deleted task."""
+        if task_id >= len(self._task_status) or not self._task_status[task_id]:
+            return False
+        self._move(self._task_rm[task_id], self._task_day[task_id], self._task_status[task_id] - 1, -1)
+        self._task_status[task_id] = 0
+        self.tasks -= 1
+        return True
+
+    def counts(
+        self, rm_id: int, created_from: Optional[date] = None, created_to: Optional[date] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Task counts of an RM per status, like ``GROUP BY status``.
+
+        Args:
+            rm_id: RM whose tasks are counted
+            created_from: First creation day counted (None: from the first task)
+            created_to: Last creation day counted, inclusive (None: up to the last task)
+
+        Returns:
+            (status, task count) pairs with tasks, most tasks first
+        """
+        first = None if created_from is None else created_from.toordinal()
+        last = None if created_to is None else created_to.toordinal()
+        result = []
+        for code, status in enumerate(self.statuses):
+            series = self._series.get((rm_id, code))
+            if series is not None:
+                total = series.total(first, last)
+                if total:
+                    result.append((status, total))
+        result.sort(key=lambda count: (-count[1], count[0]))
+        return result
+
+    def _fresh(self) -> bool:
+        return self.synced_at is not None and time.monotonic() - self.synced_at < self.max_age
+
+    async def refresh(self, database: Any, table: str = "fact_rm_task") -> bool:
+        """
+        Sync unless the last sync is more recent than ``max_age``; concurrent callers share one sync.
+
+        Returns:
+            Whether it synced
+        """
+        if self._fresh():
+            return False
+        async with self._sync_lock:
+            if self._fresh():
+                return False
+            await self.sync(database, table)
+            return True
+
+    def warm_up(self, database: Any, table: str = "fact_rm_task") -> "asyncio.Task[None]":
+        """Run the first sync in a background task, unless one is running; a failed one is retried."""
+        task = self._warm_up
+        if task is None or (task.done() and not self.ready) or task.get_loop() is not asyncio.get_running_loop():
+            task = self._warm_up = asyncio.create_task(self._warm(database, table))
+        return task
+
+    async def _warm(self, database: Any, table: str) -> None:
+        start = time.monotonic()
+        try:
+            await self.refresh(database, table)
+        except Exception as e:
+            # Retried by the next warm_up
+            self.synced_at = None
+            logger.warning("Task rollup sync failed: %s", e)
+            return
+        logger.info("Task rollup loaded %d tasks in %.1f s", self.tasks, time.monotonic() - start)
+
+    async def sync(self, database: Any, table: str = "fact_rm_task") -> int:
+        """
+        Record the tasks created or updated since the last sync (less ``overlap``).
+
+        Args:
+            database: ``tool_py.Database`` to read the tasks from
+            table: Tasks table
+
+        Returns:
+            Number of task rows read
+        """
+        self.synced_at = time.monotonic()
+        query = f'SELECT "id", "rmId", "createdAt", "status", "updatedAt" FROM "{table}"'
+        params: List[Any] = []
+        if self.synced_until is not None:
+            query += f' WHERE "updatedAt" >= {database.placeholder(1)}'
+            params.append(self.synced_until - self.overlap)
+        recorded = 0
+        # Only moved on once every row was read: a failed sync is read again whole
+        synced_until = self.synced_until
+        # Streamed: the first sync reads the whole table
+        async for rows in database.stream(query, params, batch_size=10000):
+            for task_id, rm_id, created_at, status, updated_at in rows:
+                self.record(int(task_id), int(rm_id), created_at, status)
+                if updated_at is not None and (synced_until is None or updated_at > synced_until):
+                    synced_until = updated_at
+            recorded += len(rows)
+        self.synced_until = synced_until
+        self.ready = True
+        return recorded
@@ -1,165 +1,744 @@
-# class FindCustomerInput(BaseModel):
-#     """Finds a single customer based on the provided criteria.
+"""Python versions of the MCP read tools, on a pooled async SQL driver.
 
-#     This function searches for a customer matching one or more of the specified attributes. It is designed to find exactly one matching customer to ensure precision for subsequent actions.
-#     """
-    
-#     customerName: Optional[str] = Field(
-#         default=None,
-#         description="The customer's full name or partial name to search for",
-#         examples=["Võ Thành Kiên", "Đinh Công Thắng"]
-#     )
-#     customerGender: Optional[Literal["OTHER", "MALE", "FEMALE"]] = Field(
-#         default=None,
-#         description="The customer's gender"
-#     )
-#     customerEmail: Optional[str] = Field(
-#         default=None,
-#         description="The customer's email address",
-#         examples=["vo.thanh.kien576@outlook.com", "dinh.cong.thang@gmail.com"]
-#     )
-#     customerPhone: Optional[str] = Field(
-#         default=None,
-#         description="The customer's phone number in Vietnam (starts with +84)",
-#         examples=["+840369016128", "+840909090909"]
-#     )
-#     customerAddress: Optional[str] = Field(
-#         default=None,
-#         description="The customer's address including building number, street name, ward, and district.",
-#         examples=["351 Điện Biên Phủ, Ô Môn", "123 Nguyễn Văn Cừ, Quận 5"]
-#     )
-#     customerState: Optional[str] = Field(
-#         default=None,
-#         description="The customer's state or province in Vietnam.",
-#         examples=["Hồ Chí Minh", "Hà Nội"]
-#     )
-#     customerJobTitle: Optional[str] = Field(
-#         default=None,
-#         description="The customer's job title or profession (in Vietnamese)",
-#         examples=["Giáo viên", "Kỹ sư"]
-#     )
-#     customerSegment: Optional[Literal[
-#         "DIAMOND_ELITE",
-#         "DIAMOND",
-#         "PRE_DIAMOND",
-#         "CHAMPION_PRIME",
-#         "RISING_PRIME",
-#         "UPPERMEGA_PRIME",
-#         "MEGA_PRIME"
-#     ]] = Field(
-#         default=None,
-#         description="The customer's segment classification"
-#     )
+The tools build their WHERE clauses from placeholders only; user input is
+always passed as a statement parameter, never formatted into the SQL. Each
+pooled connection keeps its prepared statements (asyncpg's statement cache,
+sqlite3's statement cache), and rows come back as typed dataclasses instead of
+a printed result string that has to be ``eval``-ed.
 
+Backends:
 
-# @tool(parse_docstring=True, args_schema=FindCustomerInput)
-# def find_customer(
-#     customerName: str | None = None,
-#     customerGender: Literal["OTHER", "MALE", "FEMALE"] | None = None,
-#     customerEmail: str | None = None,
-#     customerPhone: str | None = None,
-#     customerAddress: str | None = None,
-#     customerJobTitle: str = None,
-#     customerSegment: Literal[
-#         "DIAMOND_ELITE",
-#         "DIAMOND",
-#         "PRE_DIAMOND",
-#         "CHAMPION_PRIME",
-#         "RISING_PRIME",
-#         "UPPERMEGA_PRIME",
-#         "MEGA_PRIME",
-#     ]
-#     | None = None,
-#     customerState: str | None = None,
-#     config: RunnableConfig | None = None
-# ):
-#     # Build WHERE conditions based on provided parameters
-#     conditions = []
-#     if customerName:
-#         conditions.append(f"name LIKE '%{customerName}%'")
-#     if customerGender:
-#         conditions.append(f"gender LIKE '%{customerGender}%'")
-#     if customerEmail:
-#         conditions.append(f"email LIKE '%{customerEmail}%'")
-#     if customerPhone:
-#         conditions.append(f"phone LIKE '%{customerPhone}%'")
-#     if customerAddress:
-#         conditions.append(f"address LIKE '%{customerAddress}%'")
-#     if customerJobTitle:
-#         conditions.append(f"jobTitle LIKE '%{customerJobTitle}%'")
-#     if customerSegment:
-#         conditions.append(f"segment LIKE '%{customerSegment}%'")
-#     if customerState:
-#         conditions.append(f"state LIKE '%{customerState}%'")
-    
-#     # If no conditions provided, return empty result
-#     if not conditions:
-#         return {
-#             "customer_info": {},
-#             "message": "No search criteria provided. Please provide at least one information (name, email, phone, address, job title, segment, state) to search for a customer."
-#         }
+- ``PostgresDatabase``: asyncpg connection pool (``$1`` placeholders), for the
+  MCP server's PostgreSQL database (tables ``customer`` and ``fact_rm_task``);
+- ``SQLiteDatabase``: a small pool of aiosqlite connections (``?``
+  placeholders), a local stand-in with the same tables for tests and benchmarks.
+
+Configure the tools' database once with ``configure_database``; by default it
+is created from the ``POSTGRES_*`` environment variables of the MCP server.
+With a customer index set by ``configure_customer_index``, find_customer
+looks up names, emails, phones and addresses in the index instead of scanning
+with ``LIKE``. Customers are written by the MCP server, not here, so the index
+may be behind: its matches are re-read by id and re-indexed before they are
+trusted, and when it has no exact match it is synced (``updatedAt`` since its
+last sync, at most every ``max_age`` seconds) and searched again. When several customers match,
+it streams them (``Database.stream``) through ``disambiguation`` to choose the
+field to ask back for, without loading the whole result. With a task rollup
+set by ``configure_task_rollup``, report_performance reads the RM's daily task
+counts from it instead of counting the tasks in SQL, syncing the rollup first
+when its counts are older than its ``max_age``; until its first (whole table)
+sync completes in the background, it counts in SQL.
+"""
+import asyncio
+import os
+from abc import ABC, abstractmethod
+import sqlite3
+from contextlib import aclosing
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Sequence, Tuple, Type, TypeVar
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+from pydantic import BaseModel, Field
+
+try:
+    from .customer_index import CustomerSearchIndex
+    from .disambiguation import choose_clarifying_fields
+    from .task_rollup import TaskRollup
+except ImportError:
+    from customer_index import CustomerSearchIndex
+    from disambiguation import choose_clarifying_fields
+    from task_rollup import TaskRollup
+
+CUSTOMER_TABLE = "customer"
+TASK_TABLE = "fact_rm_task"
+
+# Enum names the tools accept -> values stored by the MCP server
+GENDER_VALUES = {"MALE": "male", "FEMALE": "female", "OTHER": "other"}
+SEGMENT_VALUES = {
+    "DIAMOND_ELITE": "Diamond Elite",
+    "DIAMOND": "Diamond",
+    "PRE_DIAMOND": "Pre-Diamond",
+    "CHAMPION_PRIME": "Champion Prime",
+    "RISING_PRIME": "Rising Prime",
+    "UPPERMEGA_PRIME": "Uppermega Prime",
+    "MEGA_PRIME": "Mega Prime",
+}
+TASK_TYPES = ("CALL", "EMAIL", "MEETING", "FOLLOW_UP", "SEND_INFO_PACKAGE")
+TASK_STATUSES = ("PENDING", "COMPLETED", "CANCELLED", "IN_PROGRESS")
+
+# Rows per batch of ``Database.stream``
+STREAM_BATCH_ROWS = 256
+
+Row = TypeVar("Row")
+
+
+def quote(column: str) -> str:
+    """Quote a (camelCase) column name; PostgreSQL folds unquoted names to lowercase."""
+    return '"' + column.replace('"', '""') + '"'
+
+
+def like_pattern(text: str) -> str:
+    """Substring LIKE pattern matching ``text`` literally (``%`` and ``_`` escaped)."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class Database(ABC):
+    """Pooled async SQL connection running parameterized queries."""
+
+    @abstractmethod
+    def placeholder(self, index: int) -> str:
+        """Placeholder of the ``index``-th (1-based) statement parameter."""
+
+    @abstractmethod
+    async def fetch(self, query: str, params: Sequence[Any] = ()) -> List[Sequence[Any]]:
+        """Run a query and return its rows as sequences of column values."""
+
+    async def fetch_as(self, row_type: Type[Row], query: str, params: Sequence[Any] = ()) -> List[Row]:
+        """Run a query selecting ``row_type``'s fields, in order, and return typed rows."""
+        return [row_type(*record) for record in await self.fetch(query, params)]
+
+    async def stream(
+        self, query: str, params: Sequence[Any] = (), batch_size: int = STREAM_BATCH_ROWS
+    ) -> AsyncIterator[List[Sequence[Any]]]:
+        """Run a query and yield its rows in batches of at most ``batch_size``.
+
+        Backends read the rows from a server-side cursor; close the iterator
+        (``contextlib.aclosing``) to stop reading early.
+        """
+        rows = await self.fetch(query, params)
+        for start in range(0, len(rows), batch_size):
+            yield rows[start:start + batch_size]
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Close every pooled connection."""
+
+
+class PostgresDatabase(Database):
+    """asyncpg connection pool; statements are prepared once per connection and cached."""
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        min_size: int = 1,
+        max_size: int = 10,
+        statement_cache_size: int = 100,
+        **connect_kwargs: Any,
+    ):
+        """
+        Args:
+            dsn: Connection URI; special characters of its parts must be percent-encoded
+            min_size: Connections opened up front
+            max_size: Connections open at most
+            statement_cache_size: Prepared statements cached per connection
+            connect_kwargs: Connection parameters passed as they are (``user``,
+                ``password``, ``host``, ``port``, ``database``, ...); they override the DSN
+        """
+        self.dsn = dsn
+        self.connect_kwargs = connect_kwargs
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self._pool: Any = None
+        self._lock = asyncio.Lock()
+
+    def placeholder(self, index: int) -> str:
+        return f"${index}"
+
+    async def _get_pool(self) -> Any:
+        if self._pool is None:
+            async with self._lock:
+                if self._pool is None:
+                    # Optional dependency, only needed with a PostgreSQL database
+                    import asyncpg  # type: ignore
+
+                    self._pool = await asyncpg.create_pool(
+                        self.dsn,
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        statement_cache_size=self.statement_cache_size,
+                        **self.connect_kwargs,
+                    )
+        return self._pool
+
+    async def fetch(self, query: str, params: Sequence[Any] = ()) -> List[Sequence[Any]]:
+        pool = await self._get_pool()
+        async with pool.acquire() as connection:
+            return await connection.fetch(query, *params)
+
+    async def stream(
+        self, query: str, params: Sequence[Any] = (), batch_size: int = STREAM_BATCH_ROWS
+    ) -> AsyncIterator[List[Sequence[Any]]]:
+        pool = await self._get_pool()
+        async with pool.acquire() as connection:
+            # asyncpg cursors only live inside a transaction
+            async with connection.transaction():
+                cursor = await connection.cursor(query, *params)
+                while rows := await cursor.fetch(batch_size):
+                    yield rows
+
+    async def close(self) -> None:
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+
+def _sqlite_param(value: Any) -> Any:
+    # Stored the way the stand-in tables hold them, so text comparison orders correctly
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class SQLiteDatabase(Database):
+    """Pool of aiosqlite connections to a local SQLite stand-in database.
+
+    DATE, TIMESTAMP and BOOLEAN columns are returned as ``date`` / ``datetime`` /
+    ``bool``, like asyncpg does.
+    """
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.path = path
+        self.pool_size = pool_size
+        self._connections: "asyncio.Queue[Any]" = asyncio.Queue()
+        self._opened: List[Any] = []
+        self._lock = asyncio.Lock()
+
+    def placeholder(self, index: int) -> str:
+        return "?"
+
+    async def _open(self) -> None:
+        import aiosqlite
+
+        sqlite3.register_converter("DATE", lambda value: date.fromisoformat(value.decode()))
+        sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+        sqlite3.register_converter("BOOLEAN", lambda value: value not in (b"0", b""))
+        for _ in range(self.pool_size):
+            connection = await aiosqlite.connect(self.path, detect_types=sqlite3.PARSE_DECLTYPES)
+            self._opened.append(connection)
+            self._connections.put_nowait(connection)
+
+    async def _acquire(self) -> Any:
+        if not self._opened:
+            async with self._lock:
+                if not self._opened:
+                    await self._open()
+        return await self._connections.get()
+
+    async def fetch(self, query: str, params: Sequence[Any] = ()) -> List[Sequence[Any]]:
+        connection = await self._acquire()
+        try:
+            async with connection.execute(query, [_sqlite_param(value) for value in params]) as cursor:
+                return list(await cursor.fetchall())
+        finally:
+            self._connections.put_nowait(connection)
+
+    async def stream(
+        self, query: str, params: Sequence[Any] = (), batch_size: int = STREAM_BATCH_ROWS
+    ) -> AsyncIterator[List[Sequence[Any]]]:
+        connection = await self._acquire()
+        try:
+            async with connection.execute(query, [_sqlite_param(value) for value in params]) as cursor:
+                while rows := await cursor.fetchmany(batch_size):
+                    yield list(rows)
+        finally:
+            self._connections.put_nowait(connection)
+
+    async def close(self) -> None:
+        for connection in self._opened:
+            await connection.close()
+        self._opened = []
+        self._connections = asyncio.Queue()
+
+
+def database_from_env() -> Database:
+    """PostgreSQL pool for the MCP server's database (``POSTGRES_*`` variables)."""
+    # Passed as parameters rather than a DSN, so a password with "@", "/" or ":" needs no escaping
+    return PostgresDatabase(
+        user=os.getenv("POSTGRES_USERNAME", "postgres"),
+        password=os.getenv("POSTGRES_PASSWORD", "postgres"),
+        host=os.getenv("POSTGRES_HOST", "localhost"),
+        port=int(os.getenv("POSTGRES_PORT", "5432")),
+        database=os.getenv("POSTGRES_NAME", "postgres"),
+        max_size=int(os.getenv("POSTGRES_POOL_SIZE", "10")),
+    )
+
+
+DATABASE: Optional[Database] = None
+
+
+def configure_database(database: Database) -> None:
+    """Set the database the tools query."""
+    global DATABASE
+    DATABASE = database
+
+
+def get_database() -> Database:
+    global DATABASE
+    if DATABASE is None:
+        DATABASE = database_from_env()
+    return DATABASE
+
+
+CUSTOMER_INDEX: Optional[CustomerSearchIndex] = None
+# Index matches find_customer reads from the database at most
+CUSTOMER_INDEX_CANDIDATES = 50
+
+
+def configure_customer_index(index: Optional[CustomerSearchIndex]) -> None:
+    """Set the index find_customer searches text criteria in (None: ``LIKE`` scans).
+
+    Build it with ``CustomerSearchIndex.sync`` (or ``from_json`` of a recent
+    export) before setting it; find_customer then keeps it current itself.
+    """
+    global CUSTOMER_INDEX
+    CUSTOMER_INDEX = index
+
+
+TASK_ROLLUP: Optional[TaskRollup] = None
+
+
+def configure_task_rollup(rollup: Optional[TaskRollup]) -> None:
+    """Set the daily task counts report_performance reads (None: ``GROUP BY`` queries).
+
+    An unsynced rollup is loaded in the background on first use; await its
+    ``sync`` before setting it to load it at startup instead.
+    """
+    global TASK_ROLLUP
+    TASK_ROLLUP = rollup
+
+
+class Conditions:
+    """WHERE clause built from parameterized conditions."""
+
+    def __init__(self, database: Database):
+        self.database = database
+        self.clauses: List[str] = []
+        self.params: List[Any] = []
+        # Columns filtered on, to tell the user which criterion to make more precise
+        self.columns: List[str] = []
+
+    def add(self, column: str, operator: str, value: Any) -> None:
+        self.params.append(value)
+        self.clauses.append(f"{quote(column)} {operator} {self.database.placeholder(len(self.params))}")
+        self.columns.append(column)
+
+    def add_in(self, column: str, values: Sequence[Any]) -> None:
+        placeholders = []
+        for value in values:
+            self.params.append(value)
+            placeholders.append(self.database.placeholder(len(self.params)))
+        self.clauses.append(f"{quote(column)} IN ({', '.join(placeholders)})")
+        self.columns.append(column)
+
+    def contains(self, column: str, text: str) -> None:
+        """Case-sensitive substring match, like the original ``LIKE '%text%'`` filters."""
+        self.params.append(like_pattern(text))
+        self.clauses.append(
+            f"{quote(column)} LIKE {self.database.placeholder(len(self.params))} ESCAPE '\\'"
+        )
+        self.columns.append(column)
+
+    def sql(self) -> str:
+        return " AND ".join(self.clauses)
+
+
+def most_distinct_column(rows: Sequence[Any], skip: Tuple[str, ...] = ("id",)) -> str:
+    """Column whose values differ the most between rows (best question to tell them apart)."""
+    counts = [
+        (field.name, len({getattr(row, field.name) for row in rows}))
+        for field in fields(rows[0])
+        if field.name not in skip
+    ]
+    return max(counts, key=lambda count: count[1])[0]
+
+
+def to_json_dict(row: Any) -> Dict[str, Any]:
+    """Row as a JSON-ready dict (dates as ISO strings)."""
+    return {
+        key: value.isoformat() if isinstance(value, (date, datetime)) else value
+        for key, value in asdict(row).items()
+    }
+
+
+def get_rm_id(config: Optional[RunnableConfig]) -> int:
+    """RM ID from the run config (``configurable.rm_id``, as the agent backend sets it)."""
+    rm_id = (config or {}).get("configurable", {}).get("rm_id")
+    try:
+        return int(rm_id)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        raise ValueError(
+            "relationship manager id not found in configuration or is not an integer. Please provide rm_id in the configuration."
+        )
+
+
+def parse_date(value: str) -> date:
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+@dataclass(slots=True)
+class CustomerRow:
+    id: int
+    name: str
+    email: str
+    phone: str
+    address: str
+    country: str
+    dob: date
+    gender: str
+    jobTitle: str
+    segment: str
+    state: str
+    zip: str
+    isActive: bool
+    behaviorDescription: str
+
+
+@dataclass(slots=True)
+class TaskRow:
+    id: int
+    customerId: int
+    taskType: str
+    taskStatus: str
+    taskDetails: str
+    dueDate: date
+
+
+@dataclass(slots=True)
+class StatusCount:
+    status: str
+    task_count: int
+
+
+class FindCustomerInput(BaseModel):
+    """Finds a single customer based on the provided criteria.
+
+    This function searches for a customer matching one or more of the specified attributes. It is designed to find exactly one matching customer to ensure precision for subsequent actions.
+    """
     
-#     # Build the query
-#     where_clause = " " + " AND ".join(conditions)
-#     customer_query = f"""
-#     SELECT id,name,email,phone,address,country,dob,gender,jobTitle,segment,state,zip,isActive,behaviorDescription
-#     FROM customers
-#     WHERE{where_clause}
-#     """.strip()
+    customerName: Optional[str] = Field(
+        default=None,
+        description="The customer's full name or partial name to search for",
+        examples=["Võ Thành Kiên", "Đinh Công Thắng"]
+    )
+    customerGender: Optional[Literal["OTHER", "MALE", "FEMALE"]] = Field(
+        default=None,
+        description="The customer's gender"
+    )
+    customerEmail: Optional[str] = Field(
+        default=None,
+        description="The customer's email address",
+        examples=["vo.thanh.kien576@outlook.com", "dinh.cong.thang@gmail.com"]
+    )
+    customerPhone: Optional[str] = Field(
+        default=None,
+        description="The customer's phone number in Vietnam (starts with +84)",
+        examples=["+840369016128", "+840909090909"]
+    )
+    customerAddress: Optional[str] = Field(
+        default=None,
+        description="The customer's address including building number, street name, ward, and district.",
+        examples=["351 Điện Biên Phủ, Ô Môn", "123 Nguyễn Văn Cừ, Quận 5"]
+    )
+    customerState: Optional[str] = Field(
+        default=None,
+        description="The customer's state or province in Vietnam.",
+        examples=["Hồ Chí Minh", "Hà Nội"]
+    )
+    customerJobTitle: Optional[str] = Field(
+        default=None,
+        description="The customer's job title or profession (in Vietnamese)",
+        examples=["Giáo viên", "Kỹ sư"]
+    )
+    customerSegment: Optional[Literal[
+        "DIAMOND_ELITE",
+        "DIAMOND",
+        "PRE_DIAMOND",
+        "CHAMPION_PRIME",
+        "RISING_PRIME",
+        "UPPERMEGA_PRIME",
+        "MEGA_PRIME"
+    ]] = Field(
+        default=None,
+        description="The customer's segment classification"
+    )
+
+
+CUSTOMER_FIELD_NAMES = tuple(field.name for field in fields(CustomerRow))
+CUSTOMER_COLUMNS = ", ".join(quote(name) for name in CUSTOMER_FIELD_NAMES)
+# Never asked back for: the key, and free text the RM cannot ask the customer for
+CUSTOMER_UNASKED_FIELDS = ("id", "behaviorDescription")
+
+
+def customer_conditions(
+    database: Database,
+    customerName: str | None = None,
+    customerGender: str | None = None,
+    customerEmail: str | None = None,
+    customerPhone: str | None = None,
+    customerAddress: str | None = None,
+    customerJobTitle: str | None = None,
+    customerSegment: str | None = None,
+    customerState: str | None = None,
+    customer_ids: Sequence[int] | None = None,
+) -> Conditions:
+    """
+    WHERE clause of the customers matching every given criterion.
+
+    Args:
+        customer_ids: Customers to search among (the customer index's matches,
+            which already satisfy the name, email, phone and address criteria)
+
+    Returns:
+        The conditions, with the columns that were filtered on (no clauses when
+        no criterion was given)
+    """
+    conditions = Conditions(database)
+
+    def text(column: str, value: str) -> None:
+        if customer_ids is None:
+            conditions.contains(column, value)
+        else:
+            conditions.columns.append(column)
+
+    if customer_ids is not None:
+        conditions.add_in("id", customer_ids)
+    if customerName:
+        text("name", customerName)
+    if customerGender:
+        conditions.add("gender", "=", GENDER_VALUES.get(customerGender, customerGender.lower()))
+    if customerEmail:
+        text("email", customerEmail)
+    if customerPhone:
+        text("phone", customerPhone)
+    if customerAddress:
+        text("address", customerAddress)
+    if customerJobTitle:
+        conditions.contains("jobTitle", customerJobTitle)
+    if customerSegment:
+        conditions.add("segment", "=", SEGMENT_VALUES.get(customerSegment, customerSegment))
+    if customerState:
+        conditions.contains("state", customerState)
+    return conditions
+
+
+async def search_customers(
+    database: Database,
+    customerName: str | None = None,
+    customerGender: str | None = None,
+    customerEmail: str | None = None,
+    customerPhone: str | None = None,
+    customerAddress: str | None = None,
+    customerJobTitle: str | None = None,
+    customerSegment: str | None = None,
+    customerState: str | None = None,
+    customer_ids: Sequence[int] | None = None,
+) -> Tuple[List[CustomerRow], List[str]]:
+    """
+    Customers matching every given criterion.
+
+    Args:
+        customer_ids: Customers to search among, best first (the customer index's
+            matches, which already satisfy the name, email, phone and address criteria)
+
+    Returns:
+        The matching rows and the columns that were filtered on (no rows when
+        no criterion was given)
+    """
+    conditions = customer_conditions(
+        database,
+        customerName=customerName,
+        customerGender=customerGender,
+        customerEmail=customerEmail,
+        customerPhone=customerPhone,
+        customerAddress=customerAddress,
+        customerJobTitle=customerJobTitle,
+        customerSegment=customerSegment,
+        customerState=customerState,
+        customer_ids=customer_ids,
+    )
+    if not conditions.clauses:
+        return [], []
+
+    query = f"SELECT {CUSTOMER_COLUMNS} FROM {quote(CUSTOMER_TABLE)} WHERE {conditions.sql()}"
+    customers = await database.fetch_as(CustomerRow, query, conditions.params)
+    if customer_ids is not None:
+        rank = {customer_id: position for position, customer_id in enumerate(customer_ids)}
+        customers.sort(key=lambda customer: rank[customer.id])
+    return customers, conditions.columns
+
+
+async def count_customers(database: Database, conditions: Conditions) -> int:
+    query = f"SELECT COUNT(*) FROM {quote(CUSTOMER_TABLE)} WHERE {conditions.sql()}"
+    return (await database.fetch(query, conditions.params))[0][0]
+
+
+def index_candidates(index: CustomerSearchIndex, **criteria: str | None) -> Tuple[Optional[List[int]], bool]:
+    """
+    Customers of the index matching find_customer's text criteria.
+
+    Args:
+        index: Customer index
+        **criteria: Text per indexed field (``name``, ``email``, ``phone``, ``address``)
+
+    Returns:
+        The customer IDs, best first (None: more matches than the index returns, to
+        filter in SQL), and whether they are only the closest customers (typos)
+    """
+    result = index.search(limit=CUSTOMER_INDEX_CANDIDATES, **criteria)
+    # Whole-word matches, else matches on parts of words (partial phone numbers, emails)
+    exact = (
+        [match.customer_id for match in result.matches if match.exact]
+        or [match.customer_id for match in result.matches if match.contained]
+    )
+    # With more matches than the index returned, the other criteria must narrow them in SQL
+    if result.exact_total > CUSTOMER_INDEX_CANDIDATES or len(exact) >= CUSTOMER_INDEX_CANDIDATES:
+        return None, False
+    if exact:
+        return exact, False
+    best = result.matches[0].score if result.matches else 0.0
+    return [match.customer_id for match in result.matches if match.score >= best - 0.05], True
+
+
+async def refresh_customer_index(index: CustomerSearchIndex, database: Database, customer_ids: Sequence[int]) -> bool:
+    """
+    Re-index customers from their current rows, and drop the deleted ones.
+
+    Returns:
+        Whether any of them had changed since it was indexed
+    """
+    conditions = Conditions(database)
+    conditions.add_in("id", customer_ids)
+    columns = ", ".join(quote(column) for column in ("id", "name", "email", "phone", "address"))
+    query = f"SELECT {columns} FROM {quote(CUSTOMER_TABLE)} WHERE {conditions.sql()}"
+    changed = False
+    found = set()
+    for customer_id, name, email, phone, address in await database.fetch(query, conditions.params):
+        found.add(customer_id)
+        changed = index.add(customer_id, name or "", email or "", phone or "", address or "") or changed
+    for customer_id in set(customer_ids) - found:
+        changed = index.remove(customer_id) or changed
+    return changed
+
+
+async def _prepend(
+    first: List[Sequence[Any]], batches: AsyncIterator[List[Sequence[Any]]]
+) -> AsyncIterator[List[Sequence[Any]]]:
+    yield first
+    async for rows in batches:
+        yield rows
+
+
+@tool(parse_docstring=True, args_schema=FindCustomerInput)
+async def find_customer(
+    customerName: str | None = None,
+    customerGender: Literal["OTHER", "MALE", "FEMALE"] | None = None,
+    customerEmail: str | None = None,
+    customerPhone: str | None = None,
+    customerAddress: str | None = None,
+    customerJobTitle: str | None = None,
+    customerSegment: Literal[
+        "DIAMOND_ELITE",
+        "DIAMOND",
+        "PRE_DIAMOND",
+        "CHAMPION_PRIME",
+        "RISING_PRIME",
+        "UPPERMEGA_PRIME",
+        "MEGA_PRIME",
+    ]
+    | None = None,
+    customerState: str | None = None,
+    config: RunnableConfig | None = None
+):
+    if not any((customerName, customerGender, customerEmail, customerPhone, customerAddress,
+                customerJobTitle, customerSegment, customerState)):
+        return {
+            "customer_info": {},
+            "message": "No search criteria provided. Please provide at least one information (name, email, phone, address, job title, segment, state) to search for a customer."
+        }
     
-#     try:
-#         # Execute the query
-#         cols = [
-#             "id", "name", "email", "phone", "address", "country", "dob", "gender", "jobTitle", "segment", "state", "zip", "isActive", "behaviorDescription",
-#         ]
-#         customer_resp = DATABASE.run(customer_query)
-#         if isinstance(customer_resp, str) and customer_resp.strip():
-#             processed_customer_resp = eval(str(customer_resp))
-#         else:
-#             processed_customer_resp = []
-        
-#         # Check the number of results
-#         if not processed_customer_resp:
-#             return {
-#                 "customer_info": {},
-#                 "message": "No customer found matching the provided criteria. Please ask back for different information."
-#             }
+    criteria = dict(
+        customerName=customerName,
+        customerGender=customerGender,
+        customerEmail=customerEmail,
+        customerPhone=customerPhone,
+        customerAddress=customerAddress,
+        customerJobTitle=customerJobTitle,
+        customerSegment=customerSegment,
+        customerState=customerState,
+    )
+    try:
+        database = get_database()
+        customer_ids = None
+        closest = False
+        index = CUSTOMER_INDEX
+        if index is not None and any((customerName, customerEmail, customerPhone, customerAddress)):
+            text_criteria = dict(name=customerName, email=customerEmail, phone=customerPhone, address=customerAddress)
+            customer_ids, closest = index_candidates(index, **text_criteria)
+            if customer_ids and await refresh_customer_index(index, database, customer_ids):
+                # Some matches were changed or deleted since the index was synced
+                customer_ids, closest = index_candidates(index, **text_criteria)
+            if customer_ids is not None and (closest or not customer_ids):
+                # Customers added or renamed since the last sync are not indexed yet
+                if await index.refresh(database, CUSTOMER_TABLE):
+                    customer_ids, closest = index_candidates(index, **text_criteria)
+            if customer_ids == []:
+                return {
+                    "customer_info": {},
+                    "message": "No customer found matching the provided criteria. Please ask back for different information."
+                }
         
-#         if len(processed_customer_resp) > 1:
-#             value_counts = []
-#             for col, vals in zip(cols, zip(*processed_customer_resp)):
-#                 if col == "id":
-#                     continue
-#                 value_counts.append((col, len(set(vals))))
-#             max_value_count = max(value_counts, key=lambda x: x[1])
-#             if f" {max_value_count[0]} " in where_clause:
-#                 return {
-#                     "customer_info": {},
-#                     "message": f"Multiple customers ({len(processed_customer_resp)}) found matching the criteria. Please ask back for customer's full {max_value_count[0]}."
-#                 }
-#             else:
-#                 return {
-#                     "customer_info": {},
-#                     "message": f"Multiple customers ({len(processed_customer_resp)}) found matching the criteria. Please ask back for customer's {max_value_count[0]}."
-#                 }
+        conditions = customer_conditions(database, **criteria, customer_ids=customer_ids)
+        query = f"SELECT {CUSTOMER_COLUMNS} FROM {quote(CUSTOMER_TABLE)} WHERE {conditions.sql()}"
+        # Read the matches in batches: a single batch tells none / one / several apart, and
+        # several are only profiled until the best question is clear, never all loaded
+        async with aclosing(database.stream(query, conditions.params)) as batches:
+            customers = await anext(batches, [])
+            if len(customers) > 1:
+                disambiguation = await choose_clarifying_fields(
+                    _prepend(customers, batches), CUSTOMER_FIELD_NAMES, skip=CUSTOMER_UNASKED_FIELDS
+                )
         
-#         # Exactly one customer found
+        # Check the number of results
+        if not customers:
+            return {
+                "customer_info": {},
+                "message": "No customer found matching the provided criteria. Please ask back for different information."
+            }
         
-#         customer_info = {}
-#         for col, val in zip(cols, processed_customer_resp[0]):
-#             customer_info[col] = val
+        if len(customers) > 1:
+            total = disambiguation.rows_seen if disambiguation.complete else await count_customers(database, conditions)
+            column = disambiguation.fields[0].column
+            full = "full " if column in conditions.columns else ""
+            if closest:
+                return {
+                    "customer_info": {},
+                    "message": f"No exact match. Multiple similar customers ({total}) found. Please ask back for customer's {full}{column}."
+                }
+            return {
+                "customer_info": {},
+                "message": f"Multiple customers ({total}) found matching the criteria. Please ask back for customer's {full}{column}."
+            }
         
-#         return {
-#             "customer_info": customer_info,
-#             "message": "Customer found successfully." if customer_info["isActive"] else "Warning: Customer is not active."
-#         }
+        # Exactly one customer found
+        customer = CustomerRow(*customers[0])
+        message = "Customer found successfully." if customer.isActive else "Warning: Customer is not active."
+        if closest:
+            message = f"No exact match; closest customer found. Please confirm with the user that this is the right customer. {message}"
+        return {
+            "customer_info": to_json_dict(customer),
+            "message": message
+        }
     
-#     except Exception as e:
-#         return {
-#             "customer_info": {},
-#             "message": f"An error occurred while searching for customer: {e}"
-#         }
-
+    except Exception as e:
+        return {
+            "customer_info": {},
+            "message": f"An error occurred while searching for customer: {e}"
+        }
 
 
 # class FindCardProductInput(BaseModel):
@@ -266,158 +845,149 @@
 #         }
 
 
-# class FindRmTaskInput(BaseModel):
-#     """Finds a single task for a relationship manager based on specified criteria.
+class FindRmTaskInput(BaseModel):
+    """Finds a single task for a relationship manager based on specified criteria.
 
-#     This function queries for tasks assigned to the relationship manager. It is designed to find
-#     exactly one matching task.
-#     """
+    This function queries for tasks assigned to the relationship manager. It is designed to find
+    exactly one matching task.
+    """
     
-#     customerId: Optional[int] = Field(
-#         default=None,
-#         description="The unique identifier for a customer. If other customer information is provided, call `find_customer` first to obtain the `customerId`."
-#     )
-#     taskType: Optional[Literal["CALL", "EMAIL", "MEETING", "FOLLOW_UP", "SEND_INFO_PACKAGE"]] = Field(
-#         default=None,
-#         description="The type of task to filter by"
-#     )
-#     taskStatus: Optional[Literal["PENDING", "COMPLETED", "CANCELLED", "IN_PROGRESS"]] = Field(
-#         default=None,
-#         description="The current status of the task"
-#     )
-#     taskDueDate: Optional[tuple] = Field(
-#         default=None,
-#         description="A tuple containing start and end dates as strings to filter tasks by due date range in YYYY-MM-DD format",
-#         examples=[("2025-11-07", "2025-11-07"), ("2025-11-07", "2025-11-10")]
-#     )
+    customerId: Optional[int] = Field(
+        default=None,
+        description="The unique identifier for a customer. If other customer information is provided, call `find_customer` first to obtain the `customerId`."
+    )
+    taskType: Optional[Literal["CALL", "EMAIL", "MEETING", "FOLLOW_UP", "SEND_INFO_PACKAGE"]] = Field(
+        default=None,
+        description="The type of task to filter by"
+    )
+    taskStatus: Optional[Literal["PENDING", "COMPLETED", "CANCELLED", "IN_PROGRESS"]] = Field(
+        default=None,
+        description="The current status of the task"
+    )
+    taskDueDate: Optional[tuple] = Field(
+        default=None,
+        description="A tuple containing start and end dates as strings to filter tasks by due date range in YYYY-MM-DD format",
+        examples=[("2025-11-07", "2025-11-07"), ("2025-11-07", "2025-11-10")]
+    )
 
-# @tool(parse_docstring=True, args_schema=FindRmTaskInput)
-# def find_rm_task(
-#     customerId: int | None = None,
-#     taskType: Literal["CALL", "EMAIL", "MEETING", "FOLLOW_UP", "SEND_INFO_PACKAGE"] | None = None,
-#     taskStatus: Literal["PENDING", "COMPLETED", "CANCELLED", "IN_PROGRESS"] | None = None,
-#     taskDueDate: Tuple[str, str] | None = None,
-#     config: RunnableConfig = None
-# ):
-#     # Extract relationship manager id from thread_id
-#     rm_id = None
-#     if config:
-#         rm_id = config.get("configurable", {}).get("thread_id")
-    
-#     try:
-#         rm_id = int(rm_id)
-#     except Exception:
-#         raise ValueError(
-#             "relationship manager id not found in configuration or is not an integer. Please provide thread_id as relationship manager id."
-#         )
-    
-#     # Build WHERE conditions based on provided parameters
-#     conditions = [f"rmId = {rm_id}"] 
-    
-#     if customerId is not None:
-#         try:
-#             customerId = int(customerId)
-#         except ValueError:
-#             return {
-#                 "task_info": {},
-#                 "message": "Invalid customer ID. Customer ID must be an integer. Please provide a valid customer ID or ask back for customer information and use the `find_customer` tool to obtain it."
-#             }
-#         conditions.append(f"customerId = {customerId}")
-#     if taskType is not None:
-#         if taskType not in ["CALL", "EMAIL", "MEETING", "FOLLOW_UP", "SEND_INFO_PACKAGE"]:
-#             return {
-#                 "task_info": {},
-#                 "message": "Invalid task type. Task type must be one of: CALL, EMAIL, MEETING, FOLLOW_UP, SEND_INFO_PACKAGE"
-#             }
-#         conditions.append(f"taskType LIKE '%{taskType}%'")
-#     if taskStatus is not None:
-#         if taskStatus not in ["PENDING", "COMPLETED", "CANCELLED", "IN_PROGRESS"]:
-#             return {
-#                 "task_info": {},
-#                 "message": "Invalid task status. Task status must be one of: PENDING, COMPLETED, CANCELLED, IN_PROGRESS"
-#             }
-#         conditions.append(f"status LIKE '%{taskStatus}%'")
-#     if taskDueDate is not None:
-#         start_date, end_date = taskDueDate
-#         if start_date and end_date and start_date > end_date:
-#             return {
-#                 "task_info": {},
-#                 "message": "Start date cannot be greater than end date. Please provide a valid date range."
-#             }
-#         if start_date:
-#             try:
-#                 datetime.strptime(start_date, "%Y-%m-%d")
-#             except Exception:
-#                 return {
-#                     "task_info": {},
-#                     "message": "Invalid start date. Please provide a valid start date in YYYY-MM-DD format."
-#                 }
-#             conditions.append(f"dueDate >= '{start_date}'")
-#         if end_date:
-#             try:
-#                 datetime.strptime(end_date, "%Y-%m-%d")
-#             except Exception:
-#                 return {
-#                     "task_info": {},
-#                     "message": "Invalid end date. Please provide a valid end date in YYYY-MM-DD format."
-#                 }
-#             conditions.append(f"dueDate <= '{end_date}'")
+
+TASK_COLUMNS = ", ".join(
+    quote(column) + (' AS "taskStatus"' if column == "status" else "")
+    for column in ("id", "customerId", "taskType", "status", "taskDetails", "dueDate")
+)
+
+
+async def search_tasks(
+    database: Database,
+    rm_id: int,
+    customerId: int | None = None,
+    taskType: str | None = None,
+    taskStatus: str | None = None,
+    due_from: date | None = None,
+    due_to: date | None = None,
+) -> List[TaskRow]:
+    """Tasks of an RM matching every given criterion (due dates inclusive)."""
+    conditions = Conditions(database)
+    conditions.add("rmId", "=", rm_id)
+    if customerId is not None:
+        conditions.add("customerId", "=", customerId)
+    if taskType is not None:
+        conditions.add("taskType", "=", taskType)
+    if taskStatus is not None:
+        conditions.add("status", "=", taskStatus)
+    if due_from is not None:
+        conditions.add("dueDate", ">=", due_from)
+    if due_to is not None:
+        conditions.add("dueDate", "<=", due_to)
+
+    query = f"SELECT {TASK_COLUMNS} FROM {quote(TASK_TABLE)} WHERE {conditions.sql()}"
+    return await database.fetch_as(TaskRow, query, conditions.params)
+
+
+@tool(parse_docstring=True, args_schema=FindRmTaskInput)
+async def find_rm_task(
+    customerId: int | None = None,
+    taskType: Literal["CALL", "EMAIL", "MEETING", "FOLLOW_UP", "SEND_INFO_PACKAGE"] | None = None,
+    taskStatus: Literal["PENDING", "COMPLETED", "CANCELLED", "IN_PROGRESS"] | None = None,
+    taskDueDate: Tuple[str, str] | None = None,
+    config: RunnableConfig = None
+):
+    rm_id = get_rm_id(config)
     
-#     # Build the query
-#     where_clause = " AND ".join(conditions)
-#     task_query = f"""
-#     SELECT id, customerId, taskType, status, taskDetails, dueDate
-#     FROM tasks
-#     WHERE {where_clause}
-#     """.strip()
+    if customerId is not None:
+        try:
+            customerId = int(customerId)
+        except ValueError:
+            return {
+                "task_info": {},
+                "message": "Invalid customer ID. Customer ID must be an integer. Please provide a valid customer ID or ask back for customer information and use the `find_customer` tool to obtain it."
+            }
+    if taskType is not None and taskType not in TASK_TYPES:
+        return {
+            "task_info": {},
+            "message": "Invalid task type. Task type must be one of: CALL, EMAIL, MEETING, FOLLOW_UP, SEND_INFO_PACKAGE"
+        }
+    if taskStatus is not None and taskStatus not in TASK_STATUSES:
+        return {
+            "task_info": {},
+            "message": "Invalid task status. Task status must be one of: PENDING, COMPLETED, CANCELLED, IN_PROGRESS"
+        }
+    due_from = due_to = None
+    if taskDueDate is not None:
+        start_date, end_date = taskDueDate
+        if start_date:
+            try:
+                due_from = parse_date(start_date)
+            except ValueError:
+                return {
+                    "task_info": {},
+                    "message": "Invalid start date. Please provide a valid start date in YYYY-MM-DD format."
+                }
+        if end_date:
+            try:
+                due_to = parse_date(end_date)
+            except ValueError:
+                return {
+                    "task_info": {},
+                    "message": "Invalid end date. Please provide a valid end date in YYYY-MM-DD format."
+                }
+        if due_from and due_to and due_from > due_to:
+            return {
+                "task_info": {},
+                "message": "Start date cannot be greater than end date. Please provide a valid date range."
+            }
     
-#     try:
-#         # Execute the query
-#         cols = [
-#             "id", "customerId", "taskType", "taskStatus", "taskDetails", "dueDate"
-#         ]
-#         task_resp = DATABASE.run(task_query)
-#         if isinstance(task_resp, str) and task_resp.strip():
-#             processed_task_resp = eval(str(task_resp))
-#         else:
-#             processed_task_resp = []
+    try:
+        tasks = await search_tasks(get_database(), rm_id, customerId, taskType, taskStatus, due_from, due_to)
         
-#         # Check the number of results
-#         if not processed_task_resp:
-#             return {
-#                 "task_info": {},
-#                 "message": "No task found matching the provided criteria. Please ask back for different information."
-#             }
-        
-#         if len(processed_task_resp) > 1:
-#             value_counts = []
-#             for col, vals in zip(cols, zip(*processed_task_resp)):
-#                 if col == "id":
-#                     continue
-#                 elif col == "customerId":
-#                     value_counts.append(("customer information", len(set(vals))))
-#                 value_counts.append((col, len(set(vals))))
-#             max_value_count = max(value_counts, key=lambda x: x[1])
-#             return {
-#                 "task_info": {},
-#                 "message": f"({len(processed_task_resp)}) tasks found matching the criteria. Please ask back for {max_value_count[0]} to identify a single task."
-#             }
+        # Check the number of results
+        if not tasks:
+            return {
+                "task_info": {},
+                "message": "No task found matching the provided criteria. Please ask back for different information."
+            }
         
-#         # Exactly one task found
-#         task_info = {}
-#         for col, val in zip(cols, processed_task_resp[0]):
-#             task_info[col] = val
+        if len(tasks) > 1:
+            column = most_distinct_column(tasks)
+            if column == "customerId":
+                column = "customer information"
+            return {
+                "task_info": {},
+                "message": f"({len(tasks)}) tasks found matching the criteria. Please ask back for {column} to identify a single task."
+            }
         
-#         return {
-#             "task_info": task_info,
-#             "message": "Task found successfully."
-#         }
+        # Exactly one task found
+        return {
+            "task_info": to_json_dict(tasks[0]),
+            "message": "Task found successfully."
+        }
     
-#     except Exception as e:
-#         return {
-#             "task_info": {},
-#             "message": f"An error occurred while searching for task: {e}"
-#         }
+    except Exception as e:
+        return {
+            "task_info": {},
+            "message": f"An error occurred while searching for task: {e}"
+        }
+
 
 # class CreateRmTaskInput(BaseModel):
 #     """Creates a new task for a relationship manager.
@@ -596,102 +1166,103 @@
 #         "message": "All input is now valid. Ask for confirmation",
 #     }
 
-# class ReportPerformanceInput(BaseModel):
-#     """Retrieves a performance report for the relationship manager for a given period.
 
-#     This function calculates and returns key performance indicators (KPIs) for the
-#     currently logged-in relationship manager over a specified date range.
-#     """
-    
-#     startDate: Optional[str] = Field(
-#         default=None,
-#         description="The start date of the performance report in YYYY-MM-DD format.",
-#         examples=["2025-06-11"]
-#     )
-#     endDate: Optional[str] = Field(
-#         default=None,
-#         description="The end date of the performance report in YYYY-MM-DD format.",
-#         examples=["2025-11-25"]
-#     )
+class ReportPerformanceInput(BaseModel):
+    """Retrieves a performance report for the relationship manager for a given period.
 
-# @tool(parse_docstring=True, args_schema=ReportPerformanceInput)
-# def report_performance(
-#     startDate: str | None = None,
-#     endDate: str | None = None,
-#     config: RunnableConfig = None
-# ):
-#     # Extract relationship manager id from thread_id
-#     rm_id = None
-#     if config:
-#         rm_id = config.get("configurable", {}).get("rmId")
+    This function calculates and returns key performance indicators (KPIs) for the
+    currently logged-in relationship manager over a specified date range.
+    """
     
-#     try:
-#         rm_id = int(rm_id)
-#     except Exception:
-#         raise ValueError(
-#             "relationship manager id not found in configuration or is not an integer. Please provide thread_id as relationship manager id."
-#         )
+    startDate: Optional[str] = Field(
+        default=None,
+        description="The start date of the performance report in YYYY-MM-DD format.",
+        examples=["2025-06-11"]
+    )
+    endDate: Optional[str] = Field(
+        default=None,
+        description="The end date of the performance report in YYYY-MM-DD format.",
+        examples=["2025-11-25"]
+    )
 
-#     # Build WHERE conditions based on provided parameters
-#     conditions = [f"rmId = {rm_id}"] 
-    
-#     if startDate is not None:
-#         try:
-#             datetime.strptime(startDate, "%Y-%m-%d")
-#         except ValueError:
-#             return {
-#                 "task_info": {},
-#                 "message": "Invalid start date. Please provide a valid start date in YYYY-MM-DD format."
-#             }
-#         conditions.append(f"createdAt >= '{startDate}'")
-    
-#     if endDate is not None:
-#         try:
-#             datetime.strptime(endDate, "%Y-%m-%d")
-#         except ValueError:
-#             return {
-#                 "task_info": {},
-#                 "message": "Invalid end date. Please provide a valid end date in YYYY-MM-DD format."
-#             }
-#         conditions.append(f"createdAt <= '{endDate}'")
+
+async def count_tasks_by_status(
+    database: Database,
+    rm_id: int,
+    created_from: date | None = None,
+    created_to: date | None = None,
+) -> List[StatusCount]:
+    """Task counts of an RM per status, for tasks created between the two dates (inclusive)."""
+    conditions = Conditions(database)
+    conditions.add("rmId", "=", rm_id)
+    if created_from is not None:
+        conditions.add("createdAt", ">=", datetime.combine(created_from, datetime.min.time()))
+    if created_to is not None:
+        # createdAt is a timestamp: the whole end day counts
+        conditions.add("createdAt", "<", datetime.combine(created_to + timedelta(days=1), datetime.min.time()))
+
+    query = (
+        f'SELECT {quote("status")}, COUNT(*) AS task_count FROM {quote(TASK_TABLE)} '
+        f"WHERE {conditions.sql()} GROUP BY {quote('status')} ORDER BY task_count DESC"
+    )
+    return await database.fetch_as(StatusCount, query, conditions.params)
+
+
+@tool(parse_docstring=True, args_schema=ReportPerformanceInput)
+async def report_performance(
+    startDate: str | None = None,
+    endDate: str | None = None,
+    config: RunnableConfig = None
+):
+    rm_id = get_rm_id(config)
+
+    created_from = created_to = None
+    if startDate is not None:
+        try:
+            created_from = parse_date(startDate)
+        except ValueError:
+            return {
+                "task_info": {},
+                "message": "Invalid start date. Please provide a valid start date in YYYY-MM-DD format."
+            }
     
-#     # Build the query
-#     where_clause = " AND ".join(conditions)
-#     performance_query = f"""
-#     SELECT status, COUNT(*) as task_count
-#     FROM tasks
-#     WHERE {where_clause}
-#     GROUP BY status
-#     ORDER BY task_count DESC  
-#     """.strip()
+    if endDate is not None:
+        try:
+            created_to = parse_date(endDate)
+        except ValueError:
+            return {
+                "task_info": {},
+                "message": "Invalid end date. Please provide a valid end date in YYYY-MM-DD format."
+            }
     
-#     try:
-#         # Execute the query
-#         performance_resp = DATABASE.run(performance_query)
-#         if isinstance(performance_resp, str) and performance_resp.strip():
-#             processed_performance_resp = eval(str(performance_resp))
-#         else:
-#             processed_performance_resp = []
+    try:
+        rollup = TASK_ROLLUP
+        if rollup is not None and not rollup.ready:
+            # Counted in SQL until the rollup's first sync, run in the background, completes
+            rollup.warm_up(get_database(), TASK_TABLE)
+            rollup = None
+        if rollup is not None:
+            await rollup.refresh(get_database(), TASK_TABLE)
+            counts = [StatusCount(*count) for count in rollup.counts(rm_id, created_from, created_to)]
+        else:
+            counts = await count_tasks_by_status(get_database(), rm_id, created_from, created_to)
         
-#         # Check the number of results
-#         if not processed_performance_resp:
-#             return {
-#                 "task_info": {},
-#                 "message": "No task found during the period. Please ask back for a different period."
-#             }
+        # Check the number of results
+        if not counts:
+            return {
+                "task_info": {},
+                "message": "No task found during the period. Please ask back for a different period."
+            }
 
-#         performance_report = {}
-#         for status, count in processed_performance_resp:
-#             performance_report[f"{status.lower()} tasks"] = count
-#         performance_report["total tasks"] = sum(performance_report.values())
-#         return {
-#             "message": "Performance report retrieved successfully.",
-#             "performance_report": performance_report
-#         }
+        performance_report = {f"{count.status.lower()} tasks": count.task_count for count in counts}
+        performance_report["total tasks"] = sum(performance_report.values())
+        return {
+            "message": "Performance report retrieved successfully.",
+            "performance_report": performance_report
+        }
     
-#     except Exception as e:
-#         return {
-#             "task_info": {},
-#             "message": f"An error occurred while searching for task: {e}"
-#         }
-    
\ No newline at end of file
+    except Exception as e:
+        return {
+            "task_info": {},
+            "message": f"An error occurred while searching for task: {e}"
+        }